@@ -1,6 +1,7 @@
 from .alpaca_backtesting import AlpacaBacktesting
 from .alpha_vantage_backtesting import AlphaVantageBacktesting
 from .backtesting_broker import BacktestingBroker
+from .backtesting_clock import BacktestingClock
 from .pandas_backtesting import PandasDataBacktesting
 from .polygon_backtesting import PolygonDataBacktesting
 from .yahoo_backtesting import YahooDataBacktesting
@@ -4,6 +4,7 @@ from datetime import timedelta
 from decimal import Decimal
 from functools import wraps
 
+import numpy as np
 import pandas as pd
 
 from lumibot.brokers import Broker
@@ -22,6 +23,9 @@ class BacktestingBroker(Broker):
         self.max_workers = max_workers
         self.market = "NASDAQ"
 
+        # BacktestingClock shared with the brokers of the other strategies backtested on the same data source
+        self.clock = None
+
         # Legacy strategy.backtest code will always pass in a config even for Brokers that don't need it, so
         # catch it here and ignore it in this class. Child classes that need it should error check it themselves.
         # self._config = config
@@ -92,7 +96,10 @@ class BacktestingBroker(Broker):
         else:
             new_datetime = update_dt
 
-        self.data_source._update_datetime(new_datetime, cash=cash, portfolio_value=portfolio_value)
+        if self.clock is not None:
+            self.clock.advance(self, new_datetime, cash=cash, portfolio_value=portfolio_value)
+        else:
+            self.data_source._update_datetime(new_datetime, cash=cash, portfolio_value=portfolio_value)
         logging.info(f"Current backtesting datetime {self.datetime}")
 
     # =========Clock functions=====================
@@ -564,6 +571,27 @@ class BacktestingBroker(Broker):
         if len(pending_orders) == 0:
             return
 
+        # Get the bar of every asset once and evaluate all the orders against their bars at once
+        fill_prices = {}
+        if self.data_source.SOURCE == "PANDAS":
+            bars = {}
+            orders_to_evaluate = []
+            for order in pending_orders:
+                if order.dependent_order_filled or order.status == self.CANCELED_ORDER:
+                    continue
+
+                key = (order.asset, order.quote)
+                if key not in bars:
+                    asset = order.asset if order.asset.asset_type != "crypto" else (order.asset, order.quote)
+                    bars[key] = self.data_source.get_order_fill_bar(asset, quote=order.quote)
+                if bars[key] is not None:
+                    orders_to_evaluate.append(order)
+
+            order_bars = [bars[(order.asset, order.quote)] for order in orders_to_evaluate]
+            fill_prices = dict(
+                zip(map(id, orders_to_evaluate), self._get_fill_prices(orders_to_evaluate, order_bars))
+            )
+
         for order in pending_orders:
             if order.dependent_order_filled or order.status == self.CANCELED_ORDER:
                 continue
@@ -596,79 +624,36 @@ class BacktestingBroker(Broker):
                     timeshift=timeshift,
                 )
 
-                dt = ohlc.df.index[-1]
-                open = ohlc.df['open'].iloc[-1]
-                high = ohlc.df['high'].iloc[-1]
-                low = ohlc.df['low'].iloc[-1]
-                close = ohlc.df['close'].iloc[-1]
-                volume = ohlc.df['volume'].iloc[-1]
+                bar = {column: ohlc.df[column].iloc[-1] for column in ["open", "high", "low", "close", "volume"]}
+                bar["datetime"] = ohlc.df.index[-1]
+                price, stop_triggered = self._get_fill_prices([order], [bar])[0]
 
             # Get the OHLCV data for the asset if we're using the PANDAS data source
             elif self.data_source.SOURCE == "PANDAS":
-                # This is a hack to get around the fact that we need to get the previous day's data to prevent lookahead bias.
-                ohlc = strategy.get_historical_prices(
-                    asset,
-                    2,
-                    quote=order.quote,
-                    timeshift=-2,
-                    timestep=self.data_source._timestep,
-                )
                 # Check if we got any ohlc data
-                if ohlc is None:
+                if id(order) not in fill_prices:
                     self.cancel_order(order)
                     continue
 
-                df_original = ohlc.df
-
-                # Make sure that we are only getting the prices for the current time exactly or in the future
-                df = df_original[df_original.index >= self.datetime]
-
-                # If the dataframe is empty, then we should get the last row of the original dataframe
-                # because it is the best data we have
-                if df.empty:
-                    df = df_original.iloc[-1:]
-
-                dt = df.index[0]
-                open = df["open"].iloc[0]
-                high = df["high"].iloc[0]
-                low = df["low"].iloc[0]
-                close = df["close"].iloc[0]
-                volume = df["volume"].iloc[0]
+                bar = bars[(order.asset, order.quote)]
+                price, stop_triggered = fill_prices[id(order)]
 
             #############################
-            # Determine transaction price.
+            # Update the order triggers.
             #############################
 
-            if order.type == "market":
-                price = open
-
-            elif order.type == "limit":
-                price = self.limit_order(order.limit_price, order.side, open, high, low)
-
-            elif order.type == "stop":
-                price = self.stop_order(order.stop_price, order.side, open, high, low)
-
-            elif order.type == "stop_limit":
-                if not order.price_triggered:
-                    price = self.stop_order(order.stop_price, order.side, open, high, low)
-                    if price is not None:
-                        price = self.limit_order(order.limit_price, order.side, price, high, low)
-                        order.price_triggered = True
-                elif order.price_triggered:
-                    price = self.limit_order(order.limit_price, order.side, open, high, low)
+            if order.type == "stop_limit":
+                if stop_triggered:
+                    order.price_triggered = True
 
             elif order.type == "trailing_stop":
-                if order._trail_stop_price:
-                    # Check if we have hit the trail stop price for both sell/buy orders
-                    price = self.stop_order(order._trail_stop_price, order.side, open, high, low)
-
                 # Update the stop price if the price has moved
                 if order.side == "sell":
-                    order.update_trail_stop_price(high)
+                    order.update_trail_stop_price(bar["high"])
                 elif order.side == "buy":
-                    order.update_trail_stop_price(low)
+                    order.update_trail_stop_price(bar["low"])
 
-            else:
+            elif order.type not in ["market", "limit", "stop"]:
                 raise ValueError(f"Order type {order.type} is not implemented for backtesting.")
 
             #############################
@@ -705,6 +690,91 @@ class BacktestingBroker(Broker):
             else:
                 continue
 
+    def _get_fill_prices(self, orders, bars):
+        """Determines the transaction prices of pending orders in backtesting.
+
+        All the orders are evaluated at once with numpy, using the same rules as ``limit_order``
+        and ``stop_order``. The orders themselves are not modified: marking stop limit orders as
+        triggered and moving trailing stops is left to the caller.
+
+        Parameters
+        ----------
+        orders : list of Order
+            The orders to evaluate.
+        bars : list of dict
+            The bar each order is evaluated against, with at least ``open``, ``high`` and ``low``.
+
+        Returns
+        -------
+        list of tuple
+            For each order, the transaction price (``None`` if the order is not filled) and whether
+            the stop price of a stop limit order was triggered.
+        """
+        if len(orders) == 0:
+            return []
+
+        no_fill, fill_open, fill_limit, fill_stop, fill_trail = range(5)
+
+        def order_prices(attribute):
+            return np.array([getattr(order, attribute) or np.nan for order in orders], dtype=float)
+
+        open_ = np.array([bar["open"] for bar in bars], dtype=float)
+        high = np.array([bar["high"] for bar in bars], dtype=float)
+        low = np.array([bar["low"] for bar in bars], dtype=float)
+        sell = np.array([order.side == "sell" for order in orders])
+        buy = np.array([order.side == "buy" for order in orders])
+        order_type = np.array([order.type for order in orders])
+        price_triggered = np.array([bool(order.price_triggered) for order in orders])
+
+        def limit_fill(limit_price, limit_source, base, base_source):
+            # Gap up/down cases fill at the base price, otherwise the candle has to touch the limit price
+            gap = (sell & (limit_price <= base)) | (buy & (limit_price >= base))
+            touched = (low <= limit_price) & (limit_price <= high)
+            source = np.where(gap, base_source, np.where(touched, limit_source, no_fill))
+            return source, np.where(gap, base, np.where(touched, limit_price, np.nan))
+
+        def stop_fill(stop_price, stop_source):
+            gap = (sell & (stop_price >= open_)) | (buy & (stop_price <= open_))
+            touched = (low <= stop_price) & (stop_price <= high)
+            source = np.where(gap, fill_open, np.where(touched, stop_source, no_fill))
+            return source, np.where(gap, open_, np.where(touched, stop_price, np.nan))
+
+        limit_price = order_prices("limit_price")
+        limit_source, _ = limit_fill(limit_price, fill_limit, open_, fill_open)
+        stop_source, stop_value = stop_fill(order_prices("stop_price"), fill_stop)
+        trail_source, _ = stop_fill(order_prices("_trail_stop_price"), fill_trail)
+
+        # Stop limit orders become limit orders once the stop price is triggered
+        stop_triggered = (order_type == "stop_limit") & ~price_triggered & (stop_source != no_fill)
+        stop_limit_source, _ = limit_fill(limit_price, fill_limit, stop_value, stop_source)
+        stop_limit_source = np.where(stop_source != no_fill, stop_limit_source, no_fill)
+
+        source = np.select(
+            [
+                order_type == "market",
+                order_type == "limit",
+                order_type == "stop",
+                (order_type == "stop_limit") & ~price_triggered,
+                (order_type == "stop_limit") & price_triggered,
+                order_type == "trailing_stop",
+            ],
+            [fill_open, limit_source, stop_source, stop_limit_source, limit_source, trail_source],
+            default=no_fill,
+        )
+
+        results = []
+        for order, bar, order_source, order_stop_triggered in zip(orders, bars, source, stop_triggered):
+            price = {
+                no_fill: None,
+                fill_open: bar["open"],
+                fill_limit: order.limit_price,
+                fill_stop: order.stop_price,
+                fill_trail: order._trail_stop_price,
+            }[order_source]
+            results.append((price, bool(order_stop_triggered)))
+
+        return results
+
     def limit_order(self, limit_price, side, open_, high, low):
         """Limit order logic."""
         # Gap Up case: Limit wasn't triggered by previous candle but current candle opens higher, fill it now
@@ -0,0 +1,96 @@
+from threading import Condition
+
+
+class BacktestingClock:
+    """Clock shared by the BacktestingBrokers of several strategies backtested together on one data source.
+
+    Each strategy keeps its own broker (and so its own cash, positions, orders and stats) and runs on its own
+    thread, but the strategies take turns: only one of them runs at a time, and the datetime of the data source
+    only moves forward once every strategy is waiting for a later datetime. The strategy waiting for the earliest
+    datetime runs next, in the order the brokers were added when several wait for the same one, so a backtest of
+    several strategies is as deterministic as a backtest of one.
+
+    A strategy asking for a datetime that is already past runs at the current datetime, the clock never goes back.
+
+    Parameters
+    ----------
+    data_source : DataSourceBacktesting
+        The data source shared by the brokers.
+    """
+
+    def __init__(self, data_source):
+        self.data_source = data_source
+        self._condition = Condition()
+        self._brokers = []
+        self._waiting = {}
+        self._done = set()
+        self._running = None
+
+    def add_broker(self, broker):
+        """Makes a broker use this clock. All the brokers must be added before the strategies start."""
+        if broker.data_source is not self.data_source:
+            raise ValueError("The brokers of a BacktestingClock must all use the data source of the clock")
+        with self._condition:
+            self._brokers.append(broker)
+        broker.clock = self
+
+    def start(self, broker):
+        """Waits for the first turn of a broker, before its strategy is initialized."""
+        self.advance(broker, None)
+
+    def advance(self, broker, new_datetime, cash=None, portfolio_value=None):
+        """Ends the turn of a broker and waits until its next turn, at ``new_datetime``.
+
+        Parameters
+        ----------
+        broker : BacktestingBroker
+            The broker of the strategy.
+        new_datetime : datetime.datetime
+            The datetime the strategy is waiting for. If None, the strategy runs at the current datetime.
+        cash : float
+            The cash of the strategy, shown in the progress bar.
+        portfolio_value : float
+            The portfolio value of the strategy, shown in the progress bar.
+        """
+        with self._condition:
+            self._waiting[id(broker)] = (new_datetime, cash, portfolio_value)
+            if self._running is broker:
+                self._running = None
+            self._schedule()
+            while self._running is not broker:
+                self._condition.wait()
+
+    def stop(self, broker):
+        """Removes a broker whose strategy finished, so the clock stops waiting for it."""
+        with self._condition:
+            self._done.add(id(broker))
+            self._waiting.pop(id(broker), None)
+            if self._running is broker:
+                self._running = None
+            self._schedule()
+
+    def _schedule(self):
+        # Called with the lock held, gives the turn to the next broker once all of them are waiting or done
+        if self._running is not None:
+            return
+        if any(id(broker) not in self._waiting and id(broker) not in self._done for broker in self._brokers):
+            return
+
+        now = self.data_source.get_datetime()
+        next_broker, next_datetime = None, None
+        for broker in self._brokers:
+            if id(broker) not in self._waiting:
+                continue
+            new_datetime = self._waiting[id(broker)][0]
+            new_datetime = now if new_datetime is None or new_datetime < now else new_datetime
+            if next_datetime is None or new_datetime < next_datetime:
+                next_broker, next_datetime = broker, new_datetime
+
+        if next_broker is None:
+            return
+
+        _, cash, portfolio_value = self._waiting.pop(id(next_broker))
+        if next_datetime != now:
+            self.data_source._update_datetime(next_datetime, cash=cash, portfolio_value=portfolio_value)
+        self._running = next_broker
+        self._condition.notify_all()
@@ -1,6 +1,6 @@
 import logging
 import traceback
-from collections import OrderedDict, defaultdict
+from collections import defaultdict
 from datetime import date, timedelta
 
 from polygon.exceptions import BadResponse
@@ -23,6 +23,10 @@ class PolygonDataBacktesting(PandasData):
     # Set to None to disable the limit.
     MAX_STORAGE_BYTES = None
 
+    # Read the data evicted because of MAX_STORAGE_BYTES back from the Polygon cache folder when it is
+    # used again, instead of checking it with Polygon and downloading what is missing.
+    RESTORE_EVICTED_DATA = True
+
     def __init__(
         self,
         datetime_start,
@@ -35,35 +39,90 @@ class PolygonDataBacktesting(PandasData):
             datetime_start=datetime_start, datetime_end=datetime_end, pandas_data=pandas_data, api_key=api_key, **kwargs
         )
 
+        # Limit the LRU store of the data to MAX_STORAGE_BYTES, read each time the limit is enforced
+        loader = self._load_cached_data if PolygonDataBacktesting.RESTORE_EVICTED_DATA else None
+        self.pandas_data.loader = loader
+        self.pandas_data.max_bytes = self._get_max_storage_bytes
+
         # RESTClient API for Polygon.io polygon-api-client
         self.polygon_client = PolygonClient.create(api_key=api_key)
 
     @staticmethod
-    def _enforce_storage_limit(pandas_data: OrderedDict):
-        storage_used = sum(data.df.memory_usage().sum() for data in pandas_data.values())
-        logging.info(f"{storage_used = :,} bytes for {len(pandas_data)} items")
-        while storage_used > PolygonDataBacktesting.MAX_STORAGE_BYTES:
-            k, d = pandas_data.popitem(last=False)
-            mu = d.df.memory_usage().sum()
-            storage_used -= mu
-            logging.info(f"Storage limit exceeded. Evicted LRU data: {k} used {mu:,} bytes")
+    def _get_max_storage_bytes():
+        return PolygonDataBacktesting.MAX_STORAGE_BYTES
 
-    def _update_pandas_data(self, asset, quote, length, timestep, start_dt=None):
+    def get_cache_stats(self):
         """
-        Get asset data and update the self.pandas_data dictionary.
+        Returns the counters of the in-memory data store: hits, misses (data downloaded or read from the Polygon
+        cache), evictions, restores of evicted data, and the bytes used.
 
-        Parameters
-        ----------
-        asset : Asset
-            The asset to get data for.
-        quote : Asset
-            The quote asset to use. For example, if asset is "SPY" and quote is "USD", the data will be for "SPY/USD".
-        length : int
-            The number of data points to get.
-        timestep : str
-            The timestep to use. For example, "1minute" or "1hour" or "1day".
-        start_dt : datetime
-            The start datetime to use. If None, the current self.start_datetime will be used.
+        Returns
+        -------
+        dict
+        """
+        return self.pandas_data.stats()
+
+    @staticmethod
+    def _has_enough_data(asset_data, ts_unit, start_datetime):
+        """
+        Checks if the data in the store covers the request.
+
+        Returns
+        -------
+        tuple of (bool, str)
+            Whether the data is enough, and the timestep to download if it isn't.
+        """
+        asset_data_df = asset_data.df
+        data_start_datetime = asset_data_df.index[0]
+
+        # Get the timestep of the data
+        data_timestep = asset_data.timestep
+
+        # If the timestep is the same, we don't need to update the data
+        if data_timestep == ts_unit:
+            # Check if we have enough data (5 days is the buffer we subtracted from the start datetime)
+            if (data_start_datetime - start_datetime) < START_BUFFER:
+                return True, ts_unit
+
+        # Always try to get the lowest timestep possible because we can always resample
+        # If day is requested then make sure we at least have data that's less than a day
+        if ts_unit == "day":
+            if data_timestep == "minute":
+                # Check if we have enough data (5 days is the buffer we subtracted from the start datetime)
+                if (data_start_datetime - start_datetime) < START_BUFFER:
+                    return True, ts_unit
+                else:
+                    # We don't have enough data, so we need to get more (but in minutes)
+                    ts_unit = "minute"
+            elif data_timestep == "hour":
+                # Check if we have enough data (5 days is the buffer we subtracted from the start datetime)
+                if (data_start_datetime - start_datetime) < START_BUFFER:
+                    return True, ts_unit
+                else:
+                    # We don't have enough data, so we need to get more (but in hours)
+                    ts_unit = "hour"
+
+        # If hour is requested then make sure we at least have data that's less than an hour
+        if ts_unit == "hour":
+            if data_timestep == "minute":
+                # Check if we have enough data (5 days is the buffer we subtracted from the start datetime)
+                if (data_start_datetime - start_datetime) < START_BUFFER:
+                    return True, ts_unit
+                else:
+                    # We don't have enough data, so we need to get more (but in minutes)
+                    ts_unit = "minute"
+
+        return False, ts_unit
+
+    def _get_missing_data(self, asset, quote, length, timestep, start_dt=None):
+        """
+        Checks if the data in self.pandas_data covers a request, see _update_pandas_data for the parameters.
+
+        Returns
+        -------
+        tuple or None
+            None if the data is already there, otherwise the (asset, quote, start datetime, timestep) of the data
+            that has to be downloaded.
         """
         search_asset = asset
         asset_separated = asset
@@ -79,49 +138,78 @@ class PolygonDataBacktesting(PandasData):
             length, timestep, start_dt, start_buffer=START_BUFFER
         )
 
-        # Check if we have data for this asset
+        # Check if we have data for this asset, either in memory or evicted (and still in the Polygon cache)
+        if search_asset not in self.pandas_data and self.pandas_data.is_evicted(search_asset):
+            self.pandas_data.restore(search_asset)
         if search_asset in self.pandas_data:
-            asset_data = self.pandas_data[search_asset]
-            asset_data_df = asset_data.df
-            data_start_datetime = asset_data_df.index[0]
+            enough_data, ts_unit = self._has_enough_data(self.pandas_data[search_asset], ts_unit, start_datetime)
+            if enough_data:
+                self.pandas_data.record_hit(search_asset)
+                return None
+        self.pandas_data.record_miss()
 
-            # Get the timestep of the data
-            data_timestep = asset_data.timestep
+        return asset_separated, quote_asset, start_datetime, ts_unit
 
-            # If the timestep is the same, we don't need to update the data
-            if data_timestep == ts_unit:
-                # Check if we have enough data (5 days is the buffer we subtracted from the start datetime)
-                if (data_start_datetime - start_datetime) < START_BUFFER:
-                    return
-
-            # Always try to get the lowest timestep possible because we can always resample
-            # If day is requested then make sure we at least have data that's less than a day
-            if ts_unit == "day":
-                if data_timestep == "minute":
-                    # Check if we have enough data (5 days is the buffer we subtracted from the start datetime)
-                    if (data_start_datetime - start_datetime) < START_BUFFER:
-                        return
-                    else:
-                        # We don't have enough data, so we need to get more (but in minutes)
-                        ts_unit = "minute"
-                elif data_timestep == "hour":
-                    # Check if we have enough data (5 days is the buffer we subtracted from the start datetime)
-                    if (data_start_datetime - start_datetime) < START_BUFFER:
-                        return
-                    else:
-                        # We don't have enough data, so we need to get more (but in hours)
-                        ts_unit = "hour"
-
-            # If hour is requested then make sure we at least have data that's less than an hour
-            if ts_unit == "hour":
-                if data_timestep == "minute":
-                    # Check if we have enough data (5 days is the buffer we subtracted from the start datetime)
-                    if (data_start_datetime - start_datetime) < START_BUFFER:
-                        return
-                    else:
-                        # We don't have enough data, so we need to get more (but in minutes)
-                        ts_unit = "minute"
+    def _prefetch_missing_data(self, assets, quote, length, timestep, start_dt=None):
+        """
+        Downloads the data that is missing for many assets at once, concurrently. Errors are only logged, so that
+        the caller can then download (and report) the data that is still missing one by one.
+
+        Returns
+        -------
+        list of tuple
+            The data that is still missing, as returned by _get_missing_data.
+        """
+        missing = [self._get_missing_data(asset, quote, length, timestep, start_dt) for asset in assets]
+        missing = [missing_data for missing_data in missing if missing_data is not None]
+
+        # A single download doesn't need the thread pool
+        if len(missing) < 2:
+            return missing
+
+        requirements = [
+            (asset_separated, start_datetime, self.datetime_end, ts_unit, quote_asset)
+            for asset_separated, quote_asset, start_datetime, ts_unit in missing
+        ]
+        try:
+            data = polygon_helper.prefetch_price_data_from_polygon(
+                self._api_key, requirements, polygon_client=self.polygon_client
+            )
+        except Exception as e:
+            logging.warning(f"Error prefetching data for {len(requirements)} assets from Polygon: {e}")
+            return missing
+
+        for (asset, quote_asset, ts_unit), df in data.items():
+            self._store_pandas_data(asset, quote_asset, df, ts_unit)
+        return [
+            (asset_separated, quote_asset, start_datetime, ts_unit)
+            for asset_separated, quote_asset, start_datetime, ts_unit in missing
+            if (asset_separated, quote_asset, ts_unit) not in data
+        ]
+
+    def _update_pandas_data(self, asset, quote, length, timestep, start_dt=None):
+        """
+        Get asset data and update the self.pandas_data dictionary.
+
+        Parameters
+        ----------
+        asset : Asset
+            The asset to get data for.
+        quote : Asset
+            The quote asset to use. For example, if asset is "SPY" and quote is "USD", the data will be for "SPY/USD".
+        length : int
+            The number of data points to get.
+        timestep : str
+            The timestep to use. For example, "1minute" or "1hour" or "1day".
+        start_dt : datetime
+            The start datetime to use. If None, the current self.start_datetime will be used.
+        """
+        missing_data = self._get_missing_data(asset, quote, length, timestep, start_dt)
+        if missing_data is not None:
+            self._download_pandas_data(*missing_data)
 
+    def _download_pandas_data(self, asset_separated, quote_asset, start_datetime, ts_unit):
+        """Downloads the data returned by _get_missing_data from Polygon and adds it to self.pandas_data."""
         # Download data from Polygon
         try:
             # Get data from Polygon
@@ -168,16 +256,79 @@ class PolygonDataBacktesting(PandasData):
             logging.error(traceback.format_exc())
             raise Exception("Error getting data from Polygon") from e
 
+        self._store_pandas_data(asset_separated, quote_asset, df, ts_unit)
+
+    @staticmethod
+    def _load_cached_data(asset, quote_asset, ts_unit, datetime_start, datetime_end):
+        """Loads evicted data back from the partitions of the Polygon cache it was saved to, see DataCache."""
+        df = polygon_helper.load_cache_partitions(
+            polygon_helper.build_cache_folder(asset, ts_unit), datetime_start, datetime_end
+        )
+        if df is None:
+            return None
+
+        # Drop the rows with all NaN values that were added to the cache for the missing bars, as when downloading
+        df = df[(df.index >= datetime_start) & (df.index <= datetime_end)].dropna(how="all")
+        if df.empty:
+            return None
+        return Data(asset, df, timestep=ts_unit, quote=quote_asset)
+
+    def _store_pandas_data(self, asset, quote_asset, df, ts_unit):
+        """Adds the data downloaded from Polygon to the self.pandas_data dictionary."""
         if (df is None) or df.empty:
             return
 
-        data = Data(asset_separated, df, timestep=ts_unit, quote=quote_asset)
+        data = Data(asset, df, timestep=ts_unit, quote=quote_asset)
         pandas_data_update = self._set_pandas_data_keys([data])
 
-        # Add the keys to the self.pandas_data dictionary
+        # Add the keys to the self.pandas_data dictionary, evicting the least recently used data if it is full
         self.pandas_data.update(pandas_data_update)
-        if PolygonDataBacktesting.MAX_STORAGE_BYTES:
-            self._enforce_storage_limit(self.pandas_data)
+
+    def prefetch_data(self, assets, timestep="minute", quote=None, length=1, max_workers=8, requests_per_minute=None):
+        """
+        Downloads the data of many assets from Polygon concurrently before the backtest needs it.
+
+        Without prefetching, the data of each asset is downloaded the first time the strategy asks for it, one
+        request at a time. This is typically called from the initialize method of a strategy with all the
+        assets that it is going to trade.
+
+        Parameters
+        ----------
+        assets : list
+            The assets to get data for. Crypto and forex pairs can be given as (asset, quote) tuples.
+        timestep : str
+            The timestep of the data, eg. "minute" or "day".
+        quote : Asset
+            The quote asset of the assets. Defaults to USD.
+        length : int
+            The number of bars needed before the start of the backtest.
+        max_workers : int
+            The number of requests sent to Polygon at the same time.
+        requests_per_minute : float
+            The maximum number of requests sent to Polygon per minute (eg. 5 for the free plan). If None, the
+            requests are not limited.
+        """
+        start_datetime, ts_unit = self.get_start_datetime_and_ts_unit(
+            length, timestep, self.datetime_start, start_buffer=START_BUFFER
+        )
+
+        requirements = []
+        for asset in assets:
+            if isinstance(asset, tuple):
+                asset, quote_asset = asset
+            else:
+                quote_asset = quote if quote is not None else Asset("USD", "forex")
+            requirements.append((asset, start_datetime, self.datetime_end, ts_unit, quote_asset))
+
+        data = polygon_helper.prefetch_price_data_from_polygon(
+            self._api_key,
+            requirements,
+            max_workers=max_workers,
+            requests_per_minute=requests_per_minute,
+            polygon_client=self.polygon_client,
+        )
+        for (asset, quote_asset, ts_unit), df in data.items():
+            self._store_pandas_data(asset, quote_asset, df, ts_unit)
 
     def _pull_source_symbol_bars(
         self,
@@ -199,6 +350,12 @@ class PolygonDataBacktesting(PandasData):
             asset, length, timestep, timeshift, quote, exchange, include_after_hours
         )
 
+    def get_order_fill_bar(self, asset, quote=None):
+        # Get data from Polygon before reading the bar from the data store
+        self._update_pandas_data(asset, quote, 2, self._timestep, self.get_datetime())
+
+        return super().get_order_fill_bar(asset, quote=quote)
+
     # Get pricing data for an asset for the entire backtesting period
     def get_historical_prices_between_dates(
         self,
@@ -232,6 +389,21 @@ class PolygonDataBacktesting(PandasData):
 
         return super().get_last_price(asset=asset, quote=quote, exchange=exchange)
 
+    def get_last_prices(self, assets, quote=None, exchange=None, **kwargs):
+        dt = self.get_datetime()
+
+        # Download the missing data of all the assets (eg. the contracts of an option chain) at once, then what
+        # couldn't be downloaded with the others one by one. The data of each asset is only checked once, so the
+        # cache stats count one hit or miss per asset.
+        for missing_data in self._prefetch_missing_data(assets, quote, 1, "minute", dt):
+            asset, quote_asset = missing_data[:2]
+            try:
+                self._download_pandas_data(*missing_data)
+            except Exception as e:
+                logging.warning(f"Error get_last_price from Polygon: {asset=} {quote_asset=} {dt=} {e}")
+
+        return super().get_last_prices(assets, quote=quote, exchange=exchange, **kwargs)
+
     def get_chains(self, asset: Asset, quote: Asset = None, exchange: str = None):
         """
         Integrates the Polygon client library into the LumiBot backtest for Options Data in the same
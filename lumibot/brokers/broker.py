@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import time
 from abc import ABC, abstractmethod
@@ -15,7 +16,7 @@ from termcolor import colored
 
 from lumibot.data_sources import DataSource
 from lumibot.entities import Asset, Order, Position
-from lumibot.trading_builtins import SafeList
+from lumibot.trading_builtins import AsyncEngine, AsyncQueue, CustomStream, SafeList, TradeEventLog
 
 class CustomLoggerAdapter(logging.LoggerAdapter):
     def process(self, msg, kwargs):
@@ -35,6 +36,15 @@ class Broker(ABC):
     # Metainfo
     IS_BACKTESTING_BROKER = False
 
+    # If True, live brokers run their orders queue and CustomStream on the loop of the shared AsyncEngine and make
+    # their concurrent broker calls on its thread pool, instead of starting threads of their own
+    ASYNC_MODE = False
+
+    # If > 0, StrategyExecutor.sync_broker only reconciles the orders and positions with the broker every
+    # STREAM_SYNC_SECONDS while the stream is connected, and relies on its trade events in between. Use it with
+    # brokers whose stream reports every change of the orders.
+    STREAM_SYNC_SECONDS = 0
+
     # Trading events flags
     NEW_ORDER = "new"
     CANCELED_ORDER = "canceled"
@@ -43,26 +53,51 @@ class Broker(ABC):
     CASH_SETTLED = "cash_settled"
     ERROR_ORDER = "error"
 
+    # Columns of the trade event log
+    TRADE_EVENT_COLUMNS = [
+        "time",
+        "strategy",
+        "exchange",
+        "identifier",
+        "symbol",
+        "side",
+        "type",
+        "status",
+        "price",
+        "filled_quantity",
+        "multiplier",
+        "trade_cost",
+        "time_in_force",
+        "asset.right",
+        "asset.strike",
+        "asset.multiplier",
+        "asset.expiration",
+        "asset.asset_type",
+    ]
+
     def __init__(self, name="", connect_stream=True, data_source: DataSource = None, config=None, max_workers=20):
         """Broker constructor"""
         # Shared Variables between threads
         self.name = name
         self._lock = RLock()
-        self._unprocessed_orders = SafeList(self._lock)
-        self._new_orders = SafeList(self._lock)
-        self._canceled_orders = SafeList(self._lock)
-        self._partially_filled_orders = SafeList(self._lock)
-        self._filled_orders = SafeList(self._lock)
-        self._filled_positions = SafeList(self._lock)
+        # Orders are indexed so that lookups by identifier, strategy and asset don't scan the order history.
+        order_indexes = ["identifier", "strategy", ("strategy", "asset")]
+        self._unprocessed_orders = SafeList(self._lock, index_by=order_indexes)
+        self._new_orders = SafeList(self._lock, index_by=order_indexes)
+        self._canceled_orders = SafeList(self._lock, index_by=order_indexes)
+        self._partially_filled_orders = SafeList(self._lock, index_by=order_indexes)
+        self._filled_orders = SafeList(self._lock, index_by=order_indexes)
+        self._filled_positions = SafeList(self._lock, index_by=["asset"])
         self._subscribers = SafeList(self._lock)
         self._is_stream_subscribed = False
-        self._trade_event_log_df = pd.DataFrame()
+        self._trade_event_log = TradeEventLog(self.TRADE_EVENT_COLUMNS)
         self._hold_trade_events = False
         self._held_trades = []
         self._config = config
         self._strategy_name = ""
         self.data_source = data_source
         self.max_workers = min(max_workers, 200)
+        self.async_engine = AsyncEngine.get() if self.ASYNC_MODE and not self.IS_BACKTESTING_BROKER else None
         self.quote_assets = set()  # Quote positions will never be removed from tracking during sync operations
 
         # Set the the state of first iteration to True. This will later be updated to False by the strategy executor
@@ -74,9 +109,12 @@ class Broker(ABC):
         if self.data_source is None:
             raise ValueError("Broker must have a data source")
 
+        if self.async_engine is not None:
+            self.data_source.async_engine = self.async_engine
+
         # setting the orders queue and threads
         if not self.IS_BACKTESTING_BROKER:
-            self._orders_queue = Queue()
+            self._orders_queue = AsyncQueue() if self.async_engine is not None else Queue()
             self._orders_thread = None
             self._start_orders_thread()
 
@@ -216,11 +254,7 @@ class Broker(ABC):
                 continue
 
             # Check against existing position.
-            position_lumi = [
-                pos_lumi
-                for pos_lumi in self._filled_positions.get_list()
-                if pos_lumi.asset == position.asset
-            ]
+            position_lumi = self._filled_positions.get_by("asset", position.asset)
             position_lumi = position_lumi[0] if len(position_lumi) > 0 else None
 
             if position_lumi:
@@ -243,13 +277,9 @@ class Broker(ABC):
 
         # Now iterate through lumibot positions.
         # Remove lumibot position if not at the broker.
-        for position in self._filled_positions.get_list():
-            found = False
-            for position_broker in positions_broker:
-                if position_broker.asset == position.asset:
-                    found = True
-                    break
-            if not found and (position.asset not in self.quote_assets):
+        assets_broker = {position.asset for position in positions_broker if position is not None}
+        for position in list(self._filled_positions.get_list()):
+            if position.asset not in assets_broker and position.asset not in self.quote_assets:
                 self._filled_positions.remove(position)
 
     # =========Market functions=======================
@@ -484,6 +514,10 @@ class Broker(ABC):
         return sorted(strikes)
 
     def _start_orders_thread(self):
+        if self.async_engine is not None:
+            self.async_engine.submit(self._wait_for_orders_async())
+            return
+
         self._orders_thread = Thread(target=self._wait_for_orders, daemon=True, name=f"{self.name}_orders_thread")
         self._orders_thread.start()
 
@@ -491,29 +525,74 @@ class Broker(ABC):
         while True:
             # at first, block maybe a list of orders or just one order
             block = self._orders_queue.get()
-            if isinstance(block, Order):
-                result = [self._submit_order(block)]
-            else:
-                result = self._submit_orders(block)
-
-            for order in result:
-                if order is None:
-                    continue
-
-                if order.was_transmitted():
-                    flat_orders = self._flatten_order(order)
-                    for flat_order in flat_orders:
-                        self.logger.info(
-                            colored(
-                                f"Order {flat_order} was sent to broker {self.name}",
-                                color="green",
-                            )
+            try:
+                if isinstance(block, Order):
+                    result = [self._submit_order(block)]
+                else:
+                    result = self._submit_orders(block)
+
+                self._register_submitted_orders(result)
+            except Exception:
+                # Keep consuming the queue, and let wait_for_orders_submission return
+                self.logger.exception(f"Error while submitting the orders {block} to broker {self.name}")
+            finally:
+                self._orders_queue.task_done()
+
+    async def _wait_for_orders_async(self):
+        # Same as _wait_for_orders, as a coroutine of the async engine
+        while True:
+            block = await self._orders_queue.get_async()
+            try:
+                if isinstance(block, Order):
+                    result = [await self.async_engine.run_blocking(self._submit_order, block)]
+                else:
+                    result = await asyncio.gather(
+                        *[self.async_engine.run_blocking(self._submit_order, order) for order in block]
+                    )
+
+                await self.async_engine.run_blocking(self._register_submitted_orders, result)
+            except Exception:
+                self.logger.exception(f"Error while submitting the orders {block} to broker {self.name}")
+            finally:
+                self._orders_queue.task_done()
+
+    def _register_submitted_orders(self, result):
+        for order in result:
+            if order is None:
+                continue
+
+            if order.was_transmitted():
+                flat_orders = self._flatten_order(order)
+                for flat_order in flat_orders:
+                    self.logger.info(
+                        colored(
+                            f"Order {flat_order} was sent to broker {self.name}",
+                            color="green",
                         )
-                        self._unprocessed_orders.append(flat_order)
+                    )
+                    self._unprocessed_orders.append(flat_order)
 
-            self._orders_queue.task_done()
+    def wait_for_orders_submission(self, timeout=None):
+        """Waits until the orders put on the orders queue were submitted to the broker.
+
+        Parameters
+        ----------
+        timeout : float
+            The maximum number of seconds to wait. If None, waits until the orders are submitted.
+
+        Returns
+        -------
+        bool
+            False if the timeout expired before the orders were submitted, True otherwise.
+        """
+        orders_queue = self._orders_queue
+        with orders_queue.all_tasks_done:
+            return orders_queue.all_tasks_done.wait_for(lambda: orders_queue.unfinished_tasks == 0, timeout=timeout)
 
     def _submit_orders(self, orders):
+        if self.async_engine is not None:
+            return self.async_engine.map_blocking(self._submit_order, orders)
+
         with ThreadPoolExecutor(
             max_workers=self.max_workers,
             thread_name_prefix=f"{self.name}_submitting_orders",
@@ -637,7 +716,7 @@ class Broker(ABC):
             )
             self._filled_positions.append(position)
         else:
-            position._quantity += quote_quantity
+            position.quantity = position._quantity + quote_quantity
 
     # =========Clock functions=====================
 
@@ -775,8 +854,8 @@ class Broker(ABC):
     def get_tracked_position(self, strategy, asset):
         """get a tracked position given an asset and
         a strategy"""
-        for position in self._filled_positions:
-            if position.asset == asset and (not strategy or position.strategy == strategy):
+        for position in self._filled_positions.get_by("asset", asset):
+            if not strategy or position.strategy == strategy:
                 return position
         return None
 
@@ -785,21 +864,34 @@ class Broker(ABC):
         result = [position for position in self._filled_positions if strategy is None or position.strategy == strategy]
         return result
 
+    def get_tracked_positions_version(self):
+        """Returns a value that changes every time a tracked position is added, removed or changes quantity.
+
+        Returns
+        -------
+        tuple
+        """
+        return self._filled_positions.version, Position._quantity_version
+
     # =========Orders and assets functions=================
 
     def get_tracked_order(self, identifier):
         """get a tracked order given an identifier"""
-        for order in self._tracked_orders:
-            if order.identifier == identifier:
+        for orders in [self._unprocessed_orders, self._new_orders, self._partially_filled_orders]:
+            for order in orders.get_by("identifier", identifier):
                 return order
         return None
 
     def get_tracked_orders(self, strategy=None, asset=None) -> list[Order]:
         """get all tracked orders for a given strategy"""
         result = []
-        for order in self._tracked_orders:
-            if (strategy is None or order.strategy == strategy) and (asset is None or order.asset == asset):
-                result.append(order)
+        for orders in [self._unprocessed_orders, self._new_orders, self._partially_filled_orders]:
+            if strategy is not None and asset is not None:
+                result.extend(orders.get_by(("strategy", "asset"), (strategy, asset)))
+            elif strategy is not None:
+                result.extend(orders.get_by("strategy", strategy))
+            else:
+                result.extend(order for order in orders if asset is None or order.asset == asset)
 
         return result
 
@@ -810,8 +902,12 @@ class Broker(ABC):
 
     def get_order(self, identifier) -> Order:
         """get a tracked order given an identifier"""
-        for order in self.get_all_orders():
-            if order.identifier == identifier:
+        order = self.get_tracked_order(identifier)
+        if order is not None:
+            return order
+
+        for orders in [self._canceled_orders, self._filled_orders]:
+            for order in orders.get_by("identifier", identifier):
                 return order
         return None
 
@@ -903,6 +999,10 @@ class Broker(ABC):
 
     def cancel_orders(self, orders):
         """cancel orders"""
+        if self.async_engine is not None:
+            self.async_engine.map_blocking(self.cancel_order, orders)
+            return
+
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             tasks = []
             for order in orders:
@@ -1037,6 +1137,11 @@ class Broker(ABC):
 
     # ==========Processing streams data=======================
 
+    async def _run_stream_async(self):
+        # Coroutine version of _run_stream for brokers whose stream is a CustomStream, see ASYNC_MODE
+        self._stream_established()
+        await self.stream._run_async(self.async_engine)
+
     def _stream_established(self):
         self._is_stream_subscribed = True
 
@@ -1160,14 +1265,7 @@ class Broker(ABC):
             "asset.expiration": stored_order.asset.expiration,
             "asset.asset_type": stored_order.asset.asset_type,
         }
-        # Create a DataFrame with the new row
-        new_row_df = pd.DataFrame(new_row, index=[0])
-
-        # Filter out empty or all-NA columns from new_row_df
-        new_row_df = new_row_df.dropna(axis=1, how="all")
-
-        # Concatenate the filtered new_row_df with the existing _trade_event_log_df
-        self._trade_event_log_df = pd.concat([self._trade_event_log_df, new_row_df], axis=0)
+        self._trade_event_log.append(new_row)
 
         return
 
@@ -1175,8 +1273,12 @@ class Broker(ABC):
         """Set the asynchronous actions to be executed after
         when events are sent via socket streams"""
         self._register_stream_events()
-        t = Thread(target=self._run_stream, daemon=True, name=f"broker_{self.name}_thread")
-        t.start()
+        if self.async_engine is not None and isinstance(self.stream, CustomStream):
+            self.async_engine.submit(self._run_stream_async())
+        else:
+            # Streams of the broker SDKs (e.g. websockets) run their own connection, so they keep their thread
+            t = Thread(target=self._run_stream, daemon=True, name=f"broker_{self.name}_thread")
+            t.start()
         if not self.IS_BACKTESTING_BROKER:
             self.logger.info(
                 """Waiting for the socket stream connection to be established, 
@@ -1187,8 +1289,27 @@ class Broker(ABC):
                     break
         return
 
+    @property
+    def _trade_event_log_df(self):
+        """DataFrame of all the trade events processed by the broker, built from the trade event log."""
+        return self._trade_event_log.to_df()
+
+    def stream_trade_events(self, folder, file_format="parquet", chunk_size=10000):
+        """Write the trade events to disk in chunks instead of keeping them all in memory.
+
+        Parameters
+        ----------
+        folder : str
+            The folder to write the chunk files to.
+        file_format : str
+            Either "parquet" or "arrow".
+        chunk_size : int
+            The number of trade events per file.
+        """
+        self._trade_event_log.stream_to(folder, file_format=file_format, chunk_size=chunk_size)
+
     def export_trade_events_to_csv(self, filename):
-        if len(self._trade_event_log_df) > 0:
+        if len(self._trade_event_log) > 0:
             output_df = self._trade_event_log_df.set_index("time")
             output_df.to_csv(filename)
 
@@ -1,13 +1,18 @@
+import copy
+import functools
 import logging
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
 
 from lumibot import LUMIBOT_DEFAULT_PYTZ, LUMIBOT_DEFAULT_TIMEZONE
-from lumibot.entities import Asset, AssetsMapping
-from lumibot.tools import black_scholes, create_options_symbol
+from lumibot.entities import Asset, AssetsMapping, Bars
+from lumibot.tools import create_options_symbol
+from lumibot.tools.black_scholes_vectorized import bs_greeks, implied_volatility
+from lumibot.trading_builtins import RequestCache
 
 from .exceptions import UnavailabeTimestep
 
@@ -20,6 +25,13 @@ class DataSource(ABC):
     DEFAULT_TIMEZONE = LUMIBOT_DEFAULT_TIMEZONE
     DEFAULT_PYTZ = LUMIBOT_DEFAULT_PYTZ
 
+    # Number of threads used to query the prices of an option chain, see get_chain_prices
+    CHAIN_QUOTE_WORKERS = 8
+
+    # The AsyncEngine of the broker when it runs in ASYNC_MODE, set by the broker. Concurrent queries then run on
+    # the thread pool of the engine instead of threads of their own.
+    async_engine = None
+
     def __init__(self, api_key=None, delay=None):
         """
 
@@ -35,6 +47,7 @@ class DataSource(ABC):
         self._timestep = None
         self._api_key = api_key
         self._delay = timedelta(minutes=delay) if delay else None
+        self._request_caches = {}
 
     # ========Required Implementations ======================
     @abstractmethod
@@ -328,8 +341,13 @@ class DataSource(ABC):
         # Chunking the assets
         chunks = [assets[i : i + chunk_size] for i in range(0, len(assets), chunk_size)]
 
-        # Initialize ThreadPoolExecutor
         results = {}
+        if self.async_engine is not None:
+            for chunk_result in self.async_engine.map_blocking(process_chunk, chunks):
+                results.update(chunk_result)
+            return results
+
+        # Initialize ThreadPoolExecutor
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # Submit tasks
             futures = [executor.submit(process_chunk, chunk) for chunk in chunks]
@@ -340,6 +358,62 @@ class DataSource(ABC):
 
         return results
 
+    def enable_shared_cache(self, quote_ttl=1.0, bars_ttl=5.0):
+        """
+        Caches the last prices, quotes and historical prices returned by this data source for a few seconds, and
+        coalesces identical requests made at the same time by different threads. Strategies sharing this data source
+        then fetch the data of the symbols they have in common once instead of once per strategy.
+
+        The historical prices are returned as a copy of the cached Bars, so strategies can't modify each other's
+        dataframes. Calling it again only changes the times to live.
+
+        Parameters
+        ----------
+        quote_ttl : float
+            The number of seconds the last prices and quotes are cached.
+        bars_ttl : float
+            The number of seconds the historical prices are cached.
+        """
+        ttls = {"get_last_price": quote_ttl, "get_quote": quote_ttl, "get_historical_prices": bars_ttl}
+        for name, ttl in ttls.items():
+            if name in self._request_caches:
+                self._request_caches[name].ttl = ttl
+                continue
+            method = getattr(self, name, None)
+            if method is None:
+                continue
+            self._request_caches[name] = RequestCache(ttl)
+            setattr(self, name, self._cached_request(method, self._request_caches[name]))
+
+    @staticmethod
+    def _cached_request(method, cache):
+        @functools.wraps(method)
+        def cached_method(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return method(*args, **kwargs)
+
+            result = cache.get(key, lambda: method(*args, **kwargs))
+            if isinstance(result, Bars):
+                result = copy.copy(result)
+                result.df = result.df.copy()
+            return result
+
+        return cached_method
+
+    def get_request_cache_stats(self):
+        """
+        Returns the counters of the caches enabled with enable_shared_cache.
+
+        Returns
+        -------
+        dict
+            The counters of each cached method, keyed by the name of the method.
+        """
+        return {name: cache.stats() for name, cache in self._request_caches.items()}
+
     def get_last_prices(self, assets, quote=None, exchange=None):
         """Takes a list of assets and returns the last known prices"""
 
@@ -418,48 +492,84 @@ class DataSource(ABC):
         if chains is None:
             chains = self.get_chains(asset)
 
-        rows = []
+        # Build the option assets of the chain
+        rights, strikes, opt_assets = [], [], []
         for right in chains["Chains"]:
             for strike in chains["Chains"][right][expiry]:
                 # Skip strikes outside the requested range. Saves querying time.
                 if strike_min and strike < strike_min or strike_max and strike > strike_max:
                     continue
 
-                # Build the option asset and query for the price
-                opt_asset = Asset(
-                    asset.symbol,
-                    asset_type="option",
-                    expiration=expiry_dt,
-                    strike=strike,
-                    right=right,
+                rights.append(right)
+                strikes.append(strike)
+                opt_assets.append(
+                    Asset(
+                        asset.symbol,
+                        asset_type="option",
+                        expiration=expiry_dt,
+                        strike=strike,
+                        right=right,
+                    )
                 )
-                option_symbol = create_options_symbol(opt_asset.symbol, expiry_dt, right, strike)
-                opt_price = self.get_last_price(opt_asset)
-                greeks = self.calculate_greeks(opt_asset, opt_price, underlying_price, risk_free_rate)
-
-                # Build the row. Match the Tradier column naming conventions.
-                row = {
-                    "symbol": option_symbol,
-                    "last": opt_price,
-                    "expiration_date": expiry,
-                    "strike": strike,
-                    "option_type": right,
-                    "underlying": opt_asset.symbol,
-                    "open_interest": 0,
-                    "bid": 0.0,
-                    "ask": 0.0,
-                    "bidsize": 0,
-                    "asksize": 0,
-                    "volume": 0,
-                    "last_volume": 0,
-                    "average_volume": 0,
-                    "type": 'option',
-                }
-                # Add in the greeks. Format: greeks.delta, greeks.theta, etc.
-                row.update({f"greeks.{col}": val for col, val in greeks.items()})
-                rows.append(row)
-
-        return pd.DataFrame(rows).sort_values("strike")
+
+        count = len(opt_assets)
+        if count == 0:
+            return pd.DataFrame()
+
+        # Query the prices of the whole chain at once
+        opt_prices = self.get_chain_prices(opt_assets)
+
+        # Build the columns. Match the Tradier column naming conventions.
+        columns = {
+            "symbol": [create_options_symbol(asset.symbol, expiry_dt, right, strike)
+                       for right, strike in zip(rights, strikes)],
+            "last": opt_prices,
+            "expiration_date": [expiry] * count,
+            "strike": strikes,
+            "option_type": rights,
+            "underlying": [asset.symbol] * count,
+            "open_interest": [0] * count,
+            "bid": [0.0] * count,
+            "ask": [0.0] * count,
+            "bidsize": [0] * count,
+            "asksize": [0] * count,
+            "volume": [0] * count,
+            "last_volume": [0] * count,
+            "average_volume": [0] * count,
+            "type": ['option'] * count,
+        }
+
+        # Add in the greeks, calculated for the whole chain at once. Format: greeks.delta, greeks.theta, etc.
+        greeks = self._calculate_chain_greeks_columns(opt_assets, opt_prices, underlying_price, risk_free_rate)
+        columns.update({f"greeks.{col}": values for col, values in greeks.items()})
+
+        return pd.DataFrame(columns).sort_values("strike")
+
+    def get_chain_prices(self, assets):
+        """
+        Returns the last prices of the option contracts of a chain, in the order of the assets. Backtesting data
+        sources get all the prices with get_last_prices, other data sources query them concurrently with
+        CHAIN_QUOTE_WORKERS threads.
+
+        Parameters
+        ----------
+        assets : list of Asset
+            The option assets.
+
+        Returns
+        -------
+        list of float
+            The price of each option, None if it has no price.
+        """
+        if self.IS_BACKTESTING_DATA_SOURCE or self.CHAIN_QUOTE_WORKERS <= 1 or len(assets) <= 1:
+            prices = self.get_last_prices(assets)
+            return [prices.get(asset) for asset in assets]
+
+        if self.async_engine is not None:
+            return self.async_engine.map_blocking(self.get_last_price, assets)
+
+        with ThreadPoolExecutor(max_workers=min(self.CHAIN_QUOTE_WORKERS, len(assets))) as executor:
+            return list(executor.map(self.get_last_price, assets))
 
     def calculate_greeks(
         self,
@@ -470,13 +580,82 @@ class DataSource(ABC):
         risk_free_rate: float,
     ):
         """Returns Greeks in backtesting."""
-        opt_price = asset_price
-        und_price = underlying_price
+        return self.calculate_chain_greeks([asset], [asset_price], underlying_price, risk_free_rate)[0]
+
+    def calculate_chain_greeks(self, assets, asset_prices, underlying_price: float, risk_free_rate: float):
+        """
+        Calculates the greeks of many options of the same underlying asset at once, for example a whole option
+        chain. The implied volatilities of all the options are solved together with NumPy.
+
+        Parameters
+        ----------
+        assets : list of Asset
+            The option assets.
+        asset_prices : list of float
+            The price of each option. The greeks of options without a price are None.
+        underlying_price : float
+            The price of the underlying asset.
+        risk_free_rate : float
+            The risk-free rate used in interest calculations.
+
+        Returns
+        -------
+        list of dict
+            The greeks of each option, with the same keys as calculate_greeks.
+        """
+        if len(assets) == 0:
+            return []
+
+        columns = self._calculate_chain_greeks_columns(assets, asset_prices, underlying_price, risk_free_rate)
+        return [{key: values[i] for key, values in columns.items()} for i in range(len(assets))]
+
+    def _calculate_chain_greeks_columns(self, assets, asset_prices, underlying_price, risk_free_rate):
+        """Calculates the greeks of calculate_chain_greeks, as one list per greek."""
+        is_call = []
+        for asset in assets:
+            if asset.right.upper() == "CALL":
+                is_call.append(True)
+            elif asset.right.upper() == "PUT":
+                is_call.append(False)
+            else:
+                raise ValueError(f"Invalid option type {asset.right}, cannot get option greeks")
+
+        is_call = np.array(is_call)
+        prices = np.array([np.nan if price is None else float(price) for price in asset_prices])
+        strikes = np.array([float(asset.strike) for asset in assets])
         interest = risk_free_rate * 100
+
+        # Options of a chain share their expiration, so only compute each one once
+        expirations = {}
+        days_to_expiration = np.array(
+            [
+                expirations.setdefault(asset.expiration, self._get_days_to_expiration(asset.expiration))
+                for asset in assets
+            ]
+        )
+
+        iv = implied_volatility(prices, underlying_price, strikes, interest, days_to_expiration, is_call)
+        greeks = bs_greeks(underlying_price, strikes, interest, days_to_expiration, iv, is_call)
+
+        def values(array):
+            return [None if np.isnan(value) else value for value in array.tolist()]
+
+        return dict(
+            implied_volatility=values(iv),
+            delta=values(greeks["delta"]),
+            option_price=values(greeks["option_price"]),
+            pv_dividend=[None] * len(assets),  # (No equiv )
+            gamma=values(greeks["gamma"]),
+            vega=values(greeks["vega"]),
+            theta=values(greeks["theta"]),
+            underlying_price=[underlying_price] * len(assets),
+        )
+
+    def _get_days_to_expiration(self, expiration):
+        """Returns the number of days (with fractional days) until 4pm New York time on the expiration date."""
         current_date = self.get_datetime()
 
         # If asset expiration is a datetime object, convert it to date
-        expiration = asset.expiration
         if isinstance(expiration, datetime):
             expiration = expiration.date()
 
@@ -487,40 +666,7 @@ class DataSource(ABC):
         expiration = expiration.replace(hour=16, minute=0, second=0, microsecond=0)
 
         # Calculate the days to expiration, but allow for fractional days
-        days_to_expiration = (expiration - current_date).total_seconds() / (60 * 60 * 24)
-
-        if asset.right.upper() == "CALL":
-            is_call = True
-            iv = black_scholes.BS(
-                [und_price, float(asset.strike), interest, days_to_expiration],
-                callPrice=opt_price,
-            )
-        elif asset.right.upper() == "PUT":
-            is_call = False
-            iv = black_scholes.BS(
-                [und_price, float(asset.strike), interest, days_to_expiration],
-                putPrice=opt_price,
-            )
-        else:
-            raise ValueError(f"Invalid option type {asset.right}, cannot get option greeks")
-
-        c = black_scholes.BS(
-            [und_price, float(asset.strike), interest, days_to_expiration],
-            volatility=iv.impliedVolatility,
-        )
-
-        greeks = dict(
-            implied_volatility=iv.impliedVolatility,
-            delta=c.callDelta if is_call else c.putDelta,
-            option_price=c.callPrice if is_call else c.putPrice,
-            pv_dividend=None,  # (No equiv )
-            gamma=c.gamma,
-            vega=c.vega,
-            theta=c.callTheta if is_call else c.putTheta,
-            underlying_price=und_price,
-        )
-
-        return greeks
+        return (expiration - current_date).total_seconds() / (60 * 60 * 24)
 
     def query_greeks(self, asset):
         """Query for the Greeks as it can be more accurate than calculating locally."""
@@ -1,34 +1,144 @@
 import logging
+import os
+import threading
 from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
+from lumibot import LUMIBOT_CACHE_FOLDER
 from lumibot.data_sources import DataSourceBacktesting
-from lumibot.entities import Asset, AssetsMapping, Bars
+from lumibot.entities import Asset, AssetsMapping, Bars, Data
+from lumibot.tools import data_snapshot
+from lumibot.trading_builtins import DataCache
+
+# Default quote of the data store keys
+USD = Asset.intern(Asset("USD", "forex"))
 
 
 class PandasData(DataSourceBacktesting):
     """
     PandasData is a Backtesting-only DataSource that uses a Pandas DataFrame (read from CSV) as the source of
     data for a backtest run. It is not possible to use this class to run a live trading strategy.
+
+    With ``use_snapshot=True``, the data aligned by ``load_data`` is saved in a snapshot in ``SNAPSHOT_FOLDER``,
+    keyed by the content of the data, the backtesting dates and the timestep. The next backtests on the same data
+    load the snapshot instead of aligning the data again. Only the ``MAX_SNAPSHOTS`` most recently used snapshots are
+    kept (all of them if it is None), the folder can also be deleted by hand at any time.
+
+    With ``lazy_load=True``, ``load_data`` only builds the date index, and each data is aligned on it the first time
+    it is used, so the data of assets the strategy never trades is never aligned. With ``warm_up=True`` as well, the
+    data not used yet is aligned on a background thread, see ``start_warm_up``.
     """
 
+    SNAPSHOT_FOLDER = os.path.join(LUMIBOT_CACHE_FOLDER, "pandas_data_snapshots")
+    MAX_SNAPSHOTS = 10
+
     SOURCE = "PANDAS"
     TIMESTEP_MAPPING = [
         {"timestep": "day", "representations": ["1D", "day"]},
         {"timestep": "minute", "representations": ["1M", "minute"]},
     ]
 
-    def __init__(self, *args, pandas_data=None, auto_adjust=True, **kwargs):
+    def __init__(
+        self, *args, pandas_data=None, auto_adjust=True, use_snapshot=False, lazy_load=False, warm_up=False, **kwargs
+    ):
         super().__init__(*args, **kwargs)
+        if use_snapshot and lazy_load:
+            raise ValueError("A snapshot holds all the aligned data, use_snapshot and lazy_load can't be used together")
+
         self.name = "pandas"
-        self.pandas_data = self._set_pandas_data_keys(pandas_data)
+        # The version of the store tells _get_price_snapshot when the data changed
+        self.pandas_data = DataCache(self._set_pandas_data_keys(pandas_data))
         self.auto_adjust = auto_adjust
+        self.use_snapshot = use_snapshot
+        self.lazy_load = lazy_load
+        self.warm_up = warm_up
         self._data_store = self.pandas_data
         self._date_index = None
         self._date_supply = None
         self._timestep = "minute"
 
+        # Keys of the data not aligned on the date index yet in lazy mode, see _get_data
+        self._unaligned = set()
+        self._date_index_datetimes = None
+        self._align_lock = threading.Lock()
+
+        # Open prices of every asset in the data store at one datetime, see _get_price_snapshot
+        self._snapshot_signature = None
+        self._snapshot_positions = {}
+        self._snapshot_aligned = None
+        self._snapshot_dt = None
+        self._snapshot_prices = None
+
+    @classmethod
+    def from_directory(
+        cls,
+        directory,
+        datetime_start,
+        datetime_end,
+        timestep="minute",
+        quote=None,
+        asset_type="stock",
+        lookback=None,
+        data_kwargs=None,
+        max_workers=None,
+        **kwargs,
+    ):
+        """Creates a PandasData with the data of every CSV and Parquet file of a directory.
+
+        Each file holds the data of one asset, named after the file (eg. ``SPY.csv`` or ``SPY.parquet``), and is
+        read with ``Data.from_csv`` or ``Data.from_parquet``. The files are read in parallel, and only the rows
+        between the backtesting dates (minus ``lookback``) are kept.
+
+        To backtest with ``run_backtest``, pass the ``pandas_data`` of the data source as its ``pandas_data``.
+
+        Parameters
+        ----------
+        directory : str or Path
+            The directory of the files.
+        datetime_start : datetime.datetime
+            The start of the backtest.
+        datetime_end : datetime.datetime
+            The end of the backtest.
+        timestep : str
+            The timestep of the data, "minute" or "day".
+        quote : Asset
+            The quote asset of the data.
+        asset_type : str
+            The type of the assets.
+        lookback : datetime.timedelta
+            How long before datetime_start the data is kept, for the bars the strategy requests at the start. If
+            None, all the data before datetime_start is kept.
+        data_kwargs : dict
+            Other arguments of ``Data``, eg. ``compact`` or ``trading_hours_start``.
+        max_workers : int
+            The number of files read at the same time.
+        **kwargs
+            The other arguments of PandasData.
+
+        Returns
+        -------
+        PandasData
+        """
+        readers = {".csv": Data.from_csv, ".parquet": Data.from_parquet}
+        files = sorted(path for path in Path(directory).iterdir() if path.suffix.lower() in readers)
+        if not files:
+            raise ValueError(f"There are no CSV or Parquet files in {directory}")
+
+        date_start = datetime_start - lookback if lookback is not None else None
+        data_kwargs = dict(data_kwargs or {}, timestep=timestep, quote=quote)
+
+        def read(path):
+            asset = Asset(symbol=path.stem, asset_type=asset_type)
+            return readers[path.suffix.lower()](path, asset, date_start=date_start, date_end=datetime_end, **data_kwargs)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pandas_data = list(executor.map(read, files))
+        return cls(datetime_start, datetime_end, pandas_data=pandas_data, **kwargs)
+
     @staticmethod
     def _set_pandas_data_keys(pandas_data):
         # OrderedDict tracks the LRU dataframes for when it comes time to do evictions.
@@ -51,32 +161,126 @@ class PandasData(DataSourceBacktesting):
         # Check if pandas_data is a dictionary
         if isinstance(pandas_data, dict):
             for k, data in pandas_data.items():
-                key = _get_new_pandas_data_key(data)
+                key = Asset.intern(_get_new_pandas_data_key(data))
                 new_pandas_data[key] = data
 
         # Check if pandas_data is a list
         elif isinstance(pandas_data, list):
             for data in pandas_data:
-                key = _get_new_pandas_data_key(data)
+                key = Asset.intern(_get_new_pandas_data_key(data))
                 new_pandas_data[key] = data
 
         return new_pandas_data
     
     def load_data(self):
         self._data_store = self.pandas_data
-        self._date_index = self.update_date_index()
-
         if len(self._data_store.values()) > 0:
             self._timestep = list(self._data_store.values())[0].timestep
 
+        if not self.use_snapshot or len(self._data_store) == 0:
+            return self._align_data()
+
+        datas = list(self._data_store.values())
+        key = data_snapshot.build_snapshot_key(datas, self.datetime_start, self.datetime_end, self._timestep)
+        snapshot_folder = os.path.join(self.SNAPSHOT_FOLDER, key)
+
+        snapshot = data_snapshot.load_snapshot(snapshot_folder, len(datas))
+        if snapshot is not None:
+            self._date_index, pcal, dfs = snapshot
+            datetimes = self._date_index.to_numpy()
+            for data, df in zip(datas, dfs):
+                # The index of each data is a slice of the global index, see Data.repair_times_and_fill
+                start = self._date_index.searchsorted(data.datetime_start, side="left")
+                end = self._date_index.searchsorted(data.datetime_end, side="right")
+                if end - start != len(df):
+                    break
+                df.index = self._date_index[start:end]
+                data.set_repaired_df(df, datetimes=datetimes[start:end])
+            else:
+                return pcal
+            logging.warning(f"The data snapshot {snapshot_folder} doesn't match the data, it will be aligned again")
+
+        pcal = self._align_data()
+        try:
+            # The dataframes of compact data are rebuilt one at a time, and dropped once they are saved
+            data_snapshot.save_snapshot(snapshot_folder, self._date_index, pcal, (data.df for data in datas))
+        except (OSError, ValueError, TypeError) as e:
+            logging.warning(f"Could not save the data snapshot {snapshot_folder}: {e}")
+        if self.MAX_SNAPSHOTS is not None:
+            data_snapshot.prune_snapshots(self.SNAPSHOT_FOLDER, self.MAX_SNAPSHOTS)
+        return pcal
+
+    def _align_data(self):
+        # Merges the indexes of the data, keeps the trading times and reindexes every data on the result
+        self._date_index = self.update_date_index()
+
         pcal = self.get_trading_days_pandas()
         self._date_index = self.clean_trading_times(self._date_index, pcal)
+
+        # The datetimes of the index are only converted to an array once, and shared by all the data
+        datetimes = self._date_index.to_numpy()
+        if self.lazy_load:
+            self._date_index_datetimes = datetimes
+            self._unaligned = set(self._data_store.keys())
+            if self.warm_up:
+                self.start_warm_up()
+            return pcal
+
         for _, data in self._data_store.items():
-            data.repair_times_and_fill(self._date_index)
+            data.repair_times_and_fill(self._date_index, datetimes=datetimes)
         return pcal
 
+    def _get_data(self, key):
+        """Returns the data of a key of the data store, aligning it on the date index first in lazy mode."""
+        data = self._data_store[key]
+        if key in self._unaligned:
+            self._align(key, data)
+        return data
+
+    def _align(self, key, data):
+        with self._align_lock:
+            # The key is only removed once the data is aligned, so the data is never used half aligned
+            if key in self._unaligned:
+                data.repair_times_and_fill(self._date_index, datetimes=self._date_index_datetimes)
+                self._unaligned.discard(key)
+
+    def start_warm_up(self, assets=None):
+        """Aligns the data not aligned yet in lazy mode on a background thread.
+
+        Data used by the strategy before the thread gets to it is aligned right away as usual.
+
+        Parameters
+        ----------
+        assets : list of Asset or tuple
+            The assets (or ``(asset, quote)`` tuples) whose data is aligned, in this order. If None, all the data
+            not aligned yet, in the order of the data store.
+
+        Returns
+        -------
+        threading.Thread
+            The thread aligning the data.
+        """
+        if assets is None:
+            keys = [key for key in self._data_store.keys() if key in self._unaligned]
+        else:
+            keys = [self.find_asset_in_data_store(asset) for asset in assets]
+            keys = [key for key in keys if key in self._unaligned]
+
+        def warm_up():
+            for key in keys:
+                if key in self._unaligned:
+                    self._align(key, self._data_store[key])
+
+        thread = threading.Thread(target=warm_up, daemon=True, name="pandas_data_warm_up")
+        thread.start()
+        return thread
+
     def clean_trading_times(self, dt_index, pcal):
         # Used to fill in blanks in the data, on trading days, within market trading hours.
+        result_index = self._clean_trading_times_vectorized(dt_index, pcal)
+        if result_index is not None:
+            return result_index
+
         df = pd.DataFrame(range(len(dt_index)), index=dt_index)
         df = df.sort_index()
         df["dates"] = df.index.date
@@ -88,6 +292,48 @@ class PandasData(DataSourceBacktesting):
             result_index = df.index
         return result_index
 
+    def _clean_trading_times_vectorized(self, dt_index, pcal):
+        """Same as clean_trading_times, with array lookups instead of a merge and a 1 minute asfreq of a DataFrame.
+
+        Returns None for the inputs it doesn't handle (eg. an index with duplicates or a calendar indexed by something
+        else than dates), which clean_trading_times then handles as before.
+        """
+        if not isinstance(dt_index, pd.DatetimeIndex) or len(dt_index) == 0:
+            return None
+        if pcal.index.dtype != object or not pcal.index.is_unique:
+            return None
+
+        dt_index = dt_index.sort_values()
+        if self._timestep == "minute" and not dt_index.is_unique:
+            return None
+
+        # Keep the datetimes on the days of the calendar, and get the row of their day in the calendar
+        local_dt = dt_index.tz_localize(None) if dt_index.tz is not None else dt_index
+        try:
+            calendar_days = pd.DatetimeIndex(pcal.index)
+        except (TypeError, ValueError):
+            return None
+        day_rows = calendar_days.get_indexer(local_dt.normalize())
+        on_calendar = day_rows >= 0
+        kept = dt_index[on_calendar]
+        if self._timestep != "minute" or len(kept) == 0:
+            return kept
+        day_rows = day_rows[on_calendar]
+
+        # Every minute from the first to the last datetime, in the session of the last datetime before it (like
+        # asfreq(method="pad") does), kept if it's within that session.
+        kept_ns = kept.as_unit("ns").asi8
+        grid = np.arange(kept_ns[0], kept_ns[-1] + 1, 60_000_000_000, dtype=np.int64)
+        previous_rows = day_rows[np.searchsorted(kept_ns, grid, side="right") - 1]
+        market_open = pd.DatetimeIndex(pcal["market_open"]).as_unit("ns").asi8[previous_rows]
+        market_close = pd.DatetimeIndex(pcal["market_close"]).as_unit("ns").asi8[previous_rows]
+        in_session = (grid >= market_open) & (grid <= market_close)
+
+        result_index = pd.DatetimeIndex(grid[in_session].view("M8[ns]"), name=dt_index.name)
+        if dt_index.tz is not None:
+            result_index = result_index.tz_localize("UTC").tz_convert(dt_index.tz)
+        return result_index
+
     def get_trading_days_pandas(self):
         pcal = pd.DataFrame(self._date_index)
 
@@ -149,13 +395,8 @@ class PandasData(DataSourceBacktesting):
             return [asset for asset in store_assets if (asset.symbol == symbol and asset.asset_type == asset_type)]
 
     def update_date_index(self):
-        dt_index = None
-        for asset, data in self._data_store.items():
-            if dt_index is None:
-                df = data.df
-                dt_index = df.index
-            else:
-                dt_index = dt_index.join(data.df.index, how="outer")
+        indexes = [data.df.index for data in self._data_store.values()]
+        dt_index = self._merge_indexes(indexes) if indexes else None
 
         if dt_index is None:
             # Build a dummy index
@@ -178,12 +419,27 @@ class PandasData(DataSourceBacktesting):
 
         return dt_index
 
+    @staticmethod
+    def _merge_indexes(indexes):
+        """Sorted union of the datetime indexes of the data.
+
+        The indexes are joined two by two, then the results two by two, and so on, so each datetime goes through
+        about log2(len(indexes)) joins instead of one join per index when joining them one after the other.
+        """
+        indexes = list(indexes)
+        while len(indexes) > 1:
+            merged = [indexes[i].join(indexes[i + 1], how="outer") for i in range(0, len(indexes) - 1, 2)]
+            if len(indexes) % 2:
+                merged.append(indexes[-1])
+            indexes = merged
+        return indexes[0]
+
     def get_last_price(self, asset, quote=None, exchange=None):
         # Takes an asset and returns the last known price
         tuple_to_find = self.find_asset_in_data_store(asset, quote)
 
         if tuple_to_find in self._data_store:
-            data = self._data_store[tuple_to_find]
+            data = self._get_data(tuple_to_find)
             try:
                 dt = self.get_datetime()
                 price = data.get_last_price(dt)
@@ -201,20 +457,196 @@ class PandasData(DataSourceBacktesting):
             return None
 
     def get_last_prices(self, assets, quote=None, exchange=None, **kwargs):
+        """Returns the last known prices of the assets.
+
+        The prices are read from a snapshot of every asset in the data store at the current
+        datetime (see ``_get_price_snapshot``) instead of being looked up one asset at a time.
+
+        Parameters
+        ----------
+        assets : list of Asset or tuple
+            The assets (or ``(asset, quote)`` tuples) to get the prices for.
+        quote : Asset
+            The quote asset of the assets.
+        exchange : str
+            Not used by this data source.
+
+        Returns
+        -------
+        dict
+            The last price of each asset, ``None`` if the asset has no price at the current datetime.
+        """
+        keys = [self.find_asset_in_data_store(asset, quote) for asset in assets]
+        if self._unaligned:
+            for key in keys:
+                if key in self._unaligned:
+                    self._get_data(key)
+
+        positions, prices = self._get_price_snapshot()
+
         result = {}
-        for asset in assets:
-            result[asset] = self.get_last_price(asset, quote=quote, exchange=exchange)
+        for asset, key in zip(assets, keys):
+            position = positions.get(key)
+            if position is None or np.isnan(prices[position]):
+                result[asset] = None
+            else:
+                result[asset] = prices[position]
         return result
 
+    def _build_price_snapshot(self):
+        """Prepares the snapshot of the data store for _get_price_snapshot.
+
+        Data that was aligned to the date index in ``load_data`` is a contiguous slice of the date
+        index, so its row at any datetime is the row of the date index minus the position of its
+        first row. The open prices of this data are copied into one array so that all of them can
+        be gathered at once. Any other data (for example data added to the store during the
+        backtest) is looked up on its own. Data not aligned yet in lazy mode has no price.
+        """
+        datas = list(self._data_store.values())
+        self._snapshot_positions = {key: position for position, key in enumerate(self._data_store.keys())}
+        unaligned = {self._snapshot_positions[key] for key in set(self._unaligned)}
+
+        date_index_ns = None if self._date_index is None else self._date_index.asi8
+        aligned, offsets, lengths, opens = [], [], [], []
+        for position, data in enumerate(datas):
+            if position in unaligned:
+                continue
+            index_ns = getattr(data, "_iter_index_ns", None)
+            if date_index_ns is None or index_ns is None or len(index_ns) == 0 or "open" not in data.datalines:
+                continue
+            offset = int(np.searchsorted(date_index_ns, index_ns[0]))
+            if not np.array_equal(date_index_ns[offset:offset + len(index_ns)], index_ns):
+                continue
+            aligned.append(position)
+            offsets.append(offset)
+            lengths.append(len(index_ns))
+            # Float32 opens of compact data stay float32 unless the store mixes them with float64 ones
+            dataline = np.asarray(data.datalines["open"].dataline)
+            opens.append(dataline if dataline.dtype.kind == "f" else dataline.astype(np.float64))
+
+        others = sorted(set(range(len(datas))) - set(aligned) - unaligned)
+        aligned = np.array(aligned, dtype=np.int64)
+        lengths = np.array(lengths, dtype=np.int64)
+        self._snapshot_aligned = {
+            "positions": aligned,
+            "offsets": np.array(offsets, dtype=np.int64),
+            "last_rows": np.cumsum(lengths) - 1,
+            "first_rows": np.cumsum(lengths) - lengths,
+            "opens": np.concatenate(opens) if opens else np.empty(0),
+            "others": others,
+            "datas": datas,
+        }
+
+    def _get_price_snapshot(self):
+        """Returns the open price of every asset in the data store at the current datetime.
+
+        The snapshot is filled once per datetime: the date index is searched once and the rows of
+        all the aligned data are computed and gathered with NumPy. It is rebuilt when the data
+        store or the date index change.
+
+        Returns
+        -------
+        tuple of (dict, numpy.ndarray)
+            The position of each data store key in the prices, and the prices (NaN if there is no
+            price for the asset at the current datetime).
+        """
+        # The order of the store doesn't matter, so an LRU store can reorder it without a rebuild
+        signature = (
+            id(self._date_index),
+            id(self._data_store),
+            self._data_store.version,
+            len(self._unaligned),
+        )
+        if signature != self._snapshot_signature:
+            self._build_price_snapshot()
+            self._snapshot_signature = signature
+            self._snapshot_dt = None
+
+        dt = self.get_datetime()
+        if self._snapshot_dt is not None and dt == self._snapshot_dt:
+            return self._snapshot_positions, self._snapshot_prices
+
+        snapshot = self._snapshot_aligned
+        prices = np.full(len(snapshot["datas"]), np.nan)
+
+        if len(snapshot["positions"]) > 0:
+            # Row of the last date at or before dt, for all the aligned data at once
+            date_row = np.searchsorted(self._date_index.asi8, pd.Timestamp(dt).value, side="right") - 1
+            rows = snapshot["first_rows"] + date_row - snapshot["offsets"]
+            has_price = rows >= snapshot["first_rows"]
+            rows = np.minimum(rows, snapshot["last_rows"])
+            prices[snapshot["positions"][has_price]] = snapshot["opens"][rows[has_price]]
+
+        for position in snapshot["others"]:
+            data = snapshot["datas"][position]
+            try:
+                price = data.get_last_price(dt)
+            except Exception as e:
+                logging.info(f"Error getting last price for {data.asset}: {e}")
+                continue
+            if price is not None and not pd.isna(price):
+                prices[position] = price
+
+        self._snapshot_dt = dt
+        self._snapshot_prices = prices
+        return self._snapshot_positions, prices
+
+    def get_order_fill_bar(self, asset, quote=None):
+        """Returns the bar that pending orders for an asset are evaluated against in backtesting.
+
+        This is the bar at the current datetime, or the next one if there is no bar exactly at
+        the current datetime. Minute data is read directly from the datalines, anything else
+        falls back to resampling the last two bars with ``get_historical_prices``.
+
+        Parameters
+        ----------
+        asset : Asset or tuple
+            The asset (or ``(asset, quote)`` tuple for crypto) of the order.
+        quote : Asset
+            The quote asset of the order.
+
+        Returns
+        -------
+        dict or None
+            Dictionary with the ``datetime``, ``open``, ``high``, ``low``, ``close`` and ``volume``
+            of the bar, or ``None`` if there is no data for the asset.
+        """
+        asset_to_find = self.find_asset_in_data_store(asset, quote)
+        if self._timestep == "minute" and asset_to_find in self._data_store:
+            bar = self._get_data(asset_to_find).get_current_bar(self.get_datetime())
+            if bar is not None:
+                return bar
+
+        # This is a hack to get around the fact that we need to get the previous day's data to prevent lookahead bias.
+        ohlc = self.get_historical_prices(asset, 2, quote=quote, timeshift=-2, timestep=self._timestep)
+        if ohlc is None:
+            return None
+
+        df_original = ohlc.df
+
+        # Make sure that we are only getting the prices for the current time exactly or in the future
+        df = df_original[df_original.index >= self.get_datetime()]
+
+        # If the dataframe is empty, then we should get the last row of the original dataframe
+        # because it is the best data we have
+        if df.empty:
+            df = df_original.iloc[-1:]
+
+        bar = {"datetime": df.index[0]}
+        for column in ["open", "high", "low", "close", "volume"]:
+            bar[column] = df[column].iloc[0]
+        return bar
+
     def find_asset_in_data_store(self, asset, quote=None):
+        # The keys of the data store are interned, the interned key is found by identity by the next lookups
         if asset in self._data_store:
-            return asset
+            return Asset.intern(asset)
         elif quote is not None:
-            asset = (asset, quote)
+            asset = Asset.intern((asset, quote))
             if asset in self._data_store:
                 return asset
         elif isinstance(asset, Asset) and asset.asset_type in ["option", "future", "stock", "index"]:
-            asset = (asset, Asset("USD", "forex"))
+            asset = Asset.intern((asset, USD))
             if asset in self._data_store:
                 return asset
         return None
@@ -241,14 +673,14 @@ class PandasData(DataSourceBacktesting):
         asset_to_find = self.find_asset_in_data_store(asset, quote)
 
         if asset_to_find in self._data_store:
-            data = self._data_store[asset_to_find]
+            data = self._get_data(asset_to_find)
         else:
             logging.warning(f"The asset: `{asset}` does not exist or does not have data.")
             return
 
         now = self.get_datetime()
         try:
-            res = data.get_bars(now, length=length, timestep=timestep, timeshift=timeshift)
+            res = data.get_bars_view(now, length=length, timestep=timestep, timeshift=timeshift)
         # Return None if data.get_bars returns a ValueError
         except ValueError as e:
             logging.info(f"Error getting bars for {asset}: {e}")
@@ -271,7 +703,7 @@ class PandasData(DataSourceBacktesting):
         asset_to_find = self.find_asset_in_data_store(asset, quote)
 
         if asset_to_find in self._data_store:
-            data = self._data_store[asset_to_find]
+            data = self._get_data(asset_to_find)
         else:
             logging.warning(f"The asset: `{asset}` does not exist or does not have data.")
             return
@@ -1,6 +1,6 @@
 from .asset import Asset, AssetsMapping
 from .bar import Bar
-from .bars import Bars
+from .bars import Bars, BarsView
 from .data import Data
 from .dataline import Dataline
 from .order import Order
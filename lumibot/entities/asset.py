@@ -1,4 +1,6 @@
+import copy
 import logging
+import threading
 from collections import UserDict
 from datetime import date, datetime
 
@@ -128,6 +130,9 @@ class Asset:
     # Pull the rights from the OptionRight class
     _right: list = [v for k, v in OptionRight.__dict__.items() if not k.startswith("__")]
 
+    # Hash of the interned assets, see Asset.intern
+    _hash: int = None
+
     def __init__(
         self,
         symbol: str,
@@ -201,7 +206,49 @@ class Asset:
             logging.info(f"Unknown symbol asset type {symbol_info['type']}, defaulting to stock.")
             return Asset(symbol=symbol)
 
+    @classmethod
+    def intern(cls, asset):
+        """
+        Returns the shared instance of the asset. All the assets that are equal (and have the same multiplier,
+        precision and underlying asset) share the same instance, which has a precomputed hash and is faster to use
+        as a dict key (the dict finds it by identity). The shared instance is a copy of the first asset that is
+        interned, the asset passed in is never modified. An asset equal to the shared instance but with another
+        multiplier, precision or underlying asset is returned as is.
+
+        The symbol, asset type, expiration, strike and right of the shared instance must not be changed, make a
+        copy of it instead.
+
+        Parameters
+        ----------
+        asset : Asset or tuple
+            The asset, or an ``(asset, quote)`` tuple in which case the tuple is interned too.
+
+        Returns
+        -------
+        Asset or tuple
+            The shared instance.
+        """
+        return _registry.intern(asset)
+
+    @classmethod
+    def clear_interned(cls):
+        """
+        Forgets all the interned assets, eg. between backtests of a long running process that go through many
+        different assets (like option contracts). The assets interned before still work, but they are not shared
+        with the assets interned after.
+        """
+        _registry.clear()
+
+    def __getstate__(self):
+        # Hashes of strings are only valid in this process
+        state = self.__dict__.copy()
+        state.pop("_hash", None)
+        return state
+
     def __hash__(self):
+        # Interned assets have their hash precomputed
+        if self._hash is not None:
+            return self._hash
         return hash((self.symbol, self.asset_type, self.expiration, self.strike, self.right))
 
     def __repr__(self):
@@ -221,6 +268,10 @@ class Asset:
             return f"{self.symbol}"
 
     def __eq__(self, other):
+        # Interned assets are the same instance
+        if self is other:
+            return True
+
         # Check if other is None
         if other is None:
             return False
@@ -275,6 +326,64 @@ class Asset:
         return True
 
 
+class AssetRegistry:
+    """
+    Flyweight registry of assets. Equal assets are mapped to a single shared instance that has a precomputed
+    hash, see Asset.intern.
+    """
+
+    def __init__(self):
+        self._assets = {}
+        self._pairs = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._assets)
+
+    def intern(self, asset):
+        if isinstance(asset, tuple):
+            pair = self._pairs.get(asset)
+            if pair is not None and all(shared is item for shared, item in zip(pair, asset)):
+                return pair
+
+            items = tuple(self.intern(item) for item in asset)
+            # An item that isn't shared (see below) can't be part of a shared pair
+            if any(isinstance(item, Asset) and self._assets.get(item) is not item for item in items):
+                return items
+            with self._lock:
+                return self._pairs.setdefault(items, items)
+
+        if not isinstance(asset, Asset):
+            return asset
+
+        shared = self._assets.get(asset)
+        if shared is None:
+            with self._lock:
+                shared = self._assets.get(asset)
+                if shared is None:
+                    # The copy doesn't have the hash of the asset, see Asset.__getstate__
+                    shared = copy.copy(asset)
+                    shared._hash = hash(shared)
+                    self._assets[shared] = shared
+
+        # The fields that are not compared by Asset.__eq__ must match too
+        if shared is not asset and (
+            shared.multiplier != asset.multiplier
+            or shared.precision != asset.precision
+            or shared.underlying_asset != asset.underlying_asset
+        ):
+            return asset
+        return shared
+
+    def clear(self):
+        with self._lock:
+            self._assets.clear()
+            self._pairs.clear()
+
+
+_registry = AssetRegistry()
+
+
 class AssetsMapping(UserDict):
     def __init__(self, mapping):
         UserDict.__init__(self, mapping)
@@ -294,6 +403,6 @@ class AssetsMapping(UserDict):
 
     def __setitem__(self, key, value):
         if isinstance(key, str):
-            self.data[Asset(symbol=key)] = value
+            self.data[Asset.intern(Asset(symbol=key))] = value
         else:
-            self.data[key] = value
+            self.data[Asset.intern(key)] = value
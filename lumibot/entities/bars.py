@@ -1,6 +1,7 @@
 import logging
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
 from .bar import Bar
@@ -99,9 +100,14 @@ class Bars:
         df columns: open, high, low, close, volume, dividend, stock_splits
         df index: pd.Timestamp localized at the timezone America/New_York
         """
-        if df.shape[0] == 0:
+        if len(df) == 0:
             logging.warning(f"Unable to get bar data for {asset} {source}")
-        self.df = df
+        if isinstance(df, BarsView):
+            self._view = df
+            self._df = None
+        else:
+            self._view = None
+            self._df = df
         self.source = source.upper()
         self.asset = asset
         if isinstance(asset, tuple):
@@ -111,6 +117,36 @@ class Bars:
         self.quote = quote
         self._raw = raw
 
+    @property
+    def df(self):
+        # Bars created from a BarsView only build their dataframe when it is needed
+        if self._df is None:
+            self._df = self._view.df
+        return self._df
+
+    @df.setter
+    def df(self, value):
+        self._df = value
+        self._view = None
+
+    @property
+    def view(self):
+        """Read-only numpy view of the open, high, low, close and volume of the bars.
+
+        Returns
+        -------
+        BarsView
+
+        Example
+        -------
+        >>> bars = self.get_historical_prices("SPY", 20, "minute")
+        >>> closes = bars.view.close
+        >>> sma = closes[-20:].mean()
+        """
+        if self._view is None:
+            self._view = BarsView.from_df(self._df)
+        return self._view
+
     def __repr__(self):
         return repr(self.df)
 
@@ -171,6 +207,8 @@ class Bars:
         float
 
         """
+        if self._view is not None:
+            return self._view.close[-1]
         return self.df["close"].iloc[-1]
 
     def get_last_dividend(self):
@@ -297,6 +335,81 @@ class Bars:
         return new_bars
 
 
+class BarsView:
+    """Read-only window of bars backed directly by numpy arrays.
+
+    The arrays are views on the datalines of a ``Data`` object, so creating a
+    ``BarsView`` doesn't copy any data. The dataframe is only built the first
+    time ``df`` is accessed.
+
+    Parameters
+    ----------
+    index : pandas.DatetimeIndex
+        The datetimes of the bars.
+    columns : dict
+        Dictionary of column name to numpy array, one value per bar.
+
+    Example
+    -------
+    >>> view = data.get_bars_view(dt, length=20)
+    >>> view.close[-5:]
+    >>> view.df
+    """
+
+    def __init__(self, index, columns):
+        self.index = index
+        self._columns = {}
+        for name, values in columns.items():
+            values = values.view()
+            values.flags.writeable = False
+            self._columns[name] = values
+        self._df = None
+
+    @classmethod
+    def from_df(cls, df):
+        """Creates a BarsView on the columns of a dataframe."""
+        view = cls(df.index, {column: df[column].to_numpy() for column in df.columns})
+        view._df = df
+        return view
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, column):
+        return self._columns[column]
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def open(self):
+        return self._columns["open"]
+
+    @property
+    def high(self):
+        return self._columns["high"]
+
+    @property
+    def low(self):
+        return self._columns["low"]
+
+    @property
+    def close(self):
+        return self._columns["close"]
+
+    @property
+    def volume(self):
+        return self._columns["volume"]
+
+    @property
+    def df(self):
+        if self._df is None:
+            columns = {name: np.array(values) for name, values in self._columns.items()}
+            self._df = pd.DataFrame(columns, index=self.index)
+        return self._df
+
+
 class NoBarDataFound(Exception):
     def __init__(self, source, asset):
         message = (
@@ -1,12 +1,19 @@
 import datetime
 import logging
 import re
+import weakref
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as pads
 from lumibot import LUMIBOT_DEFAULT_PYTZ as DEFAULT_PYTZ
 from lumibot.tools.helpers import parse_timestep_qty_and_unit, to_datetime_aware
 
 from .asset import Asset
+from .bars import BarsView
 from .dataline import Dataline
 
 
@@ -40,6 +47,13 @@ class Data:
         If not None, then localize the timezone of the dataframe to the
         given timezone as a string. The values can be any supported by tz_localize,
         e.g. "US/Eastern", "UTC", etc.
+    compact : bool
+        If True, once the data is aligned the dataframe is dropped and only the datalines are kept,
+        with the prices stored as float32, the volume as int32/int64 when it only holds whole
+        numbers, and the datetimes as the int64 nanoseconds of a DatetimeIndex. The values are
+        read back with the dtypes of the dataframe, and ``df`` is rebuilt from the datalines
+        when it is used (the data doesn't keep it, it is the same dataframe as long as the caller holds on to it).
+        Prices lose the precision float32 can't hold.
 
     Attributes
     ----------
@@ -68,8 +82,9 @@ class Data:
         Keys are column names like `datetime` or `close`, values are
         numpy arrays.
     iter_index : Pandas Series
-        Datetime in the index, range count in values. Used to retrieve
-        the current df iteration for this data and datetime.
+        Datetime in the index, range count in values. Built from the
+        index when it is read, get_iter_count doesn't use it. None until
+        the data is aligned.
 
     Methods
     -------
@@ -77,6 +92,8 @@ class Data:
         Sets the start and end time for the data.
     repair_times_and_fill
         After all time series merged, adjust the local dataframe to reindex and fill nan's.
+    set_repaired_df
+        Uses a dataframe already reindexed and filled by repair_times_and_fill.
     columns
         Adjust date and column names to lower case.
     set_date_format
@@ -98,6 +115,8 @@ class Data:
         Returns bars in the form of a dict.
     get_bars
         Returns bars in the form of a dataframe.
+    get_bars_view
+        Returns bars in the form of a read-only BarsView on the datalines.
     """
 
     MIN_TIMESTEP = "minute"
@@ -106,6 +125,12 @@ class Data:
         {"timestep": "minute", "representations": ["1M", "minute"]},
     ]
 
+    # Names of the columns that can hold the datetimes when the index of the dataframe doesn't
+    DATE_COLUMNS = ["Date", "date", "Time", "time", "Datetime", "datetime", "timestamp", "Timestamp"]
+
+    # Read as float64 by from_csv whatever their case, instead of the type inferred from the first rows
+    PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
     def __init__(
         self,
         asset,
@@ -117,8 +142,10 @@ class Data:
         timestep="minute",
         quote=None,
         timezone=None,
+        compact=False,
     ):
         self.asset = asset
+        self.compact = compact
         self.symbol = self.asset.symbol
 
         if self.asset.asset_type == "crypto" and quote is None:
@@ -148,17 +175,7 @@ class Data:
 
         # Check if the index is datetime (it has to be), and if it's not then try to find it in the columns
         if str(self.df.index.dtype).startswith("datetime") is False:
-            date_cols = [
-                "Date",
-                "date",
-                "Time",
-                "time",
-                "Datetime",
-                "datetime",
-                "timestamp",
-                "Timestamp",
-            ]
-            for date_col in date_cols:
+            for date_col in self.DATE_COLUMNS:
                 if date_col in self.df.columns:
                     self.df[date_col] = pd.to_datetime(self.df[date_col])
                     self.df = self.df.set_index(date_col)
@@ -183,6 +200,185 @@ class Data:
         self.datetime_start = self.df.index[0]
         self.datetime_end = self.df.index[-1]
 
+    @classmethod
+    def from_csv(cls, path, asset, date_column=None, columns=None, date_start=None, date_end=None, **kwargs):
+        """Creates a Data from a CSV file, read with the multithreaded CSV reader of PyArrow.
+
+        The datetimes are parsed by the reader (ISO 8601 dates and datetimes, with or without a UTC
+        offset) and the rows outside of the dates are dropped before the dataframe is built.
+
+        Parameters
+        ----------
+        path : str or Path
+            The CSV file, optionally compressed (eg. ``.csv.gz``).
+        asset : Asset
+            The asset of the data.
+        date_column : str
+            The column of the datetimes. If None, the first of ``DATE_COLUMNS`` in the file,
+            otherwise the first column.
+        columns : list of str
+            The columns to read, besides the datetimes. If None, all the columns.
+        date_start : datetime.datetime
+            The start date of the data, see ``Data``.
+        date_end : datetime.datetime
+            The end date of the data, see ``Data``.
+        **kwargs
+            The other arguments of ``Data``, eg. ``timestep`` or ``quote``.
+
+        Returns
+        -------
+        Data
+        """
+        dataset = pads.dataset(str(path), format="csv")
+        column_types = {name: pa.float64() for name in dataset.schema.names if name.lower() in cls.PRICE_COLUMNS}
+        csv_format = pads.CsvFileFormat(convert_options=pacsv.ConvertOptions(column_types=column_types))
+        dataset = pads.dataset(str(path), format=csv_format)
+        return cls._from_dataset(dataset, asset, date_column, columns, date_start, date_end, **kwargs)
+
+    @classmethod
+    def from_parquet(cls, path, asset, date_column=None, columns=None, date_start=None, date_end=None, **kwargs):
+        """Creates a Data from a Parquet file (or a folder of Parquet files), read with PyArrow.
+
+        The dates are filtered by the reader, so the row groups outside of the dates are not read.
+
+        Parameters
+        ----------
+        path : str or Path
+            The Parquet file or folder.
+        asset : Asset
+            The asset of the data.
+        date_column : str
+            The column of the datetimes. If None, the first of ``DATE_COLUMNS`` in the file, otherwise
+            the first date or timestamp column (eg. the index of a dataframe saved with ``to_parquet``).
+        columns : list of str
+            The columns to read, besides the datetimes. If None, all the columns.
+        date_start : datetime.datetime
+            The start date of the data, see ``Data``.
+        date_end : datetime.datetime
+            The end date of the data, see ``Data``.
+        **kwargs
+            The other arguments of ``Data``, eg. ``timestep`` or ``quote``.
+
+        Returns
+        -------
+        Data
+        """
+        dataset = pads.dataset(str(path), format="parquet")
+        return cls._from_dataset(dataset, asset, date_column, columns, date_start, date_end, **kwargs)
+
+    @classmethod
+    def _from_dataset(cls, dataset, asset, date_column, columns, date_start, date_end, **kwargs):
+        schema = dataset.schema
+        if date_column is None:
+            date_column = next((name for name in cls.DATE_COLUMNS if name in schema.names), None)
+        if date_column is None:
+            date_types = [pa.types.is_timestamp(field.type) or pa.types.is_date(field.type) for field in schema]
+            date_column = schema.names[date_types.index(True)] if True in date_types else schema.names[0]
+        if date_column not in schema.names:
+            raise ValueError(f"The column {date_column} of the datetimes of {asset} is not in the file")
+        if columns is not None:
+            columns = [date_column] + [column for column in columns if column != date_column]
+
+        # The rows a day before date_start and a day after date_end are kept, since the timezone of the
+        # datetimes is only set by Data. Data then trims the rows to the dates exactly.
+        date_type = schema.field(date_column).type
+        row_filter = None
+        for bound, days, keep in [(date_start, -1, pc.greater_equal), (date_end, 1, pc.less_equal)]:
+            if bound is None or not (pa.types.is_timestamp(date_type) or pa.types.is_date(date_type)):
+                continue
+            expression = keep(pads.field(date_column), cls._arrow_bound(bound, days, date_type))
+            row_filter = expression if row_filter is None else row_filter & expression
+
+        table = dataset.to_table(columns=columns, filter=row_filter)
+
+        # Datetimes as nanoseconds like the rest of Lumibot, whatever the unit of the file
+        dates = table.column(date_column)
+        if pa.types.is_timestamp(date_type) or pa.types.is_date(date_type):
+            tz = date_type.tz if pa.types.is_timestamp(date_type) else None
+            dates = pc.cast(dates, pa.timestamp("ns", tz=tz))
+            table = table.set_column(table.schema.get_field_index(date_column), date_column, dates)
+
+        # The pandas metadata of a parquet file would turn the datetimes back into the index on its own
+        df = table.to_pandas(ignore_metadata=True).set_index(date_column)
+        return cls(asset, df, date_start=date_start, date_end=date_end, **kwargs)
+
+    @staticmethod
+    def _arrow_bound(value, days, arrow_type):
+        """Returns value shifted by a number of days as an Arrow scalar of the type of a date column."""
+        value = pd.Timestamp(value) + pd.Timedelta(days=days)
+        if pa.types.is_date(arrow_type):
+            return pa.scalar(value.date(), type=arrow_type)
+        if arrow_type.tz is None and value.tz is not None:
+            value = value.tz_localize(None)
+        factor = {"s": 1_000_000_000, "ms": 1_000_000, "us": 1_000, "ns": 1}[arrow_type.unit]
+        return pa.scalar(value.value // factor, type=arrow_type)
+
+    # Built by the iter_index property, see set_repaired_df
+    _iter_index = None
+    # Dropped once the data is aligned in compact mode, see set_repaired_df
+    _df = None
+    # Number of times the data was aligned by set_repaired_df, DataCache measures the data again when it changes
+    _repairs = 0
+    # Weak reference to the dataframe rebuilt from the datalines in compact mode, which is only kept by its users
+    _compact_df_ref = None
+
+    @property
+    def df(self):
+        if self._df is None and self.compact and getattr(self, "datalines", None):
+            df = self._compact_df_ref() if self._compact_df_ref is not None else None
+            if df is None:
+                df = self._build_df()
+                self._compact_df_ref = weakref.ref(df)
+            return df
+        return self._df
+
+    @df.setter
+    def df(self, df):
+        self._df = df
+
+    def __getstate__(self):
+        # Weak references can't be pickled
+        state = self.__dict__.copy()
+        state.pop("_compact_df_ref", None)
+        return state
+
+    def _build_df(self):
+        """Rebuilds the dataframe of the data from its compact datalines."""
+        columns = {name: self._read(name, slice(None)) for name in self.datalines if name != "datetime"}
+        return pd.DataFrame(columns, index=self._index)
+
+    def _read(self, name, rows):
+        """Returns rows (an int or a slice) of a dataline, with the dtype of the column the dataline was built from."""
+        dataline = self.datalines[name]
+        values = dataline.dataline[rows]
+        if self.compact and name != "datetime" and dataline.dataline.dtype != dataline.dtype:
+            values = values.astype(dataline.dtype)
+        return values
+
+    @staticmethod
+    def _compact_values(name, values):
+        """Returns the values of a column as they are stored in compact mode."""
+        if values.dtype.kind != "f":
+            return values
+        if name != "volume":
+            return values.astype(np.float32)
+        if np.isfinite(values).all() and (values == np.floor(values)).all():
+            int32 = np.iinfo(np.int32)
+            small = len(values) == 0 or (values.min() >= int32.min and values.max() <= int32.max)
+            return values.astype(np.int32 if small else np.int64)
+        return values
+
+    def memory_usage(self):
+        """Returns the number of bytes used by the values of the data (the dataframe, or the datalines in compact mode).
+
+        Returns
+        -------
+        int
+        """
+        if self._df is None and self.compact and getattr(self, "datalines", None):
+            return int(sum(dataline.dataline.nbytes for dataline in self.datalines.values()))
+        return int(self.df.memory_usage().sum())
+
     def set_times(self, trading_hours_start, trading_hours_end):
         """Set the start and end times for the data. The default is 0001 hrs to 2359 hrs.
 
@@ -221,7 +417,8 @@ class Data:
 
     def set_date_format(self, df):
         df.index.name = "datetime"
-        df.index = pd.to_datetime(df.index)
+        if not isinstance(df.index, pd.DatetimeIndex):
+            df.index = pd.to_datetime(df.index)
         if not df.index.tzinfo:
             df.index = df.index.tz_localize(DEFAULT_PYTZ)
         elif df.index.tzinfo != DEFAULT_PYTZ:
@@ -273,9 +470,26 @@ class Data:
     # Call result.infer_objects(copy=False) instead.
     # To opt-in to the future behavior, set `pd.set_option('future.no_silent_downcasting', True)`
 
-    def repair_times_and_fill(self, idx):
+    def repair_times_and_fill(self, idx, datetimes=None):
+        """Reindexes the data on a global index, filling the missing bars with the previous close.
+
+        Parameters
+        ----------
+        idx : pandas.DatetimeIndex
+            The global index, trimmed to the dates of the data.
+        datetimes : numpy.ndarray
+            ``idx.to_numpy()``, to share the array of datetimes between the data repaired on the same index
+            instead of converting the index again. Only used when the index is sorted.
+        """
         # Trim the global index so that it is within the local data.
-        idx = idx[(idx >= self.datetime_start) & (idx <= self.datetime_end)]
+        if datetimes is not None and idx.is_monotonic_increasing:
+            start = idx.searchsorted(self.datetime_start, side="left")
+            end = idx.searchsorted(self.datetime_end, side="right")
+            idx = idx[start:end]
+            datetimes = datetimes[start:end]
+        else:
+            idx = idx[(idx >= self.datetime_start) & (idx <= self.datetime_end)]
+            datetimes = None
 
         # After all time series merged, adjust the local dataframe to reindex and fill nan's.
         df = self.df.reindex(idx, method="ffill")
@@ -286,59 +500,127 @@ class Data:
         for col in ["open", "high", "low"]:
             df.loc[df[col].isna(), col] = df.loc[df[col].isna(), "close"]
 
+        self.set_repaired_df(df, datetimes=datetimes)
+
+    def set_repaired_df(self, df, datetimes=None):
+        """Uses a dataframe already reindexed on the global index, eg. the output of repair_times_and_fill
+        saved in a snapshot by PandasData.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The reindexed and filled dataframe.
+        datetimes : numpy.ndarray
+            ``df.index.to_numpy()``, if already computed.
+        """
         self.df = df
+        self._compact_df_ref = None
+        self._index = df.index
+        self._repairs += 1
 
-        iter_index = pd.Series(df.index)
-        self.iter_index = pd.Series(iter_index.index, index=iter_index)
-        self.iter_index_dict = self.iter_index.to_dict()
+        self._iter_index = None
+
+        # Sorted int64 nanoseconds of the index, searched by get_iter_count
+        self._iter_index_ns = df.index.asi8
+        self._iter_cursor = 0
+        self._iter_last_dt = None
+        self._iter_last_count = None
 
         self.datalines = dict()
-        self.to_datalines()
-
-    def to_datalines(self):
-        self.datalines.update(
-            {
-                "datetime": Dataline(
-                    self.asset,
-                    "datetime",
-                    self.df.index.to_numpy(),
-                    self.df.index.dtype,
-                )
-            }
-        )
+        self.to_datalines(datetimes)
+
+        if self.compact:
+            # The datalines hold all the values, the dataframe is rebuilt from them when it is used
+            self.df = None
+
+    def to_datalines(self, datetimes=None):
+        df = self.df
+        if self.compact:
+            # The DatetimeIndex is the int64 nanoseconds of the datetimes, and reads like the array of datetimes
+            datetimes = df.index
+        elif datetimes is None:
+            datetimes = df.index.to_numpy()
+        self.datalines.update({"datetime": Dataline(self.asset, "datetime", datetimes, df.index.dtype)})
         setattr(self, "datetime", self.datalines["datetime"].dataline)
 
-        for column in self.df.columns:
-            self.datalines.update(
-                {
-                    column: Dataline(
-                        self.asset,
-                        column,
-                        self.df[column].to_numpy(),
-                        self.df[column].dtype,
-                    )
-                }
-            )
+        for column in df.columns:
+            values = df[column].to_numpy()
+            if self.compact:
+                values = self._compact_values(column, values)
+            self.datalines.update({column: Dataline(self.asset, column, values, df[column].dtype)})
             setattr(self, column, self.datalines[column].dataline)
 
+        # Used by get_bars_view to know when the datalines can be returned as they are, without resampling.
+        columns = ["open", "high", "low", "close", "volume"]
+        index_ns = df.index.asi8
+        self._bars_index = df.index.rename("datetime")
+        self._bars_view_ready = all(column in df.columns for column in columns) and bool(
+            (index_ns % 60_000_000_000 == 0).all() and (np.diff(index_ns) > 0).all()
+        )
+        if self._bars_view_ready:
+            na_rows = df[columns].isna().any(axis=1).to_numpy()
+            count_dtype = np.int32 if self.compact and len(na_rows) < np.iinfo(np.int32).max else np.int64
+            self._bars_na_count = np.concatenate([[0], np.cumsum(na_rows)]).astype(count_dtype, copy=False)
+
+        # Resampled datalines, built the first time a timeframe is requested (see _get_aggregated_bars)
+        self._aggregates = {}
+
+    @property
+    def iter_index(self):
+        if self._iter_index is None and getattr(self, "_index", None) is not None:
+            iter_index = pd.Series(self._index)
+            self._iter_index = pd.Series(iter_index.index, index=iter_index)
+        return self._iter_index
+
     def get_iter_count(self, dt):
-        # Return the index location for a given datetime.
+        """Returns the index location of the last row at or before dt (NaN if there is none).
 
-        # Check if the date is in the dataframe, if not then get the last
-        # known data (this speeds up the process)
-        i = None
+        The lookup is a binary search on the int64 nanoseconds of the index. During a backtest
+        dt only moves forward, so the position of the previous lookup is checked first and the
+        same dt is not searched twice in a row.
 
-        # Check if we have the iter_index_dict, if not then repair the times and fill (which will create the iter_index_dict)
-        if getattr(self, "iter_index_dict", None) is None:
+        The position and the result of the previous lookup (``_iter_cursor``, ``_iter_last_dt`` and
+        ``_iter_last_count``) are not thread-safe, so the data must not be looked up from several
+        threads at once. The warm-up thread of PandasData only aligns data the strategy doesn't use yet.
+
+        Parameters
+        ----------
+        dt : datetime.datetime
+            The datetime to look for.
+
+        Returns
+        -------
+        int or float
+        """
+        # Check if we have the iteration index, if not then repair the times and fill (which will create it)
+        if getattr(self, "_iter_index_ns", None) is None:
             self.repair_times_and_fill(self.df.index)
 
-        # Search for dt in self.iter_index_dict
-        if dt in self.iter_index_dict:
-            i = self.iter_index_dict[dt]
+        # Same datetime as the previous lookup
+        if dt is self._iter_last_dt or (self._iter_last_dt is not None and dt == self._iter_last_dt):
+            return self._iter_last_count
+
+        index_ns = self._iter_index_ns
+        dt_ns = dt.value if isinstance(dt, pd.Timestamp) else pd.Timestamp(dt).value
+
+        # Check the previous position and the next one before searching the whole index
+        cursor = self._iter_cursor
+        if cursor < len(index_ns) and index_ns[cursor] <= dt_ns:
+            if cursor + 1 < len(index_ns) and index_ns[cursor + 1] <= dt_ns:
+                cursor += 1
+                if cursor + 1 < len(index_ns) and index_ns[cursor + 1] <= dt_ns:
+                    cursor = int(np.searchsorted(index_ns, dt_ns, side="right")) - 1
         else:
-            # If not found, get the last known data
-            i = self.iter_index.asof(dt)
+            cursor = int(np.searchsorted(index_ns, dt_ns, side="right")) - 1
 
+        if cursor < 0:
+            i = np.nan
+        else:
+            i = cursor
+            self._iter_cursor = cursor
+
+        self._iter_last_dt = dt
+        self._iter_last_count = i
         return i
 
     def check_data(func):
@@ -356,15 +638,8 @@ class Data:
                     f"The date you are looking for ({dt}) for ({self.asset}) is outside of the data's date range ({self.datetime_start} to {self.datetime_end}). This could be because the data for this asset does not exist for the date you are looking for, or something else."
                 )
 
-            # Search for dt in self.iter_index_dict
-            if getattr(self, "iter_index_dict", None) is None:
-                self.repair_times_and_fill(self.df.index)
-
-            if dt in self.iter_index_dict:
-                i = self.iter_index_dict[dt]
-            else:
-                # If not found, get the last known data
-                i = self.iter_index.asof(dt)
+            # The lookup is remembered, so the function doesn't search for dt again
+            i = self.get_iter_count(dt)
 
             length = kwargs.get("length", 1)
             timeshift = kwargs.get("timeshift", 0)
@@ -402,7 +677,77 @@ class Data:
         float
         """
         iter_count = self.get_iter_count(dt)
-        return self.datalines["open"].dataline[iter_count]
+        return self._read("open", iter_count)
+
+    def get_current_bar(self, dt):
+        """Returns the OHLCV values of the bar that orders are evaluated against at ``dt``.
+
+        This is the bar starting exactly at ``dt`` if there is one, otherwise the next bar
+        (or the last known bar at the end of the data). It reads the datalines directly
+        instead of building and resampling a dataframe, so it only handles minute data and
+        returns ``None`` whenever the rows cannot be used as they are.
+
+        Parameters
+        ----------
+        dt : datetime.datetime
+            The datetime to get the bar for.
+
+        Returns
+        -------
+        dict or None
+            Dictionary with the ``datetime``, ``open``, ``high``, ``low``, ``close`` and ``volume``
+            of the bar, or ``None`` if the bar cannot be read directly from the datalines.
+        """
+        if self.timestep != "minute" or dt < self.datetime_start:
+            return None
+
+        i = self.get_iter_count(dt)
+        if i is None or pd.isna(i):
+            return None
+
+        i = int(i)
+        datetimes = self.datalines["datetime"].dataline
+        rows = range(i, min(i + 2, len(datetimes)))
+        if len(rows) == 0:
+            return None
+
+        # The rows must look exactly like minute bars after resampling, otherwise let get_bars handle them.
+        columns = ["open", "high", "low", "close", "volume"]
+        for row in rows:
+            row_dt = pd.Timestamp(datetimes[row])
+            if row_dt != row_dt.floor("min"):
+                return None
+            if any(pd.isna(self.datalines[column].dataline[row]) for column in columns):
+                return None
+        if len(rows) == 2 and pd.Timestamp(datetimes[rows[0]]).floor("min") == pd.Timestamp(datetimes[rows[1]]):
+            return None
+
+        # Use the bar at dt if it exists, otherwise the next bar, otherwise the last bar we have.
+        row = rows[0] if datetimes[rows[0]] >= dt else rows[-1]
+
+        bar = {"datetime": datetimes[row]}
+        for column in columns:
+            bar[column] = self._read(column, row)
+        return bar
+
+    def _get_bars_rows(self, dt, length=1, timeshift=0):
+        """Returns the start and end rows of the bars ending at dt, shifted by timeshift."""
+        # Get bars.
+        end_row = self.get_iter_count(dt) - timeshift
+        start_row = end_row - length
+
+        if start_row < 0:
+            start_row = 0
+
+        # Cast both start_row and end_row to int
+        start_row = int(start_row)
+        end_row = int(end_row)
+
+        return start_row, end_row
+
+    @check_data
+    def _get_bars_view_rows(self, dt, length=1, timeshift=0):
+        return self._get_bars_rows(dt, length=length, timeshift=timeshift)
 
     @check_data
     def _get_bars_dict(self, dt, length=1, timestep=None, timeshift=0):
@@ -425,9 +770,18 @@ class Data:
 
         """
 
-        # Get bars.
-        end_row = self.get_iter_count(dt) - timeshift
-        start_row = end_row - length
+        start_row, end_row = self._get_bars_rows(dt, length=length, timeshift=timeshift)
+
+        dict = {}
+        for dl_name in self.datalines:
+            dict[dl_name] = self._read(dl_name, slice(start_row, end_row))
+
+        return dict
+
+    def _get_bars_between_dates_rows(self, start_date=None, end_date=None):
+        """Returns the start and end rows of the bars between the start and end dates."""
+        end_row = self.get_iter_count(end_date)
+        start_row = self.get_iter_count(start_date)
 
         if start_row < 0:
             start_row = 0
@@ -436,11 +790,88 @@ class Data:
         start_row = int(start_row)
         end_row = int(end_row)
 
-        dict = {}
-        for dl_name, dl in self.datalines.items():
-            dict[dl_name] = dl.dataline[start_row:end_row]
+        return start_row, end_row
 
-        return dict
+    def _can_aggregate(self, freq):
+        """Whether bars resampled to freq can be read from the cached aggregates.
+
+        Only minute data with float prices is cached, for daily bars and for minute bars that evenly
+        divide an hour, so that the bins don't depend on where the requested window starts.
+        """
+        if getattr(self, "_iter_index_ns", None) is None:
+            self.repair_times_and_fill(self.df.index)
+
+        if self.timestep != "minute" or not self._bars_view_ready:
+            return False
+        if any(self.datalines[column].dataline.dtype.kind != "f" for column in ["open", "high", "low", "close"]):
+            return False
+
+        quantity, unit = parse_timestep_qty_and_unit(freq)
+        if unit == "D":
+            return quantity == 1
+        return unit == "min" and 1 < quantity <= 60 and 60 % quantity == 0
+
+    def _get_aggregates(self, freq):
+        """Returns the datalines resampled to freq and the bin of each row, building them the first time."""
+        if freq not in self._aggregates:
+            df = pd.DataFrame(
+                {column: self._read(column, slice(None)) for column in ["open", "high", "low", "close", "volume"]},
+                index=self._bars_index,
+            )
+            df_agg = df.resample(freq).agg(
+                {
+                    "open": "first",
+                    "high": "max",
+                    "low": "min",
+                    "close": "last",
+                    "volume": "sum",
+                }
+            )
+            row_bins = np.searchsorted(df_agg.index.asi8, self._bars_index.asi8, side="right") - 1
+            self._aggregates[freq] = (df_agg, row_bins)
+
+        return self._aggregates[freq]
+
+    def _aggregate_rows(self, start, end):
+        """Returns the open, high, low, close and volume of rows [start, end) as a single bar."""
+        values = {}
+        for column, first in [("open", True), ("close", False)]:
+            dataline = self.datalines[column].dataline[start:end]
+            valid = np.flatnonzero(~np.isnan(dataline))
+            values[column] = dataline[valid[0 if first else -1]] if len(valid) > 0 else np.nan
+        for column, func in [("high", np.max), ("low", np.min)]:
+            dataline = self.datalines[column].dataline[start:end]
+            dataline = dataline[~np.isnan(dataline)]
+            values[column] = func(dataline) if len(dataline) > 0 else np.nan
+        volume = self.datalines["volume"].dataline[start:end]
+        values["volume"] = np.nansum(volume) if volume.dtype.kind == "f" else volume.sum()
+        return values
+
+    def _get_aggregated_bars(self, start_row, end_row, freq):
+        """Returns the same dataframe as resampling rows [start_row, end_row) of the datalines to freq.
+
+        The complete bins are read from the cached aggregates, only the first and last bins are
+        recomputed when the rows only cover part of them. Returns ``None`` if the rows are empty.
+        """
+        start, end, _ = slice(start_row, end_row).indices(len(self._bars_index))
+        if end <= start:
+            return None
+
+        df_agg, row_bins = self._get_aggregates(freq)
+        first_bin, last_bin = row_bins[start], row_bins[end - 1]
+        df_result = df_agg.iloc[first_bin : last_bin + 1].copy()
+
+        for position, bin_number in [(0, first_bin), (len(df_result) - 1, last_bin)]:
+            bin_start = np.searchsorted(row_bins, bin_number, side="left")
+            bin_end = np.searchsorted(row_bins, bin_number, side="right")
+            if bin_start >= start and bin_end <= end:
+                continue
+
+            values = self._aggregate_rows(max(start, bin_start), min(end, bin_end))
+            for column, value in values.items():
+                df_result.iloc[position, df_result.columns.get_loc(column)] = value
+
+        return df_result
 
     def _get_bars_between_dates_dict(self, timestep=None, start_date=None, end_date=None):
         """Returns a dictionary of all the data available between the start and end dates.
@@ -459,19 +890,11 @@ class Data:
         dict
         """
 
-        end_row = self.get_iter_count(end_date)
-        start_row = self.get_iter_count(start_date)
-
-        if start_row < 0:
-            start_row = 0
-
-        # Cast both start_row and end_row to int
-        start_row = int(start_row)
-        end_row = int(end_row)
+        start_row, end_row = self._get_bars_between_dates_rows(start_date=start_date, end_date=end_date)
 
         dict = {}
-        for dl_name, dl in self.datalines.items():
-            dict[dl_name] = dl.dataline[start_row:end_row]
+        for dl_name in self.datalines:
+            dict[dl_name] = self._read(dl_name, slice(start_row, end_row))
 
         return dict
 
@@ -515,18 +938,27 @@ class Data:
             # If the data is minute data and we are requesting daily data then multiply the length by 1440
             length = length * 1440
             unit = "D"
-            data = self._get_bars_dict(dt, length=length, timestep="minute", timeshift=timeshift)
-
         else:
             unit = "min"  # Guaranteed to be minute timestep at this point
             length = length * quantity
-            data = self._get_bars_dict(dt, length=length, timestep=timestep, timeshift=timeshift)
 
-        if data is None:
-            return None
+        freq = f"{quantity}{unit}"
+        df_result = None
+        if self._can_aggregate(freq):
+            start_row, end_row = self._get_bars_view_rows(dt, length=length, timeshift=timeshift)
+            df_result = self._get_aggregated_bars(start_row, end_row, freq)
+
+        if df_result is None:
+            if unit == "D":
+                data = self._get_bars_dict(dt, length=length, timestep="minute", timeshift=timeshift)
+            else:
+                data = self._get_bars_dict(dt, length=length, timestep=timestep, timeshift=timeshift)
+
+            if data is None:
+                return None
 
-        df = pd.DataFrame(data).assign(datetime=lambda df: pd.to_datetime(df['datetime'])).set_index('datetime')
-        df_result = df.resample(f"{quantity}{unit}").agg(agg_column_map)
+            df = pd.DataFrame(data).assign(datetime=lambda df: pd.to_datetime(df['datetime'])).set_index('datetime')
+            df_result = df.resample(freq).agg(agg_column_map)
 
         # Drop any rows that have NaN values (this can happen if the data is not complete, eg. weekends)
         df_result = df_result.dropna()
@@ -541,6 +973,50 @@ class Data:
 
         return df_result
 
+    def get_bars_view(self, dt, length=1, timestep=MIN_TIMESTEP, timeshift=0):
+        """Returns the same bars as ``get_bars`` as a read-only ``BarsView``.
+
+        When the requested timestep is the timestep of the data, the view is backed directly by
+        the datalines and no dataframe is built until ``BarsView.df`` is used. Other timesteps
+        are resampled with ``get_bars``.
+
+        Parameters
+        ----------
+        dt : datetime.datetime
+            The datetime to get the data.
+        length : int
+            The number of periods to get the data.
+        timestep : str
+            The frequency of the data to get the data. Only minute and day are supported.
+        timeshift : int
+            The number of periods to shift the data.
+
+        Returns
+        -------
+        BarsView
+        """
+        quantity, unit = parse_timestep_qty_and_unit(timestep)
+        if getattr(self, "_iter_index_ns", None) is None:
+            self.repair_times_and_fill(self.df.index)
+
+        if unit == "minute" and quantity == 1 and self.timestep == "minute" and self._bars_view_ready:
+            start_row, end_row = self._get_bars_view_rows(dt, length=length, timeshift=timeshift)
+            start, end, _ = slice(start_row, end_row).indices(len(self._bars_index))
+            start = max(start, end - length)
+
+            # Resampling drops the bars with missing values, only use the datalines if there are none
+            if end > start and self._bars_na_count[end] == self._bars_na_count[start]:
+                columns = {
+                    column: self._read(column, slice(start, end))
+                    for column in ["open", "high", "low", "close", "volume"]
+                }
+                return BarsView(self._bars_index[start:end], columns)
+
+        df = self.get_bars(dt, length=length, timestep=timestep, timeshift=timeshift)
+        if df is None:
+            return None
+        return BarsView.from_df(df)
+
     def get_bars_between_dates(self, timestep=MIN_TIMESTEP, exchange=None, start_date=None, end_date=None):
         """Returns a dataframe of all the data available between the start and end dates.
 
@@ -567,6 +1043,12 @@ class Data:
             raise ValueError(f"Only minute and day are supported for timestep. You provided: {timestep}")
 
         if timestep == "day" and self.timestep == "minute":
+            if self._can_aggregate("1D"):
+                start_row, end_row = self._get_bars_between_dates_rows(start_date=start_date, end_date=end_date)
+                df_result = self._get_aggregated_bars(start_row, end_row, "1D")
+                if df_result is not None:
+                    return df_result
+
             dict = self._get_bars_between_dates_dict(timestep=timestep, start_date=start_date, end_date=end_date)
 
             if dict is None:
@@ -254,11 +254,11 @@ class Order:
         # It is possible for crypto currencies to arrive as a tuple of
         # two assets.
         if isinstance(asset, tuple) and asset[0].asset_type == "crypto":
-            self.asset = asset[0]
-            self.quote = asset[1]
+            self.asset = entities.Asset.intern(asset[0])
+            self.quote = entities.Asset.intern(asset[1])
         else:
-            self.asset = asset
-            self.quote = quote
+            self.asset = entities.Asset.intern(asset)
+            self.quote = entities.Asset.intern(quote)
 
         self.symbol = self.asset.symbol
         self.identifier = identifier if identifier else uuid.uuid4().hex
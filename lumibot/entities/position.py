@@ -28,9 +28,13 @@ class Position:
         The average fill price of the position.
     """
 
+    # Incremented every time the quantity of any position changes, so that the
+    # values derived from the quantities (see PortfolioLedger) know when to refresh.
+    _quantity_version = 0
+
     def __init__(self, strategy, asset, quantity, orders=None, hold=0, available=0, avg_fill_price=None):
         self.strategy = strategy
-        self.asset = asset
+        self.asset = entities.Asset.intern(asset)
         self.symbol = self.asset.symbol
         self.orders = None
         self.avg_fill_price = avg_fill_price
@@ -79,6 +83,7 @@ class Position:
     @quantity.setter
     def quantity(self, value):
         self._quantity = Decimal(value)
+        Position._quantity_version += 1
 
     @property
     def hold(self):
@@ -159,6 +164,6 @@ class Position:
 
     def add_order(self, order: entities.Order, quantity: Decimal = Decimal(0)):
         increment = quantity if order.side == "buy" else -quantity
-        self._quantity += Decimal(increment)
+        self.quantity = self._quantity + Decimal(increment)
         if order not in self.orders:
             self.orders.append(order)
@@ -1,5 +1,9 @@
 import datetime
+import itertools
 import logging
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
 from termcolor import colored
 from asyncio.log import logger
 from decimal import Decimal
@@ -19,6 +23,7 @@ from lumibot.tools import (
     to_datetime_aware,
 )
 from lumibot.traders import Trader
+from lumibot.trading_builtins import PortfolioLedger
 
 from .strategy_executor import StrategyExecutor
     
@@ -33,6 +38,32 @@ class CustomLoggerAdapter(logging.LoggerAdapter):
         except Exception as e:
             return msg, kwargs
 
+# Backtest settings shared by all the runs of a parameter sweep, inherited by the forked worker processes or
+# set once per worker process by _init_sweep_worker
+_sweep_settings = None
+
+
+def _init_sweep_worker(strategy_class, args, kwargs):
+    global _sweep_settings
+    _sweep_settings = (strategy_class, args, kwargs)
+
+
+def _run_sweep_backtest(parameters):
+    """Runs one backtest of a parameter sweep and returns its stats_summary."""
+    strategy_class, args, kwargs = _sweep_settings
+    kwargs = dict(kwargs)
+    kwargs["parameters"] = {**kwargs.get("parameters", {}), **parameters}
+    # The runs of a sweep share the same name and start time, so they don't write the files of the analysis
+    kwargs.update(
+        show_plot=False, show_tearsheet=False, save_tearsheet=False, show_indicators=False, analyze_backtest=False
+    )
+    backtest = strategy_class.run_backtest(*args, **kwargs)
+    if backtest is None:
+        return None
+    result, strategy = backtest
+    return result
+
+
 class _Strategy:
     IS_BACKTESTABLE = True
 
@@ -219,9 +250,13 @@ class _Strategy:
         # Hold the asset objects for strings for stocks only.
         self._asset_mapping = dict()
 
+        # Quantities and prices of the positions, used to compute the portfolio value when backtesting
+        self._portfolio_ledger = PortfolioLedger()
+
         # Setting the data provider
         if self._is_backtesting:
-            if self.broker.data_source.SOURCE == "PANDAS":
+            # The data of a data source shared by several strategies is only loaded once
+            if self.broker.data_source.SOURCE == "PANDAS" and self.broker.data_source._date_index is None:
                 self.broker.data_source.load_data()
 
             # Create initial starting positions.
@@ -340,12 +375,10 @@ class _Strategy:
 
     def _set_cash_position(self, cash: float):
         # Check if cash is in the list of positions yet
-        for x in range(len(self.broker._filled_positions.get_list())):
-            position = self.broker._filled_positions[x]
-            if position is not None and position.asset == self.quote_asset:
-                position.quantity = cash
-                self.broker._filled_positions[x] = position
-                return
+        position = self.broker.get_tracked_position(None, self.quote_asset)
+        if position is not None:
+            position.quantity = cash
+            return
 
         # If not in positions, create a new position for cash
         position = Position(
@@ -359,12 +392,13 @@ class _Strategy:
         self.broker._filled_positions.append(position)
 
     def _sanitize_user_asset(self, asset):
+        # The assets are interned, so that the lookups with them are faster (see Asset.intern)
         if isinstance(asset, Asset):
-            return asset
+            return Asset.intern(asset)
         elif isinstance(asset, tuple):
-            return asset
+            return Asset.intern(asset)
         elif isinstance(asset, str):
-            return Asset(symbol=asset)
+            return Asset.intern(Asset(symbol=asset))
         else:
             if self.broker.data_source.SOURCE != "CCXT":
                 raise ValueError(f"You must enter a symbol string or an asset object. You " f"entered {asset}")
@@ -445,68 +479,20 @@ class _Strategy:
             # Used for traditional brokers, for crypto this could be 0
             portfolio_value = self.cash
 
-            positions = self.broker.get_tracked_positions(self._name)
-            assets_original = [position.asset for position in positions]
-            # Set the base currency for crypto valuations.
-
-            assets = []
-            for asset in assets_original:
-                if asset != self.quote_asset:
-                    if asset.asset_type == "crypto" or asset.asset_type == "forex":
-                        asset = (asset, self.quote_asset)
-                    assets.append(asset)
+            # The quantities are only read again after a position changed, and the prices after the datetime changed
+            ledger = self._portfolio_ledger
+            version = self.broker.get_tracked_positions_version()
+            if ledger.is_stale(version):
+                ledger.update_positions(self.broker.get_tracked_positions(self._name), self.quote_asset, version)
 
-            prices = self.broker.data_source.get_last_prices(assets)
-
-            for position in positions:
-                # Turn the asset into a tuple if it's a crypto asset
-                asset = (
-                    position.asset
-                    if (position.asset.asset_type != "crypto") and (position.asset.asset_type != "forex")
-                    else (position.asset, self.quote_asset)
-                )
-                quantity = position.quantity
-                price = prices.get(asset, 0)
-
-                # If the asset is the quote asset, then we already have included it from cash
-                # Eg. if we have a position of USDT and USDT is the quote_asset then we already consider it as cash
-                if self.quote_asset is not None:
-                    if isinstance(asset, tuple) and asset == (
-                        self.quote_asset,
-                        self.quote_asset,
-                    ):
-                        price = 0
-                    elif isinstance(asset, Asset) and asset == self.quote_asset:
-                        price = 0
+            dt = self.broker.datetime
+            if ledger.needs_prices(dt):
+                prices = self.broker.data_source.get_last_prices(ledger.assets) if ledger.assets else {}
+                ledger.update_prices(prices, dt)
 
-                if self._is_backtesting and price is None:
-                    if isinstance(asset, Asset):
-                        raise ValueError(
-                            f"A security has returned a price of None while trying "
-                            f"to set the portfolio value. This usually happens when there "
-                            f"is no data data available for the Asset or pair. "
-                            f"Please ensure data exists at "
-                            f"{self.broker.datetime} for the security: \n"
-                            f"symbol: {asset.symbol}, \n"
-                            f"type: {asset.asset_type}, \n"
-                            f"right: {asset.right}, \n"
-                            f"expiration: {asset.expiration}, \n"
-                            f"strike: {asset.strike}.\n"
-                        )
-                    elif isinstance(asset, tuple):
-                        raise ValueError(
-                            f"A security has returned a price of None while trying "
-                            f"to set the portfolio value. This usually happens when there "
-                            f"is no data data available for the Asset or pair. "
-                            f"Please ensure data exists at "
-                            f"{self.broker.datetime} for the pair: {asset}"
-                        )
-                if isinstance(asset, tuple):
-                    multiplier = 1
-                else:
-                    multiplier = asset.multiplier if asset.asset_type in ["option", "future"] else 1
-                portfolio_value += float(quantity) * price * multiplier
+            portfolio_value += ledger.positions_value
 
+            # A single assignment, so portfolio_value can be read without taking the lock
             self._portfolio_value = portfolio_value
 
         return portfolio_value
@@ -595,7 +581,7 @@ class _Strategy:
         logger.setLevel(current_level)
 
     def _dump_benchmark_stats(self):
-        if not self._is_backtesting:
+        if not self._is_backtesting or self._benchmark_asset is None:
             return
         if self._backtesting_start is not None and self._backtesting_end is not None:
             # Need to adjust the backtesting end date because the data from Yahoo
@@ -777,6 +763,7 @@ class _Strategy:
         indicators_file=None,
         show_indicators=True,
         save_logfile=False,
+        analyze_backtest=True,
         **kwargs,
     ):
         """Backtest a strategy.
@@ -853,6 +840,10 @@ class _Strategy:
             Whether to show the indicators plot.
         save_logfile : bool
             Whether to save the logfile. Defaults to False. If True, the logfile will be saved to the logs directory. Turning on this option will slow down the backtest.
+        analyze_backtest : bool
+            Whether to analyze the backtest once it is done (plot, tearsheet, indicators and the trades, settings
+            and stats files in the logs directory). Defaults to True. The stats of the backtest are returned either
+            way, and the stats file is still written if ``stats_file`` is given.
 
         Returns
         -------
@@ -945,7 +936,7 @@ class _Strategy:
         logdir = "logs"
         if logfile is None and save_logfile:
             logfile = f"{logdir}/{basename}_logs.csv"
-        if stats_file is None:
+        if stats_file is None and analyze_backtest:
             stats_file = f"{logdir}/{basename}_stats.csv"
 
         # Check if polygon_has_paid_subscription is set (it is deprecated and will be removed in the future)
@@ -1042,6 +1033,7 @@ class _Strategy:
             save_tearsheet=save_tearsheet,
             show_indicators=show_indicators,
             tearsheet_file=tearsheet_file,
+            analyze_backtest=analyze_backtest,
         )
 
         end = datetime.datetime.now()
@@ -1330,3 +1322,129 @@ class _Strategy:
             **kwargs,
         )
         return results
+
+    @classmethod
+    def backtest_grid(cls, *args, parameter_grid=None, max_workers=None, **kwargs):
+        """Backtests the strategy with every combination of parameters of a grid, in parallel.
+
+        Each combination is backtested in its own process with ``run_backtest``, without plots or
+        tearsheets. Where processes can be forked, the worker processes inherit the backtest settings
+        (including ``pandas_data``) from the memory of this process instead of receiving a copy, and
+        only read them. Otherwise the settings are sent once to each worker process, and the strategy
+        class must be importable by the workers, so it has to be defined at the top level of a module.
+
+        Parameters
+        ----------
+        *args
+            The positional arguments of ``backtest``: ``datasource_class``, ``backtesting_start``
+            and ``backtesting_end``.
+        parameter_grid : dict or list of dict
+            A dictionary with the values to try for each parameter, eg. ``{"period": [10, 20, 50]}``.
+            Every combination of the values is backtested. A list of dictionaries is backtested
+            as is, one backtest per dictionary.
+        max_workers : int
+            The number of worker processes. Defaults to the number of processors.
+        **kwargs
+            The keyword arguments of ``backtest``. The ``parameters`` are passed to every backtest and
+            are updated with the parameters of each combination.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per combination with the parameters and the stats_summary metrics of the
+            backtest (``cagr``, ``volatility``, ``sharpe``, ``max_drawdown.drawdown``,
+            ``max_drawdown.date``, ``romad`` and ``total_return``).
+
+        Examples
+        --------
+
+        >>> results = MyStrategy.backtest_grid(
+        >>>     PandasDataBacktesting,
+        >>>     backtesting_start,
+        >>>     backtesting_end,
+        >>>     pandas_data=pandas_data,
+        >>>     parameter_grid={"fast_period": [5, 10], "slow_period": [20, 50]},
+        >>> )
+        >>> best = results.sort_values("sharpe", ascending=False).iloc[0]
+        """
+        if isinstance(parameter_grid, dict):
+            names = list(parameter_grid.keys())
+            combinations = [dict(zip(names, values)) for values in itertools.product(*parameter_grid.values())]
+        elif isinstance(parameter_grid, list) and all(isinstance(item, dict) for item in parameter_grid):
+            combinations = parameter_grid
+        else:
+            raise ValueError(
+                f"`parameter_grid` must be a dictionary of lists or a list of dictionaries. "
+                f"You passed in {parameter_grid}"
+            )
+
+        global _sweep_settings
+        if "fork" in multiprocessing.get_all_start_methods():
+            # The workers are forked once the settings are set, so the pandas_data isn't pickled for each of them
+            _sweep_settings = (cls, args, kwargs)
+            pool_kwargs = dict(mp_context=multiprocessing.get_context("fork"))
+        else:
+            pool_kwargs = dict(initializer=_init_sweep_worker, initargs=(cls, args, kwargs))
+
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, **pool_kwargs) as executor:
+                results = list(executor.map(_run_sweep_backtest, combinations))
+        finally:
+            _sweep_settings = None
+
+        rows = []
+        for parameters, result in zip(combinations, results):
+            metrics = pd.json_normalize(result).iloc[0].to_dict() if result else {}
+            rows.append({**parameters, **metrics})
+        return pd.DataFrame(rows)
+
+    @classmethod
+    def optimize(cls, *args, search_space=None, n_iter=10, random_state=None, max_workers=None, **kwargs):
+        """Backtests the strategy with random combinations of parameters, in parallel.
+
+        This is a random search: ``n_iter`` combinations are drawn from the search space and
+        backtested with ``backtest_grid``.
+
+        Parameters
+        ----------
+        *args
+            The positional arguments of ``backtest``: ``datasource_class``, ``backtesting_start``
+            and ``backtesting_end``.
+        search_space : dict
+            The values to draw for each parameter. A list or tuple is sampled uniformly, a callable
+            is called with a ``random.Random`` instance, eg. ``lambda rng: rng.uniform(0.01, 0.1)``.
+        n_iter : int
+            The number of combinations to backtest.
+        random_state : int
+            The seed of the random draws, to get the same combinations every time.
+        max_workers : int
+            The number of worker processes. Defaults to the number of processors.
+        **kwargs
+            The keyword arguments of ``backtest``.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per combination, see ``backtest_grid``.
+        """
+        if not isinstance(search_space, dict):
+            raise ValueError(f"`search_space` must be a dictionary. You passed in {search_space}")
+        if not isinstance(n_iter, int) or n_iter <= 0:
+            raise ValueError(f"`n_iter` must be a positive integer. You passed in {n_iter}")
+
+        rng = random.Random(random_state)
+        combinations = []
+        for _ in range(n_iter):
+            parameters = {}
+            for name, values in search_space.items():
+                if callable(values):
+                    parameters[name] = values(rng)
+                elif isinstance(values, (list, tuple)):
+                    parameters[name] = rng.choice(values)
+                else:
+                    raise ValueError(
+                        f"The search space of `{name}` must be a list, a tuple or a callable. You passed in {values}"
+                    )
+            combinations.append(parameters)
+
+        return cls.backtest_grid(*args, parameter_grid=combinations, max_workers=max_workers, **kwargs)
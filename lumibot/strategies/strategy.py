@@ -2741,13 +2741,15 @@ class Strategy(_Strategy):
                 else:
                     pass
 
-        return Asset(
-            symbol=symbol,
-            asset_type=asset_type,
-            expiration=expiration,
-            strike=strike,
-            right=right,
-            multiplier=multiplier,
+        return Asset.intern(
+            Asset(
+                symbol=symbol,
+                asset_type=asset_type,
+                expiration=expiration,
+                strike=strike,
+                right=right,
+                multiplier=multiplier,
+            )
         )
 
     def add_marker(self, name, value=None, color=None, symbol="circle", size=None, detail_text=None, dt=None):
@@ -1,3 +1,4 @@
+import asyncio
 import inspect
 import time
 import traceback
@@ -6,6 +7,8 @@ from functools import wraps
 from queue import Empty, Queue
 from threading import Event, Lock, Thread
 
+import numpy as np
+import pandas as pd
 from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -22,6 +25,9 @@ class StrategyExecutor(Thread):
     FILLED_ORDER = "fill"
     PARTIALLY_FILLED_ORDER = "partial_fill"
 
+    # Maximum number of seconds sync_broker waits for the queued orders to be submitted
+    ORDERS_SUBMISSION_TIMEOUT = 60
+
     def __init__(self, strategy):
         super(StrategyExecutor, self).__init__()
         self.daemon = True
@@ -50,11 +56,20 @@ class StrategyExecutor(Thread):
 
         # Create an Event object for the check queue stop event.
         self.check_queue_stop_event = Event()
+        self._check_queue_task = None
+
+        # When the orders and positions were last reconciled with the broker, see sync_broker
+        self._last_full_sync = None
 
     @property
     def name(self):
         return self.strategy._name
 
+    @property
+    def _shared_clock(self):
+        # The BacktestingClock of a strategy backtested together with other strategies, None otherwise
+        return getattr(self.broker, "clock", None) if self.broker.IS_BACKTESTING_BROKER else None
+
     @property
     def should_continue(self):
         return not self.stop_event.is_set()
@@ -69,6 +84,16 @@ class StrategyExecutor(Thread):
                 pass
             time.sleep(0.5)
 
+    async def check_queue_async(self, engine):
+        # Same as check_queue, as a coroutine of the async engine. The events are processed on the threads of the
+        # engine so the strategy callbacks never block the loop.
+        while not self.check_queue_stop_event.is_set():
+            try:
+                await engine.run_blocking(self.process_queue)
+            except Empty:
+                pass
+            await asyncio.sleep(0.5)
+
     def safe_sleep(self, sleeptime):
         # This method should only be run in back testing. If it's running during live, something has gone wrong.
 
@@ -87,9 +112,10 @@ class StrategyExecutor(Thread):
             return
 
         # Ensure that the orders are submitted to the broker before auditing.
-        orders_queue_len = 1
-        while orders_queue_len > 0:
-            orders_queue_len = len(self.broker._orders_queue.queue)
+        if not self.broker.wait_for_orders_submission(timeout=self.ORDERS_SUBMISSION_TIMEOUT):
+            self.strategy.logger.warning(
+                f"Orders are still being submitted after {self.ORDERS_SUBMISSION_TIMEOUT} seconds, syncing anyway."
+            )
 
         # Traps all new trade/order notifications to list broker._held_trades
         # Trapped at the broker._process_trade_event method
@@ -128,6 +154,12 @@ class StrategyExecutor(Thread):
                 self.broker.process_held_trades()
                 self.broker._hold_trade_events = True
 
+        # The trade events of the stream kept the orders and positions up to date since the last full sync
+        if self._can_trust_stream():
+            self.broker._hold_trade_events = False
+            self.broker.process_held_trades()
+            return
+
         # POSITIONS
         # Update Lumibot positions to match broker positions.
         # Any new trade notifications will not affect the sync as they
@@ -139,11 +171,16 @@ class StrategyExecutor(Thread):
         if len(orders_broker) > 0:
             orders_lumi = self.broker.get_all_orders()
 
+            # Index the orders by identifier, keeping the first one like a scan of the list would
+            orders_lumi_by_id = {}
+            for order_lumi in orders_lumi:
+                orders_lumi_by_id.setdefault(order_lumi.identifier, order_lumi)
+            identifiers_broker = {order.identifier for order in orders_broker}
+
             # Check orders at the broker against those in lumibot.
             for order in orders_broker:
                 # Check against existing orders.
-                order_lumi = [ord_lumi for ord_lumi in orders_lumi if ord_lumi.identifier == order.identifier]
-                order_lumi = order_lumi[0] if len(order_lumi) > 0 else None
+                order_lumi = orders_lumi_by_id.get(order.identifier)
 
                 if order_lumi:
                     # Compare the orders.
@@ -184,7 +221,7 @@ class StrategyExecutor(Thread):
 
             for order_lumi in orders_lumi:
                 # Remove lumibot orders if not in broker.
-                if order_lumi.identifier not in [order.identifier for order in orders_broker]:
+                if order_lumi.identifier not in identifiers_broker:
                     # Filled or canceled orders can be dropped by the broker as they no longer have any effect.
                     # However, active orders should not be dropped as they are still in effect and if they can't
                     # be found in the broker, they should be canceled because something went wrong.
@@ -195,9 +232,23 @@ class StrategyExecutor(Thread):
                         )
                         self.broker._process_trade_event(order_lumi, "canceled")
 
+        self._last_full_sync = time.monotonic()
         self.broker._hold_trade_events = False
         self.broker.process_held_trades()
 
+    def _can_trust_stream(self):
+        """Returns True if the reconciliation of the orders and positions can be skipped, because the broker streams
+        its trade events and the last full sync was less than STREAM_SYNC_SECONDS ago, see Broker.STREAM_SYNC_SECONDS.
+        """
+        trust_seconds = getattr(self.broker, "STREAM_SYNC_SECONDS", 0)
+        return (
+            trust_seconds > 0
+            and self._last_full_sync is not None
+            and not self.broker._first_iteration
+            and self.broker._is_stream_subscribed
+            and time.monotonic() - self._last_full_sync < trust_seconds
+        )
+
     def add_event(self, event_name, payload):
         self.queue.put((event_name, payload))
 
@@ -750,6 +801,95 @@ class StrategyExecutor(Thread):
 
         return True
 
+    def _get_backtest_timeline(self, time_to_close, strategy_sleeptime):
+        """Precompute the trading iterations left in the current backtesting session.
+
+        The iteration schedule starts at the current backtesting datetime and is spaced by the strategy's sleeptime.
+        It stops at the first iteration from which _strategy_sleep would behave differently, because the next one
+        would cross the market close or enter the minutes_before_closing window. The bars of the data between two
+        iterations are not part of the timeline: pending orders are only evaluated at the iterations, so these bars
+        can't change the state of the strategy and the next iteration is always the next step that can.
+
+        Parameters
+        ----------
+        time_to_close : float
+            The number of seconds left until the market closes.
+        strategy_sleeptime : float
+            The sleeptime of the strategy, in seconds.
+
+        Returns
+        -------
+        np.ndarray
+            The datetimes of the iterations, the first one being the current datetime.
+        """
+        # Seconds left before the close at each iteration, the last one is always past the close
+        steps = int(time_to_close // strategy_sleeptime) + 2
+        offsets = np.arange(steps, dtype=np.float64) * strategy_sleeptime
+        remaining = time_to_close - offsets
+        can_sleep = (remaining > self.strategy.minutes_before_closing * 60) & (remaining >= strategy_sleeptime)
+        offsets = offsets[: int(np.argmin(can_sleep)) + 1]
+
+        iteration_datetimes = pd.Timestamp(self.broker.datetime) + pd.to_timedelta(offsets, unit="s")
+        return iteration_datetimes.to_pydatetime()
+
+    def _has_pending_orders(self):
+        """Whether the strategy has orders that process_pending_orders would evaluate"""
+        return any(
+            order.status in ["unprocessed", "new"] for order in self.broker.get_tracked_orders(self.strategy.name)
+        )
+
+    def _run_backtest_timeline(self, time_to_close):
+        """Run the trading iterations of the current session over a precomputed timeline.
+
+        This skips the per iteration market hours lookups, sleeptime parsing, datetime arithmetic and logging done by
+        _strategy_sleep, and the pending orders pass of the iterations where the strategy has no pending orders (it
+        still runs right after a pass that had some, so that the positions it filled are checked for expired
+        contracts as usual). As soon as the strategy changes its sleeptime or moves the datetime itself (eg. with
+        self.sleep), or the timeline is exhausted, _strategy_sleep is used to move to the next iteration so that these
+        cases, crossing the market close and processing expired contracts are handled as usual.
+
+        Parameters
+        ----------
+        time_to_close : float
+            The number of seconds left until the market closes.
+
+        Returns
+        -------
+        bool
+            True if the regular backtesting loop should continue after the timeline, False otherwise.
+        """
+        sleeptime = self.strategy.sleeptime
+        strategy_sleeptime = self._sleeptime_to_seconds(sleeptime)
+        if strategy_sleeptime <= 0:
+            return self._strategy_sleep()
+
+        datetime_end = self.broker.data_source.datetime_end
+        process_orders = True
+        for i, dt in enumerate(self._get_backtest_timeline(time_to_close, strategy_sleeptime)):
+            if i > 0:
+                if not self.should_continue:
+                    return False
+
+                self.process_queue()
+                self.broker._update_datetime(dt, cash=self.strategy.cash, portfolio_value=self.strategy.portfolio_value)
+
+            # Stop after we pass the backtesting end date
+            if dt > datetime_end:
+                return False
+
+            self._on_trading_iteration()
+
+            # Nothing but pending orders (or the positions they just filled) can change in the orders pass
+            has_pending_orders = self._has_pending_orders()
+            if process_orders or has_pending_orders:
+                self.broker.process_pending_orders(strategy=self.strategy)
+            process_orders = has_pending_orders
+
+            if self.strategy.sleeptime != sleeptime or self.broker.datetime != dt:
+                break
+
+        return self._strategy_sleep()
+
     # ======Execution methods ====================
     def _run_trading_session(self):
         """This is really intraday trading method. Timeframes of less than a day, seconds,
@@ -769,9 +909,9 @@ class StrategyExecutor(Thread):
             and self.broker.data_source.SOURCE == "PANDAS"
             and self.broker.data_source._timestep == "day"
         ):
-            if self.broker.data_source._iter_count is None:
+            if self.broker.data_source._iter_count is None or self._shared_clock is not None:
                 # Get the first date from _date_index equal or greater than
-                # backtest start date.
+                # backtest start date. The strategies sharing a clock all move to the date after the shared datetime.
                 dates = self.broker.data_source._date_index
                 self.broker.data_source._iter_count = dates.get_loc(dates[dates > self.broker.datetime][0])
             else:
@@ -842,10 +982,15 @@ class StrategyExecutor(Thread):
                 # closing.
                 should_we_stop = time_to_close <= self.strategy.minutes_before_closing * 60
 
-            # Start the check_queue thread which will run continuously in the background, checking if any items have
-            # been added to the queue and executing them.
-            check_queue_thread = Thread(target=self.check_queue)
-            check_queue_thread.start()
+            # Start the check_queue thread (or coroutine in async mode) which will run continuously in the background,
+            # checking if any items have been added to the queue and executing them.
+            async_engine = getattr(self.broker, "async_engine", None)
+            if async_engine is not None:
+                if self._check_queue_task is None or self._check_queue_task.done():
+                    self._check_queue_task = async_engine.submit(self.check_queue_async(async_engine))
+            else:
+                check_queue_thread = Thread(target=self.check_queue)
+                check_queue_thread.start()
 
             next_run_time = self.get_next_ap_scheduler_run_time()
             if next_run_time is not None:
@@ -883,10 +1028,19 @@ class StrategyExecutor(Thread):
         #####
         # The main loop for backtesting if strategy is 24 hours
         ####
-        # TODO: speed up this loop for backtesting (it's a major bottleneck)
 
         if self.strategy.is_backtesting:
-            while is_247 or (time_to_close is not None and (time_to_close > self.strategy.minutes_before_closing * 60)):
+            should_continue = is_247 or (
+                time_to_close is not None and (time_to_close > self.strategy.minutes_before_closing * 60)
+            )
+
+            # Fast forward through the iterations of this session that are known in advance, then fall back to the
+            # regular loop for whatever is left (eg. when the next iteration crosses the market close).
+            # The strategies sharing a clock interleave their iterations, so they always use the regular loop.
+            if should_continue and not is_247 and self.broker.IS_BACKTESTING_BROKER and self._shared_clock is None:
+                should_continue = self._run_backtest_timeline(time_to_close)
+
+            while should_continue:
                 # Stop after we pass the backtesting end date
                 if self.broker.IS_BACKTESTING_BROKER and self.broker.datetime > self.broker.data_source.datetime_end:
                     break
@@ -927,6 +1081,18 @@ class StrategyExecutor(Thread):
         return next_run_time
 
     def run(self):
+        clock = self._shared_clock
+        if clock is None:
+            return self._run()
+
+        # Wait for the turn of this strategy, and let the other strategies go on once it's finished
+        clock.start(self.broker)
+        try:
+            return self._run()
+        finally:
+            clock.stop(self.broker)
+
+    def _run(self):
         # Overloading the broker sleep method
         self.broker.sleep = self.safe_sleep
 
@@ -0,0 +1,227 @@
+import numpy as np
+from scipy.special import ndtr
+
+# Same conventions as black_scholes.BS: the interest rate and the volatility are percentages (eg. 5 for 5%),
+# and the time to expiration is in days.
+
+# Bounds of the implied volatility search, in percent
+MIN_VOLATILITY = 0.001
+MAX_VOLATILITY = 500.0
+
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+
+def _prepare(underlying_price, strike, interest_rate, days_to_expiration, value):
+    """Broadcasts the inputs and converts the rate to a fraction and the days to years."""
+    s, k, r, days, value = np.broadcast_arrays(
+        *[np.asarray(array, dtype=np.float64) for array in [underlying_price, strike, interest_rate,
+                                                             days_to_expiration, value]]
+    )
+    return s, k, r / 100, days / 365, value
+
+
+def _d1_d2(s, k, r, t, sigma):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = sigma * np.sqrt(t)
+        d1 = (np.log(s / k) + (r + sigma**2 / 2) * t) / a
+    return d1, d1 - a
+
+
+def _price(s, k, r, t, sigma, is_call):
+    """Black-Scholes price, the intrinsic value where the option has expired or has no volatility."""
+    d1, d2 = _d1_d2(s, k, r, t, sigma)
+    discount = np.exp(-r * np.maximum(t, 0))
+    call = s * ndtr(d1) - k * discount * ndtr(d2)
+    put = k * discount * ndtr(-d2) - s * ndtr(-d1)
+    price = np.where(is_call, call, put)
+
+    expired = (t <= 0) | (sigma <= 0)
+    if expired.any():
+        intrinsic = np.where(is_call, np.maximum(s - k, 0.0), np.maximum(k - s, 0.0))
+        price = np.where(expired, intrinsic, price)
+    return price
+
+
+def bs_price(underlying_price, strike, interest_rate, days_to_expiration, volatility, is_call):
+    """
+    Prices European options on stocks without dividends with Black-Scholes, for arrays of options at once.
+
+    All the parameters are broadcast against each other, so a whole chain can be priced with one
+    underlying price and arrays of strikes.
+
+    Parameters
+    ----------
+    underlying_price : float or array_like
+        The price of the underlying asset.
+    strike : float or array_like
+        The strike prices.
+    interest_rate : float or array_like
+        The risk-free interest rate in percent, eg. 5 for 5%.
+    days_to_expiration : float or array_like
+        The number of days to expiration, fractional days are allowed.
+    volatility : float or array_like
+        The volatility in percent, eg. 20 for 20%.
+    is_call : bool or array_like
+        True for calls, False for puts.
+
+    Returns
+    -------
+    numpy.ndarray
+        The option prices. Options that expired or have no volatility are worth their intrinsic value.
+    """
+    s, k, r, t, volatility = _prepare(underlying_price, strike, interest_rate, days_to_expiration, volatility)
+    return _price(s, k, r, t, volatility / 100, np.asarray(is_call, dtype=bool))
+
+
+def bs_greeks(underlying_price, strike, interest_rate, days_to_expiration, volatility, is_call):
+    """
+    Computes the price and the greeks of European options with Black-Scholes, for arrays of options at once.
+
+    The greeks use the same units as black_scholes.BS: vega is per 1% of volatility and theta is per day.
+
+    Parameters
+    ----------
+    underlying_price : float or array_like
+        The price of the underlying asset.
+    strike : float or array_like
+        The strike prices.
+    interest_rate : float or array_like
+        The risk-free interest rate in percent, eg. 5 for 5%.
+    days_to_expiration : float or array_like
+        The number of days to expiration, fractional days are allowed.
+    volatility : float or array_like
+        The volatility in percent, eg. 20 for 20%. NaN volatilities give NaN greeks.
+    is_call : bool or array_like
+        True for calls, False for puts.
+
+    Returns
+    -------
+    dict of numpy.ndarray
+        The ``option_price``, ``delta``, ``gamma``, ``vega``, ``theta`` and ``rho`` of the options.
+    """
+    s, k, r, t, volatility = _prepare(underlying_price, strike, interest_rate, days_to_expiration, volatility)
+    sigma = volatility / 100
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), s.shape)
+
+    d1, d2 = _d1_d2(s, k, r, t, sigma)
+    pdf_d1 = _norm_pdf(d1)
+    discount = np.exp(-r * np.maximum(t, 0))
+    sqrt_t = np.sqrt(np.maximum(t, 0))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = np.where(is_call, ndtr(d1), -ndtr(-d1))
+        gamma = pdf_d1 / (s * sigma * sqrt_t)
+        vega = s * pdf_d1 * sqrt_t / 100
+        decay = -s * pdf_d1 * sigma / (2 * sqrt_t)
+        theta = np.where(is_call, decay - r * k * discount * ndtr(d2), decay + r * k * discount * ndtr(-d2)) / 365
+        rho = np.where(is_call, k * t * discount * ndtr(d2), -k * t * discount * ndtr(-d2)) / 100
+
+    # Expired options (or no volatility) only have their intrinsic value left
+    expired = ((t <= 0) | (sigma <= 0)) & ~np.isnan(sigma)
+    if expired.any():
+        in_the_money = np.where(is_call, s > k, s < k)
+        delta = np.where(expired, np.where(in_the_money, np.where(is_call, 1.0, -1.0), 0.0), delta)
+        gamma = np.where(expired, 0.0, gamma)
+        vega = np.where(expired, 0.0, vega)
+        theta = np.where(expired, 0.0, theta)
+        rho = np.where(expired, 0.0, rho)
+
+    return {
+        "option_price": _price(s, k, r, t, sigma, is_call),
+        "delta": delta,
+        "gamma": gamma,
+        "vega": vega,
+        "theta": theta,
+        "rho": rho,
+    }
+
+
+def implied_volatility(
+    option_price, underlying_price, strike, interest_rate, days_to_expiration, is_call, tolerance=1e-8, max_iter=100
+):
+    """
+    Solves the Black-Scholes implied volatility of arrays of options at once.
+
+    Each option is solved with Newton's method on the volatility, safeguarded by a bracket: when a Newton step
+    leaves the bracket (or vega is too small to take one), the option takes a bisection step instead. This
+    converges in a handful of iterations for most options and never diverges.
+
+    Like black_scholes.BS, prices above the price at ``MAX_VOLATILITY`` give ``MAX_VOLATILITY``, and prices
+    below the intrinsic value give ``MIN_VOLATILITY``.
+
+    Parameters
+    ----------
+    option_price : float or array_like
+        The prices of the options. Missing (NaN) or non-positive prices give a NaN volatility.
+    underlying_price : float or array_like
+        The price of the underlying asset.
+    strike : float or array_like
+        The strike prices.
+    interest_rate : float or array_like
+        The risk-free interest rate in percent, eg. 5 for 5%.
+    days_to_expiration : float or array_like
+        The number of days to expiration. Expired options give a NaN volatility.
+    is_call : bool or array_like
+        True for calls, False for puts.
+    tolerance : float
+        The options are solved when their price is within this tolerance of the target price.
+    max_iter : int
+        The maximum number of iterations.
+
+    Returns
+    -------
+    numpy.ndarray
+        The implied volatilities in percent.
+    """
+    s, k, r, t, target = _prepare(underlying_price, strike, interest_rate, days_to_expiration, option_price)
+    shape = s.shape
+    s, k, r, t, target = s.ravel(), k.ravel(), r.ravel(), t.ravel(), target.ravel()
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), shape).ravel()
+
+    result = np.full(len(s), np.nan)
+    with np.errstate(invalid="ignore"):
+        valid = (target > 0) & (t > 0) & (k > 0) & (s > 0)
+
+    low = np.full(len(s), MIN_VOLATILITY / 100)
+    high = np.full(len(s), MAX_VOLATILITY / 100)
+    intrinsic = np.where(is_call, s - k, k - s)
+    below_intrinsic = valid & (intrinsic > target)
+    above_max = valid & ~below_intrinsic & (_price(s, k, r, t, high, is_call) < target)
+    result[below_intrinsic] = MIN_VOLATILITY
+    result[above_max] = MAX_VOLATILITY
+
+    # Start from the Brenner-Subrahmanyam approximation, which is close for options near the money
+    idx = np.flatnonzero(valid & ~below_intrinsic & ~above_max)
+    s, k, r, t, target, is_call = s[idx], k[idx], r[idx], t[idx], target[idx], is_call[idx]
+    low, high = low[idx], high[idx]
+    sigma = np.clip(np.sqrt(2 * np.pi / t) * target / s, low, high)
+
+    for _ in range(max_iter):
+        if len(idx) == 0:
+            break
+
+        d1, _d2 = _d1_d2(s, k, r, t, sigma)
+        diff = _price(s, k, r, t, sigma, is_call) - target
+        done = np.abs(diff) < tolerance
+        if done.any():
+            result[idx[done]] = sigma[done] * 100
+            keep = ~done
+            idx, s, k, r, t, target, is_call = idx[keep], s[keep], k[keep], r[keep], t[keep], target[keep], is_call[keep]
+            sigma, low, high, diff, d1 = sigma[keep], low[keep], high[keep], diff[keep], d1[keep]
+
+        # The price increases with the volatility, so the root is below sigma if the price is too high
+        high = np.where(diff > 0, sigma, high)
+        low = np.where(diff < 0, sigma, low)
+
+        vega = s * _norm_pdf(d1) * np.sqrt(t)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = sigma - diff / vega
+        bisect = (low + high) / 2
+        use_newton = np.isfinite(newton) & (newton > low) & (newton < high)
+        sigma = np.where(use_newton, newton, bisect)
+
+    # Options that didn't converge within max_iter take the last estimate
+    result[idx] = sigma * 100
+    return result.reshape(shape)
@@ -0,0 +1,212 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Changing how PandasData aligns the data (or the files of a snapshot) must change this, so older snapshots are not used
+SNAPSHOT_VERSION = 2
+
+
+def fingerprint_data(data):
+    """Returns a digest of the content of a Data: its asset, quote, timestep, storage mode and every value of its
+    dataframe.
+
+    The aligned data of a compact Data is saved with the precision of its compact datalines, so it must not be
+    loaded by a Data that isn't compact (and the other way around).
+
+    Parameters
+    ----------
+    data : Data
+        The data, before it is aligned by PandasData.load_data.
+
+    Returns
+    -------
+    str
+    """
+    digest = hashlib.sha1()
+    for asset in (data.asset, data.quote):
+        fields = (
+            (asset.symbol, asset.asset_type, asset.expiration, asset.strike, asset.right, asset.multiplier)
+            if asset is not None
+            else None
+        )
+        digest.update(repr(fields).encode())
+    digest.update(repr((data.timestep, data.compact, list(data.df.columns), [str(dtype) for dtype in data.df.dtypes])).encode())
+    digest.update(str(data.df.index.dtype).encode())
+    digest.update(data.df.index.asi8.tobytes() if isinstance(data.df.index, pd.DatetimeIndex) else b"")
+
+    # The bytes of the numeric columns are hashed as they are, hashlib releases the GIL while hashing them
+    for column in data.df.columns:
+        values = data.df[column].to_numpy()
+        if values.dtype.kind in "biufcmM":
+            digest.update(np.ascontiguousarray(values).view(np.uint8))
+        else:
+            digest.update(pd.util.hash_pandas_object(data.df[column], index=False).to_numpy().tobytes())
+    if not isinstance(data.df.index, pd.DatetimeIndex):
+        digest.update(pd.util.hash_pandas_object(data.df.index).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def build_snapshot_key(datas, datetime_start, datetime_end, timestep):
+    """Returns the key of the snapshot of the aligned data, the digest of everything the alignment depends on.
+
+    Parameters
+    ----------
+    datas : list of Data
+        The data, in the order of the data store.
+    datetime_start : datetime
+        The start of the backtest.
+    datetime_end : datetime
+        The end of the backtest.
+    timestep : str
+        The timestep of the data store.
+
+    Returns
+    -------
+    str
+    """
+    digest = hashlib.sha1()
+    digest.update(repr((SNAPSHOT_VERSION, str(datetime_start), str(datetime_end), timestep)).encode())
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        for fingerprint in executor.map(fingerprint_data, datas):
+            digest.update(fingerprint.encode())
+    return digest.hexdigest()
+
+
+def _write_table(df, filename, preserve_index=True):
+    table = pa.Table.from_pandas(df, preserve_index=preserve_index)
+
+    # NaN are saved as NaN instead of nulls, so the float columns can be read back without a copy
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if values.dtype.kind == "f":
+            index = table.schema.get_field_index(str(name))
+            table = table.set_column(index, table.field(index), pa.array(values, from_pandas=False))
+
+    with pa.OSFile(str(filename), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read_table(filename):
+    # The numeric columns without nulls are read-only views of the memory-mapped file (which stays mapped as long
+    # as they are used), split_blocks keeps pandas from copying them into a single block per dtype
+    with pa.memory_map(str(filename), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def save_snapshot(snapshot_folder, date_index, calendar, dfs):
+    """Saves the aligned data of a PandasData as a snapshot folder of uncompressed Arrow IPC files.
+
+    The index of each aligned dataframe is a slice of the global index, so only the index of the global index is
+    saved. The files are written in a temporary folder that is then renamed, so a snapshot is never left half written,
+    and a snapshot written at the same time by another backtest is kept as is.
+
+    Parameters
+    ----------
+    snapshot_folder : Path
+        The folder of the snapshot, named after its key.
+    date_index : pd.DatetimeIndex
+        The global index of the data store.
+    calendar : pd.DataFrame
+        The trading days returned by PandasData.load_data.
+    dfs : iterable of pd.DataFrame
+        The aligned dataframes, in the order of the data store.
+    """
+    snapshot_folder = Path(snapshot_folder)
+    snapshot_folder.parent.mkdir(parents=True, exist_ok=True)
+    temp_folder = Path(tempfile.mkdtemp(prefix=f"{snapshot_folder.name}.", suffix=".tmp", dir=snapshot_folder.parent))
+    try:
+        _write_table(pd.DataFrame(index=date_index), temp_folder / "index.arrow")
+        _write_table(calendar, temp_folder / "calendar.arrow")
+        for i, df in enumerate(dfs):
+            _write_table(df, temp_folder / f"{i}.arrow", preserve_index=False)
+        os.rename(temp_folder, snapshot_folder)
+    except OSError:
+        if not snapshot_folder.is_dir():
+            raise
+    finally:
+        shutil.rmtree(temp_folder, ignore_errors=True)
+
+
+def load_snapshot(snapshot_folder, count):
+    """Loads a snapshot saved by save_snapshot, by memory-mapping its files.
+
+    The numeric columns of the dataframes are read-only views of the files, and the modification time of the
+    snapshot folder is updated so that prune_snapshots keeps the snapshots used recently.
+
+    Parameters
+    ----------
+    snapshot_folder : Path
+        The folder of the snapshot.
+    count : int
+        The number of dataframes in the snapshot.
+
+    Returns
+    -------
+    tuple or None
+        The global index, the trading days and the list of aligned dataframes (with a RangeIndex, the caller
+        sets their slice of the global index), or None if there is no snapshot or it can't be read.
+    """
+    snapshot_folder = Path(snapshot_folder)
+    if not snapshot_folder.is_dir():
+        return None
+
+    try:
+        date_index = _read_table(snapshot_folder / "index.arrow").index
+        calendar = _read_table(snapshot_folder / "calendar.arrow")
+        dfs = [_read_table(snapshot_folder / f"{i}.arrow") for i in range(count)]
+    except (OSError, pa.ArrowException) as e:
+        logging.warning(f"Could not read the data snapshot {snapshot_folder}, the data will be aligned again: {e}")
+        return None
+
+    try:
+        os.utime(snapshot_folder)
+    except OSError:
+        pass
+    return date_index, calendar, dfs
+
+
+def prune_snapshots(folder, max_snapshots):
+    """Deletes the least recently used snapshots of a folder, so that at most max_snapshots are left.
+
+    A snapshot is used when it is saved or loaded. The snapshots can also be deleted by hand, or all at once by
+    deleting the folder, they are saved again the next time they are needed.
+
+    Parameters
+    ----------
+    folder : Path
+        The folder of the snapshots, eg. PandasData.SNAPSHOT_FOLDER.
+    max_snapshots : int
+        The number of snapshots to keep.
+
+    Returns
+    -------
+    int
+        The number of snapshots deleted.
+    """
+    folder = Path(folder)
+    if not folder.is_dir():
+        return 0
+
+    # The temporary folders of the snapshots being saved are left alone
+    snapshots = []
+    for path in folder.iterdir():
+        if path.is_dir() and not path.name.endswith(".tmp"):
+            try:
+                snapshots.append((path.stat().st_mtime, path))
+            except OSError:
+                pass
+    snapshots.sort(reverse=True)
+
+    for _, path in snapshots[max_snapshots:]:
+        shutil.rmtree(path, ignore_errors=True)
+    return max(0, len(snapshots) - max_snapshots)
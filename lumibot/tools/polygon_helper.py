@@ -1,17 +1,23 @@
 # This file contains helper functions for getting data from Polygon.io
 import logging
+import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from pathlib import Path
 import os
 from urllib3.exceptions import MaxRetryError
 from urllib.parse import urlparse, urlunparse
 
+import numpy as np
 import pandas as pd
 import pandas_market_calendars as mcal
+import pyarrow as pa
 
 # noinspection PyPackageRequirements
 from polygon import RESTClient
+from polygon.exceptions import BadResponse
 from typing import Iterator
 from termcolor import colored
 from tqdm import tqdm
@@ -22,6 +28,9 @@ from lumibot import LUMIBOT_DEFAULT_PYTZ
 
 MAX_POLYGON_DAYS = 30
 
+# Seconds to wait before retrying a failed Polygon request, doubled after each attempt
+RETRY_BACKOFF_SECONDS = 2
+
 # Define a cache dictionary to store schedules and a global dictionary for buffered schedules
 schedule_cache = {}
 buffered_schedules = {}
@@ -72,6 +81,7 @@ def get_price_data_from_polygon(
     timespan: str = "minute",
     quote_asset: Asset = None,
     force_cache_update: bool = False,
+    polygon_client: RESTClient = None,
 ):
     """
     Queries Polygon.io for pricing data for the given asset and returns a DataFrame with the data. Data will be
@@ -99,6 +109,8 @@ def get_price_data_from_polygon(
         "month", "quarter"
     quote_asset : Asset
         The quote asset for the asset we are getting data for. This is only needed for Forex assets.
+    polygon_client : RESTClient
+        The client used to query Polygon. If None, a PolygonClient is created with the api_key.
 
     Returns
     -------
@@ -106,57 +118,305 @@ def get_price_data_from_polygon(
         A DataFrame with the pricing data for the asset
 
     """
+    download = PriceDataDownload(api_key, asset, start, end, timespan, quote_asset, force_cache_update, polygon_client)
+    if download.chunks is None:
+        return download.df_all
 
-    # Check if we already have data for this asset in the feather file
-    cache_file = build_cache_filename(asset, timespan)
-    # Check whether it might be stale because of splits.
-    force_cache_update = validate_cache(force_cache_update, asset, cache_file, api_key)
-    
-    df_all = None
-    # Load from the cache file if it exists.  
-    if cache_file.exists() and not force_cache_update:
-        logging.debug(f"Loading pricing data for {asset} / {quote_asset} with '{timespan}' timespan from cache file...")
-        df_all = load_cache(cache_file)
-
-    # Check if we need to get more data
-    missing_dates = get_missing_dates(df_all, asset, start, end)
-    if not missing_dates:
-        # TODO: Do this upstream so we don't repeatedly call for known-to-be-missing bars.
-        # Drop the rows with all NaN values that were added to the feather for symbols that have missing bars.
-        df_all.dropna(how="all", inplace=True)
+    # Initialize tqdm progress bar
+    description = f"\nDownloading data for {asset} / {quote_asset} '{timespan}' from Polygon..."
+    pbar = tqdm(total=len(download.chunks), desc=description, dynamic_ncols=True)
+
+    results = []
+    for poly_start, poly_end in download.chunks:
+        results.append(
+            get_aggs_from_polygon(download.polygon_client, download.symbol, poly_start, poly_end, timespan)
+        )
+
+        # Update progress bar after each query
+        pbar.update(1)
+
+    # Close the progress bar when done
+    pbar.close()
+
+    return download.finish(results)
+
+
+def prefetch_price_data_from_polygon(
+    api_key: str,
+    requirements: list,
+    max_workers: int = 8,
+    requests_per_minute: float = None,
+    retries: int = 3,
+    force_cache_update: bool = False,
+    polygon_client: RESTClient = None,
+):
+    """
+    Downloads the pricing data of many assets from Polygon.io concurrently and merges it into the cache, so that
+    a backtest can then read it from the cache without waiting on the network.
+
+    The missing date ranges of all the assets are split into ``MAX_POLYGON_DAYS`` chunks that are queried by a
+    pool of ``max_workers`` threads. All the requests (including the splits and option contracts lookups) go
+    through a token bucket when ``requests_per_minute`` is set (eg. 5 for the free Polygon plan), and failed
+    requests are retried with an exponential backoff.
+
+    Parameters
+    ----------
+    api_key : str
+        The API key for Polygon.io
+    requirements : list of tuple
+        The data to get, as ``(asset, start, end, timespan)`` or ``(asset, start, end, timespan, quote_asset)``
+        tuples. The requirements for the same asset, quote and timespan are merged into one date range.
+    max_workers : int
+        The number of requests sent to Polygon at the same time.
+    requests_per_minute : float
+        The maximum number of requests sent to Polygon per minute. If None, the requests are not limited.
+    retries : int
+        The number of times a failed request is retried. Errors returned by Polygon (eg. an invalid API key)
+        are not retried.
+    force_cache_update : bool
+        If True, the data is downloaded again even if it is already in the cache.
+    polygon_client : RESTClient
+        The client used to query Polygon. If None, a PolygonClient is created with the api_key.
+
+    Returns
+    -------
+    dict
+        The pricing data of each requirement, keyed by ``(asset, quote_asset, timespan)``. The data is None if
+        Polygon doesn't know the asset. The requirements that failed (after the retries) are logged and left out,
+        the data of the others is still returned and cached.
+    """
+    # Merge the date ranges of the same asset, quote and timespan
+    ranges = {}
+    for requirement in requirements:
+        asset, start, end, timespan = requirement[:4]
+        quote_asset = requirement[4] if len(requirement) > 4 else None
+        key = (asset, quote_asset, timespan)
+        if key in ranges:
+            start = min(start, ranges[key][0])
+            end = max(end, ranges[key][1])
+        ranges[key] = (start, end)
+
+    if polygon_client is None:
+        polygon_client = PolygonClient.create(api_key=api_key)
+    rate_limiter = TokenBucket(requests_per_minute / 60) if requests_per_minute else None
+
+    # The error of each requirement that couldn't be downloaded, the others are downloaded anyway
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Load the caches and find the missing chunks (option symbols and splits are queried here too)
+        download_futures = {
+            key: executor.submit(
+                PriceDataDownload, api_key, key[0], start, end, key[2], key[1], force_cache_update, polygon_client,
+                rate_limiter=rate_limiter, retries=retries,
+            )
+            for key, (start, end) in ranges.items()
+        }
+        downloads = {}
+        for key, future in download_futures.items():
+            if future.exception() is not None:
+                errors[key] = future.exception()
+            else:
+                downloads[key] = future.result()
+
+        # Query all the chunks of all the assets at once
+        chunk_futures = {
+            key: [
+                executor.submit(
+                    get_aggs_from_polygon,
+                    polygon_client,
+                    download.symbol,
+                    poly_start,
+                    poly_end,
+                    download.timespan,
+                    rate_limiter=rate_limiter,
+                    retries=retries,
+                )
+                for poly_start, poly_end in download.chunks or []
+            ]
+            for key, download in downloads.items()
+        }
+
+        total = sum(len(futures) for futures in chunk_futures.values())
+        pbar = tqdm(total=total, desc="\nDownloading data from Polygon...", dynamic_ncols=True)
+        for key, futures in chunk_futures.items():
+            for future in futures:
+                if future.exception() is not None:
+                    errors.setdefault(key, future.exception())
+                pbar.update(1)
+        pbar.close()
+
+    # Merge the chunks into the caches. The data of an asset with a failed chunk is not saved, or the dates of
+    # the chunk would be cached as missing.
+    data = {}
+    for key, download in downloads.items():
+        if key in errors:
+            continue
+        if download.chunks is None:
+            data[key] = download.df_all
+        else:
+            data[key] = download.finish([future.result() for future in chunk_futures[key]])
+
+    for (asset, quote_asset, timespan), error in errors.items():
+        logging.error(f"Error downloading {asset} / {quote_asset} '{timespan}' from Polygon: {error}")
+    return data
+
+
+class PriceDataDownload:
+    """
+    The data of an asset that is in the cache and the chunks that have to be downloaded from Polygon to
+    complete it, see get_price_data_from_polygon.
+
+    After the chunks have been queried, ``finish`` merges them with the cached data and updates the cache.
+    ``chunks`` is None if nothing has to be downloaded, in which case ``df_all`` is the result. The Polygon
+    requests made here (splits and option contracts) go through ``rate_limiter`` and are retried ``retries``
+    times, see request_polygon.
+    """
+
+    def __init__(self, api_key, asset, start, end, timespan, quote_asset=None, force_cache_update=False,
+                 polygon_client=None, rate_limiter=None, retries=0):
+        self.asset = asset
+        self.start = start
+        self.end = end
+        self.timespan = timespan
+        self.symbol = None
+        self.chunks = None
+
+        # Check if we already have data for this asset in the cache
+        cache_file = build_cache_filename(asset, timespan)
+        self.cache_folder = build_cache_folder(asset, timespan)
+        # Check whether it might be stale because of splits.
+        force_cache_update = validate_cache(
+            force_cache_update, asset, cache_file, api_key, polygon_client, rate_limiter=rate_limiter, retries=retries
+        )
+
+        self.df_all = None
+        # Load the partitions of the cache that cover the requested dates.
+        if not force_cache_update:
+            migrate_cache_file(cache_file, self.cache_folder)
+            logging.debug(f"Loading pricing data for {asset} / {quote_asset} with '{timespan}' timespan from cache...")
+            self.df_all = load_cache_partitions(self.cache_folder, start, end)
+        self.cached_index = self.df_all.index if self.df_all is not None else pd.DatetimeIndex([], tz="UTC")
+
+        # Check if we need to get more data
+        missing_dates = get_missing_dates(self.df_all, asset, start, end)
+        if not missing_dates:
+            # TODO: Do this upstream so we don't repeatedly call for known-to-be-missing bars.
+            # Drop the rows with all NaN values that were added to the cache for symbols that have missing bars.
+            self.df_all.dropna(how="all", inplace=True)
+            return
+
+        # RESTClient connection for Polygon Stock-Equity API; traded_asset is standard
+        # Add "trace=True" to see the API calls printed to the console for debugging
+        self.polygon_client = polygon_client if polygon_client is not None else PolygonClient.create(api_key=api_key)
+        # Will do a Polygon query for option contracts
+        self.symbol = get_polygon_symbol(
+            asset, self.polygon_client, quote_asset, rate_limiter=rate_limiter, retries=retries
+        )
+
+        # Check if symbol is None, which means we couldn't find the option contract
+        if self.symbol is None:
+            self.df_all = None
+            return
+
+        self.chunks = get_polygon_chunks(missing_dates)
+
+    def finish(self, results):
+        """Merges the results of the chunk queries into the data and updates the cache.
+
+        Parameters
+        ----------
+        results : list
+            The result of the query of each chunk, in the order of ``chunks``.
+
+        Returns
+        -------
+        pd.DataFrame
+            The pricing data of the asset.
+        """
+        df_all = self.df_all
+        for result in results:
+            if result:
+                df_all = update_polygon_data(df_all, result)
+
+        # Recheck for missing dates so they can be added in the cache update.
+        missing_dates = get_missing_dates(df_all, self.asset, self.start, self.end)
+
+        # Only the partitions with new bars (or missing dates) are written
+        new_index = df_all.index.difference(self.cached_index) if df_all is not None else self.cached_index
+        update_cache(self.cache_folder, df_all, missing_dates, months=cache_partition_months(new_index))
+
+        # TODO: Do this upstream so we don't have to reload the cache repeatedly for known-to-be-missing bars.
+        # Drop the rows with all NaN values that were added to the cache for symbols that have missing bars.
+        if df_all is not None:
+            df_all.dropna(how="all", inplace=True)
+
+        self.df_all = df_all
         return df_all
 
-    # print(f"\nGetting pricing data for {asset} / {quote_asset} with '{timespan}' timespan from Polygon...")
 
-    # RESTClient connection for Polygon Stock-Equity API; traded_asset is standard
-    # Add "trace=True" to see the API calls printed to the console for debugging
-    polygon_client = PolygonClient.create(api_key=api_key)
-    symbol = get_polygon_symbol(asset, polygon_client, quote_asset)  # Will do a Polygon query for option contracts
+def get_polygon_chunks(missing_dates):
+    """
+    Splits the range of missing dates into the date ranges of the queries to Polygon.
 
-    # Check if symbol is None, which means we couldn't find the option contract
-    if symbol is None:
-        return None
+    To reduce calls to Polygon, we call on full date ranges instead of including hours/minutes
+    get the full range of data we need in one call and ensure that there won't be any intraday gaps in the data.
+    Option data won't have any extended hours data so the padding is extra important for those.
+    Polygon only returns 50k results per query (~30days of 24hr 1min-candles) so we need to break up the query into
+    multiple queries if we are requesting more than 30 days of data
+
+    Parameters
+    ----------
+    missing_dates : list[datetime.date]
+        The sorted dates that are missing from the cache
 
-    # To reduce calls to Polygon, we call on full date ranges instead of including hours/minutes
-    # get the full range of data we need in one call and ensure that there won't be any intraday gaps in the data.
-    # Option data won't have any extended hours data so the padding is extra important for those.
+    Returns
+    -------
+    list[tuple]
+        The (start date, end date) of each query
+    """
     poly_start = missing_dates[0]  # Data will start at 8am UTC (4am EST)
     poly_end = missing_dates[-1]  # Data will end at 23:59 UTC (7:59pm EST)
 
-    # Initialize tqdm progress bar
-    total_days = (missing_dates[-1] - missing_dates[0]).days + 1
-    total_queries = (total_days // MAX_POLYGON_DAYS) + 1
-    description = f"\nDownloading data for {asset} / {quote_asset} '{timespan}' from Polygon..."
-    pbar = tqdm(total=total_queries, desc=description, dynamic_ncols=True)
-
-    # Polygon only returns 50k results per query (~30days of 24hr 1min-candles) so we need to break up the query into
-    # multiple queries if we are requesting more than 30 days of data
+    chunks = []
     delta = timedelta(days=MAX_POLYGON_DAYS)
     while poly_start <= missing_dates[-1]:
         if poly_end > poly_start + delta:
             poly_end = poly_start + delta
+        chunks.append((poly_start, poly_end))
+
+        poly_start = poly_end + timedelta(days=1)
+        poly_end = poly_start + delta
+    return chunks
+
+
+def get_aggs_from_polygon(polygon_client, symbol, poly_start, poly_end, timespan, rate_limiter=None, retries=0):
+    """
+    Queries the bars of a symbol between two dates from Polygon.
+
+    Parameters
+    ----------
+    polygon_client : RESTClient
+        The client used to query Polygon
+    symbol : str
+        The Polygon symbol, see get_polygon_symbol
+    poly_start : datetime.date
+        The first date of the bars
+    poly_end : datetime.date
+        The last date of the bars
+    timespan : str
+        The timespan of the bars, eg. "minute" or "day"
+    rate_limiter : TokenBucket
+        If set, a token is taken from the bucket before each request.
+    retries : int
+        The number of times the request is retried if it fails. Errors returned by Polygon are not retried.
 
-        result = polygon_client.get_aggs(
+    Returns
+    -------
+    list
+        The bars returned by Polygon
+    """
+    return request_polygon(
+        lambda: polygon_client.get_aggs(
             ticker=symbol,
             from_=poly_start,  # polygon-api-client docs say 'from' but that is a reserved word in python
             to=poly_end,
@@ -166,38 +426,101 @@ def get_price_data_from_polygon(
             multiplier=1,
             timespan=timespan,
             limit=50000,  # Max limit for Polygon
-        )
+        ),
+        symbol,
+        rate_limiter=rate_limiter,
+        retries=retries,
+    )
 
-        # Update progress bar after each query
-        pbar.update(1)
-
-        if result:
-            df_all = update_polygon_data(df_all, result)
-
-        poly_start = poly_end + timedelta(days=1)
-        poly_end = poly_start + delta
 
-    # Close the progress bar when done
-    pbar.close()
+def request_polygon(request, description, rate_limiter=None, retries=0):
+    """
+    Sends a request to Polygon, taking a token from the rate limiter first and retrying it if it fails.
 
-    # Recheck for missing dates so they can be added in the feather update.
-    missing_dates = get_missing_dates(df_all, asset, start, end)
-    update_cache(cache_file, df_all, missing_dates)
+    Parameters
+    ----------
+    request : callable
+        Sends the request and returns its result. Paginated results (eg. ``list_splits``) must be read in full
+        by the callable, so that the pages are requested (and retried) here too. A request counts as one token.
+    description : str
+        What is requested, for the logs.
+    rate_limiter : TokenBucket
+        If set, a token is taken from the bucket before each attempt.
+    retries : int
+        The number of times the request is retried if it fails. Errors returned by Polygon are not retried.
 
-    # TODO: Do this upstream so we don't have to reload feather repeatedly for known-to-be-missing bars.
-    # Drop the rows with all NaN values that were added to the feather for symbols that have missing bars.
-    if df_all is not None:
-        df_all.dropna(how="all", inplace=True)
+    Returns
+    -------
+    object
+        The result of the request.
+    """
+    for attempt in range(retries + 1):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            return request()
+        except BadResponse:
+            raise
+        except Exception as e:
+            if attempt == retries:
+                raise
+            wait = RETRY_BACKOFF_SECONDS * 2**attempt
+            logging.warning(f"Error getting {description} from Polygon ({e}), retrying in {wait} seconds")
+            time.sleep(wait)
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket used to limit the rate of the requests sent to Polygon.
 
-    return df_all
+    Parameters
+    ----------
+    rate : float
+        The number of tokens added to the bucket per second.
+    capacity : float
+        The maximum number of tokens in the bucket, ie. the largest burst of requests. Defaults to one
+        second of tokens (at least 1).
+    """
 
-def validate_cache(force_cache_update: bool, asset: Asset, cache_file: Path, api_key: str):
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, received {rate} instead")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Takes a token from the bucket, waiting until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def validate_cache(
+    force_cache_update: bool,
+    asset: Asset,
+    cache_file: Path,
+    api_key: str,
+    polygon_client=None,
+    rate_limiter=None,
+    retries: int = 0,
+):
     """
     If the list of splits for a stock have changed then we need to invalidate its cache
     because all of the prices will have changed (because we're using split adjusted prices).
     Get the splits data from Polygon only once per day per stock.
     Use the timestamp on the splits feather file to determine if we need to get the splits again.
-    When invalidating we delete the cache file and return force_cache_update=True too.
+    When invalidating we delete the cache (file and partitions) and return force_cache_update=True too.
+    The splits request goes through rate_limiter and is retried, see request_polygon.
     """
     if asset.asset_type not in [Asset.AssetType.STOCK, Asset.AssetType.OPTION]:
         return force_cache_update
@@ -209,12 +532,19 @@ def validate_cache(force_cache_update: bool, asset: Asset, cache_file: Path, api
         if splits_file_stale:
             cached_splits = pd.read_feather(splits_file_path)
     if splits_file_stale or force_cache_update:
-        polygon_client = PolygonClient.create(api_key=api_key)
+        if polygon_client is None:
+            polygon_client = PolygonClient.create(api_key=api_key)
         # Need to get the splits in execution order to make the list comparable across invocations.
-        splits = polygon_client.list_splits(ticker=asset.symbol, sort="execution_date", order="asc")
-        if isinstance(splits, Iterator):
+        def list_splits():
+            splits = polygon_client.list_splits(ticker=asset.symbol, sort="execution_date", order="asc")
             # Convert the generator to a list so DataFrame will make a row per item.
-            splits_df = pd.DataFrame(list(splits))
+            return list(splits) if isinstance(splits, Iterator) else splits
+
+        splits = request_polygon(
+            list_splits, f"the splits of {asset.symbol}", rate_limiter=rate_limiter, retries=retries
+        )
+        if isinstance(splits, list):
+            splits_df = pd.DataFrame(splits)
             if splits_file_path.exists() and cached_splits.eq(splits_df).all().all():
                 # No need to rewrite contents.  Just update the timestamp.
                 splits_file_path.touch()
@@ -222,6 +552,7 @@ def validate_cache(force_cache_update: bool, asset: Asset, cache_file: Path, api
                 logging.info(f"Invalidating cache for {asset.symbol} because its splits have changed.")
                 force_cache_update = True
                 cache_file.unlink(missing_ok=True)
+                shutil.rmtree(cache_file.with_suffix(""), ignore_errors=True)
                 # Create the directory if it doesn't exist
                 cache_file.parent.mkdir(parents=True, exist_ok=True)
                 splits_df.to_feather(splits_file_path)
@@ -273,7 +604,7 @@ def get_trading_dates(asset: Asset, start: datetime, end: datetime):
     return trading_days
 
 
-def get_polygon_symbol(asset, polygon_client, quote_asset=None):
+def get_polygon_symbol(asset, polygon_client, quote_asset=None, rate_limiter=None, retries=0):
     """
     Get the symbol for the asset in a format that Polygon will understand
     Parameters
@@ -284,6 +615,10 @@ def get_polygon_symbol(asset, polygon_client, quote_asset=None):
         The RESTClient connection for Polygon Stock-Equity API
     quote_asset : Asset
         The quote asset for the asset we are getting data for
+    rate_limiter : TokenBucket
+        If set, a token is taken from the bucket before querying the option contracts.
+    retries : int
+        The number of times the option contracts query is retried if it fails, see request_polygon.
 
     Returns
     -------
@@ -314,15 +649,20 @@ def get_polygon_symbol(asset, polygon_client, quote_asset=None):
         expired = True if asset.expiration < real_today else False
 
         # Query for the historical Option Contract ticker backtest is looking for
-        contracts = list(
-            polygon_client.list_options_contracts(
-                underlying_ticker=asset.symbol,
-                expiration_date=asset.expiration,
-                contract_type=asset.right.lower(),
-                strike_price=asset.strike,
-                expired=expired,
-                limit=10,
-            )
+        contracts = request_polygon(
+            lambda: list(
+                polygon_client.list_options_contracts(
+                    underlying_ticker=asset.symbol,
+                    expiration_date=asset.expiration,
+                    contract_type=asset.right.lower(),
+                    strike_price=asset.strike,
+                    expired=expired,
+                    limit=10,
+                )
+            ),
+            f"the option contract {asset}",
+            rate_limiter=rate_limiter,
+            retries=retries,
         )
 
         if len(contracts) == 0:
@@ -363,6 +703,14 @@ def build_cache_filename(asset: Asset, timespan: str):
     return cache_file
 
 
+def build_cache_folder(asset: Asset, timespan: str):
+    """Helper function to create the folder of the cache partitions for a given asset and timespan.
+
+    This is the cache filename without the ``.feather`` extension, eg. ``polygon/stock_SPY_minute``.
+    """
+    return build_cache_filename(asset, timespan).with_suffix("")
+
+
 def get_missing_dates(df_all, asset, start, end):
     """
     Check if we have data for the full range
@@ -423,22 +771,107 @@ def load_cache(cache_file):
     return df_feather
 
 
-def update_cache(cache_file, df_all, missing_dates=None):
-    """Update the cache file with the new data.  Missing dates are added as empty (all NaN) 
-    rows before it is saved to the cache file.
+def cache_partition_months(index):
+    """Returns the months (as ``YYYYMM`` integers) of the cache partitions that hold the rows of a
+    UTC DatetimeIndex."""
+    if len(index) == 0:
+        return set()
+    index = index.tz_convert("UTC") if index.tz is not None else index
+    return set(np.unique(index.year * 100 + index.month).tolist())
+
+
+def load_cache_partition(partition_file):
+    """Load one cache partition (an uncompressed Arrow IPC file) by memory-mapping it.
+
+    The ``datetime`` column holds int64 epoch nanoseconds in UTC, so it is turned into the index
+    without parsing any dates.
+    """
+    with pa.memory_map(str(partition_file), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    df = table.to_pandas()
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("datetime").to_numpy(), unit="ns", utc=True), name="datetime")
+    return df
+
+
+def load_cache_partitions(cache_folder, start=None, end=None):
+    """Load the cache partitions that cover the dates between start and end.
+
+    The cache of an asset and timespan is a folder with one Arrow IPC file per month (UTC) of data,
+    eg. ``2023-08.arrow``. Only the months between start and end (padded by a day) are read.
+
+    Parameters
+    ----------
+    cache_folder : Path
+        The folder of the cache partitions, see ``build_cache_folder``
+    start : datetime
+        The start date/time of the data. If None, all the partitions up to end are loaded.
+    end : datetime
+        The end date/time of the data. If None, all the partitions from start are loaded.
+
+    Returns
+    -------
+    pd.DataFrame or None
+        The cached data with a UTC DatetimeIndex, or None if there is no cached data for those dates.
+    """
+    cache_folder = Path(cache_folder)
+    if not cache_folder.is_dir():
+        return None
+
+    first_month = cache_partition_months(pd.DatetimeIndex([pd.Timestamp(start) - timedelta(days=1)])) if start else None
+    last_month = cache_partition_months(pd.DatetimeIndex([pd.Timestamp(end) + timedelta(days=1)])) if end else None
+
+    frames = []
+    for partition_file in sorted(cache_folder.glob("*.arrow")):
+        year, _, month = partition_file.stem.partition("-")
+        partition_month = int(year) * 100 + int(month)
+        if first_month and partition_month < min(first_month):
+            continue
+        if last_month and partition_month > max(last_month):
+            continue
+        frames.append(load_cache_partition(partition_file))
+
+    frames = [frame for frame in frames if len(frame) > 0]
+    if not frames:
+        return None
+    return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+
+def migrate_cache_file(cache_file, cache_folder):
+    """Move the data of a single-file feather cache (the previous cache format) into partitions."""
+    if not Path(cache_file).exists() or Path(cache_folder).is_dir():
+        return
+    logging.info(f"Moving the Polygon cache file {cache_file} to partitions in {cache_folder}")
+    update_cache(cache_folder, load_cache(cache_file))
+    Path(cache_file).unlink()
+
+
+def update_cache(cache_folder, df_all, missing_dates=None, months=None):
+    """Update the cache partitions with the new data.  Missing dates are added as empty (all NaN)
+    rows before it is saved to the cache.
+
+    Only the partitions of the given months are written. The rows of each of these months are
+    merged with the rows already in its partition, so the partitions of other months are never
+    read or rewritten.
 
     Parameters
     ----------
-    cache_file : Path
-        The path to the cache file
+    cache_folder : Path
+        The folder of the cache partitions, see ``build_cache_folder``
     df_all : pd.DataFrame
         The DataFrame with the data we want to cache
     missing_dates : list[datetime.date]
-        A list of dates that are missing bars from Polygon"""
+        A list of dates that are missing bars from Polygon
+    months : set[int]
+        The months (``YYYYMM``) of the partitions to write, in addition to the months of the missing
+        dates. If None, the partitions of all the months in df_all are written."""
 
     if df_all is None:
         df_all = pd.DataFrame()
 
+    if months is None:
+        months = cache_partition_months(df_all.index) if len(df_all) > 0 else set()
+    months = set(months)
+
     if missing_dates:
         missing_df = pd.DataFrame(
             [datetime(year=d.year, month=d.month, day=d.day, tzinfo=LUMIBOT_DEFAULT_PYTZ) for d in missing_dates],
@@ -447,24 +880,46 @@ def update_cache(cache_file, df_all, missing_dates=None):
         # Set the timezone to UTC
         missing_df.index = missing_df.index.tz_convert("UTC")
         df_concat = pd.concat([df_all, missing_df]).sort_index()
-        # Let's be careful and check for duplicates to avoid corrupting the feather file.
+        # Let's be careful and check for duplicates to avoid corrupting the cache.
         if df_concat.index.duplicated().any():
-            logging.warn(f"Duplicate index entries found when trying to update Polygon cache {cache_file}")
+            logging.warn(f"Duplicate index entries found when trying to update Polygon cache {cache_folder}")
             if df_all.index.duplicated().any():
                 logging.warn("The duplicate index entries were already in df_all")
         else:
             # All good, persist with the missing dates added
             df_all = df_concat
-
-    if len(df_all) > 0:
-        # Create the directory if it doesn't exist
-        cache_file.parent.mkdir(parents=True, exist_ok=True)
-
-        # Reset the index to convert DatetimeIndex to a regular column
-        df_all_reset = df_all.reset_index()
-
-        # Save the data to a feather file
-        df_all_reset.to_feather(cache_file)
+            months |= cache_partition_months(missing_df.index)
+
+    if len(df_all) == 0 or not months:
+        return
+
+    # Create the directory if it doesn't exist
+    cache_folder = Path(cache_folder)
+    cache_folder.mkdir(parents=True, exist_ok=True)
+
+    index = df_all.index.tz_convert("UTC") if df_all.index.tz is not None else df_all.index.tz_localize("UTC")
+    row_months = index.year * 100 + index.month
+    for month in sorted(months):
+        in_month = row_months == month
+        df_month = df_all[in_month]
+        if len(df_month) == 0:
+            continue
+        # The rows of the month with the UTC index, like the rows of the partitions
+        df_month.index = index[in_month]
+        partition_file = cache_folder / f"{month // 100:04d}-{month % 100:02d}.arrow"
+        if partition_file.exists():
+            df_month = pd.concat([df_month, load_cache_partition(partition_file)])
+            df_month = df_month[~df_month.index.duplicated(keep="first")].sort_index()
+
+        df_month = df_month.reset_index(drop=True).assign(datetime=df_month.index.asi8)
+        table = pa.Table.from_pandas(df_month, preserve_index=False)
+
+        # Write to a temporary file first so that a partition is never left half written
+        temp_file = partition_file.with_suffix(".arrow.tmp")
+        with pa.OSFile(str(temp_file), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_file, partition_file)
 
 
 def update_polygon_data(df_all, result):
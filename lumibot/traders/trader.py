@@ -5,12 +5,17 @@ import sys
 from pathlib import Path
 
 import appdirs
+import pandas as pd
+
+from lumibot.backtesting.backtesting_clock import BacktestingClock
+from lumibot.tools.indicators import stats_summary
+from lumibot.tools.pandas import day_deduplicate
 
 # Overloading time.sleep to warn users against using it
 
 
 class Trader:
-    def __init__(self, logfile="", backtest=False, debug=False, strategies=None):
+    def __init__(self, logfile="", backtest=False, debug=False, strategies=None, data_source=None):
         """
 
         Parameters
@@ -24,6 +29,10 @@ class Trader:
             Whether to run the strategies in debug mode or not. This will set the log level to DEBUG.
         strategies: list
             A list of strategies to run. If not specified, you must add strategies using trader.add_strategy(strategy)
+        data_source: DataSource
+            A data source shared by all the live strategies, their brokers use it instead of their own data source.
+            If not specified, strategies whose brokers already use the same data source share it. Shared data
+            sources cache prices and bars for a few seconds, see DataSource.enable_shared_cache.
         """
         # Setting debug and _logfile parameters and setting global log format
         self.debug = debug
@@ -42,6 +51,11 @@ class Trader:
         # Setting the list of strategies if defined
         self._strategies = strategies if strategies else []
         self._pool = []
+        self.data_source = data_source
+
+        # Stats of the sum of the portfolios of the strategies backtested together, see _combine_backtest_stats
+        self.combined_stats = None
+        self.combined_analysis = None
 
     @property
     def is_backtest_broker(self):
@@ -54,7 +68,16 @@ class Trader:
         """Adds a strategy to the trader"""
         self._strategies.append(strategy)
 
-    def run_all(self, async_=False, show_plot=True, show_tearsheet=True, save_tearsheet=True, show_indicators=True, tearsheet_file=None):
+    def run_all(
+        self,
+        async_=False,
+        show_plot=True,
+        show_tearsheet=True,
+        save_tearsheet=True,
+        show_indicators=True,
+        tearsheet_file=None,
+        analyze_backtest=True,
+    ):
         """
         run all strategies
 
@@ -75,6 +98,10 @@ class Trader:
         show_indicators: bool
             Whether to display the indicators (markers and lines) in the user's web browser. This is only used for backtesting.
 
+        analyze_backtest: bool
+            Whether to run the analysis of each strategy (plots, tearsheet and files in the logs directory) once the
+            backtest is done. This is only used for backtesting.
+
         Returns
         -------
         dict
@@ -92,22 +119,14 @@ class Trader:
                 f"broker_backtesting={self.is_backtest_broker}."
             )
 
-        if len(self._strategies) != 1:
-            if self.is_backtest_broker:
-                raise Exception(
-                    f"Received {len(self._strategies)} strategies for backtesting."
-                    f"You can only backtest one at a time."
-                )
-            else:
-                raise NotImplementedError(
-                    f"Running multiple live strategies is not implemented yet. You passed "
-                    f"in {len(self._strategies)} strategies."
-                )
-
-        strat = self._strategies[0]
         if self.is_backtest_broker:
-            strat.verify_backtest_inputs(strat.backtesting_start, strat.backtesting_end)
+            if len(self._strategies) > 1:
+                self._share_backtesting_clock()
+            for strat in self._strategies:
+                strat.verify_backtest_inputs(strat.backtesting_start, strat.backtesting_end)
             logging.info("Backtesting starting...")
+        else:
+            self._share_data_sources()
 
         signal.signal(signal.SIGINT, self._stop_pool)
         self._set_logger()
@@ -119,14 +138,18 @@ class Trader:
 
         if self.is_backtest_broker:
             logging.info("Backtesting finished")
-            strat.backtest_analysis(
-                logdir=self.logdir,
-                show_plot=show_plot,
-                show_tearsheet=show_tearsheet,
-                save_tearsheet=save_tearsheet,
-                show_indicators=show_indicators,
-                tearsheet_file=tearsheet_file,
-            )
+            if analyze_backtest:
+                for strat in self._strategies:
+                    strat.backtest_analysis(
+                        logdir=self.logdir,
+                        show_plot=show_plot,
+                        show_tearsheet=show_tearsheet,
+                        save_tearsheet=save_tearsheet,
+                        show_indicators=show_indicators,
+                        tearsheet_file=tearsheet_file if len(self._strategies) == 1 else None,
+                    )
+            if len(self._strategies) > 1:
+                self._combine_backtest_stats()
 
         return result
 
@@ -186,6 +209,86 @@ class Trader:
                 iblogger.setLevel(logging.CRITICAL)
                 iblogger.disabled = True
 
+    def _check_strategy_names(self):
+        names = [strategy._name for strategy in self._strategies]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(
+                f"Strategies run by the same trader must have different names, the orders and positions of "
+                f"each strategy are tracked by its name. Duplicated names: {duplicates}"
+            )
+
+    def _check_strategy_brokers(self):
+        # A broker tracks the positions of a single strategy (see Broker.set_strategy_name and sync_positions)
+        brokers = [strategy.broker for strategy in self._strategies]
+        if len({id(broker) for broker in brokers}) != len(brokers):
+            raise ValueError(
+                "Each strategy run with other strategies must have its own broker instance, a broker tracks the "
+                "positions of a single strategy"
+            )
+
+    def _share_backtesting_clock(self):
+        """Makes the strategies backtested together run on one BacktestingClock. The data of the shared data source
+        is loaded once, and each strategy keeps its own broker for its cash, positions, orders and stats."""
+        self._check_strategy_names()
+        self._check_strategy_brokers()
+
+        brokers = [strategy.broker for strategy in self._strategies]
+        data_source = brokers[0].data_source
+        if self.data_source is not None and self.data_source is not data_source:
+            raise ValueError("The strategies of a backtest must use the data source passed to Trader(data_source=...)")
+        if any(broker.data_source is not data_source for broker in brokers):
+            raise ValueError(
+                "Strategies backtested together must share one data source, create their BacktestingBrokers "
+                "with the same data source"
+            )
+
+        clock = BacktestingClock(data_source)
+        for broker in brokers:
+            clock.add_broker(broker)
+
+    def _combine_backtest_stats(self):
+        """Computes the stats of the sum of the portfolios of the strategies backtested together."""
+        portfolio_values = [
+            strategy._stats["portfolio_value"].rename(strategy._name)
+            for strategy in self._strategies
+            if strategy._stats is not None and "portfolio_value" in strategy._stats.columns
+        ]
+        if not portfolio_values:
+            return
+
+        # Portfolios that weren't revalued at a datetime keep their previous value, and the portfolios of the
+        # strategies that started later are worth their first value until then
+        portfolio_values = pd.concat(portfolio_values, axis=1).sort_index().ffill().bfill()
+        stats = portfolio_values.copy()
+        stats["portfolio_value"] = portfolio_values.sum(axis=1)
+        stats["return"] = stats["portfolio_value"].pct_change()
+
+        self.combined_stats = stats
+        self.combined_analysis = stats_summary(day_deduplicate(stats), self._strategies[0].risk_free_rate)
+
+    def _share_data_sources(self):
+        """Makes the live strategies share their data sources. Orders and positions stay separate since they are
+        tracked by strategy name, so the names have to be unique, and by broker, so each strategy needs its own
+        broker instance (brokers can share a data source)."""
+        self._check_strategy_names()
+        self._check_strategy_brokers()
+
+        if self.data_source is not None:
+            for strategy in self._strategies:
+                strategy.broker.data_source = self.data_source
+                if getattr(strategy.broker, "async_engine", None) is not None:
+                    self.data_source.async_engine = strategy.broker.async_engine
+
+        data_sources = {}
+        for strategy in self._strategies:
+            data_source = strategy.broker.data_source
+            data_sources.setdefault(id(data_source), [data_source, 0])[1] += 1
+
+        for data_source, count in data_sources.values():
+            if count > 1 or data_source is self.data_source:
+                data_source.enable_shared_cache()
+
     def _init_pool(self):
         self._pool = [strategy._executor for strategy in self._strategies]
 
@@ -1,2 +1,7 @@
+from .async_engine import AsyncEngine, AsyncQueue
 from .custom_stream import CustomStream, PollingStream
+from .data_cache import DataCache
+from .portfolio_ledger import PortfolioLedger
+from .request_cache import RequestCache
 from .safe_list import SafeList
+from .trade_event_log import TradeEventLog
@@ -0,0 +1,153 @@
+import asyncio
+import functools
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncQueue(queue.Queue):
+    """A ``queue.Queue`` that a coroutine can also wait on without blocking a thread.
+
+    Producers use the usual ``put`` from any thread. A single consumer coroutine waits for items with
+    ``get_async``, it is woken up by the event loop when an item is put instead of blocking a thread
+    in ``get``. ``task_done`` and ``join`` work as with a regular queue.
+    """
+
+    def __init__(self, maxsize=0):
+        super().__init__(maxsize)
+        self._loop = None
+        self._waiter = None
+
+    def _put(self, item):
+        super()._put(item)
+        waiter = self._waiter
+        if waiter is not None:
+            self._loop.call_soon_threadsafe(waiter.set)
+
+    async def get_async(self):
+        """Removes and returns an item from the queue, waiting on the running event loop until one is available."""
+        if self._waiter is None:
+            self._loop = asyncio.get_running_loop()
+            self._waiter = asyncio.Event()
+
+        while True:
+            # Clear before checking the queue, so an item put after the check sets the event again
+            self._waiter.clear()
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                await self._waiter.wait()
+
+
+class AsyncEngine:
+    """One asyncio event loop running on a background thread, shared by everything running in async mode.
+
+    Streams, order submission and the queue checks of the strategies run as coroutines on the loop, and
+    the blocking calls they make (broker and data APIs, strategy callbacks) run on one bounded thread
+    pool shared by all the brokers of the process, instead of each of them starting its own threads.
+
+    Use ``AsyncEngine.get()`` to get the engine of the process.
+
+    Parameters
+    ----------
+    max_workers : int
+        The number of threads used for the blocking calls.
+    """
+
+    MAX_WORKERS = 32
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self._worker = threading.local()
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="lumibot_async_engine",
+            initializer=self._init_worker,
+        )
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.executor)
+        self._thread = threading.Thread(target=self._run_loop, daemon=True, name="lumibot_async_engine_loop")
+        self._thread.start()
+
+    @classmethod
+    def get(cls):
+        """Returns the engine of the process, starting it if needed."""
+        with cls._instance_lock:
+            if cls._instance is None or not cls._instance.is_running:
+                cls._instance = cls()
+            return cls._instance
+
+    @property
+    def is_running(self):
+        return self._thread.is_alive() and not self.loop.is_closed()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def _init_worker(self):
+        self._worker.is_engine_thread = True
+
+    def _is_engine_thread(self):
+        return threading.current_thread() is self._thread or getattr(self._worker, "is_engine_thread", False)
+
+    def submit(self, coro):
+        """Schedules a coroutine on the loop from any thread.
+
+        Exceptions raised by the coroutine are logged, since nothing may be waiting on its result.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            The future of the result of the coroutine.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(self._log_exception)
+        return future
+
+    @staticmethod
+    def _log_exception(future):
+        if future.cancelled():
+            return
+        exception = future.exception()
+        if exception is not None:
+            logging.error("Task of the async engine failed", exc_info=exception)
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """Runs a blocking function on the thread pool of the engine and waits for its result on the loop."""
+        return await self.loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def map_blocking(self, func, items):
+        """Calls a blocking function on each item concurrently on the thread pool of the engine.
+
+        Calls made from a thread of the engine run the items one after the other, since waiting on the
+        pool from one of its own threads could use up all of them.
+
+        Parameters
+        ----------
+        func : callable
+            The function called with each item.
+        items : iterable
+            The items.
+
+        Returns
+        -------
+        list
+            The results, in the order of the items.
+        """
+        if self._is_engine_thread():
+            return [func(item) for item in items]
+        return list(self.executor.map(func, items))
+
+    def stop(self):
+        """Stops the loop and the thread pool. Coroutines still running are abandoned."""
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        if not self.loop.is_running():
+            self.loop.close()
+        self.executor.shutdown(wait=False)
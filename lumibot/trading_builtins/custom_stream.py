@@ -1,13 +1,14 @@
+import asyncio
 import logging
 import queue
-from queue import Queue
-from threading import Thread
+
+from .async_engine import AsyncQueue
 
 
 class CustomStream:
 
     def __init__(self):
-        self._queue = Queue(100)
+        self._queue = AsyncQueue(100)
         self._actions_mapping = {}
 
     def dispatch(self, event, wait_until_complete=False, **payload):
@@ -38,6 +39,18 @@ class CustomStream:
             action = self._actions_mapping[event]
             action(**payload)
 
+    async def _run_async(self, engine):
+        # Same as _run, but waits for the events on the loop of the async engine and runs the actions on its threads
+        while True:
+            event, payload = await self._queue.get_async()
+            try:
+                await engine.run_blocking(self._process_queue_event, event, payload)
+            except Exception:
+                # The coroutine handles the events of every action, an error in one must not stop the others
+                logging.exception(f"Error while processing the stream event {event}")
+            finally:
+                self._queue.task_done()
+
     def run(self, name):
         # Threads are spawned by the broker._launch_stream() code
         self._run()
@@ -74,6 +87,23 @@ class PollingStream(CustomStream):
                 self._poll()
                 continue
 
+    async def _run_async(self, engine):
+        while True:
+            try:
+                event, payload = await asyncio.wait_for(self._queue.get_async(), timeout=self.polling_interval)
+            except asyncio.TimeoutError:
+                try:
+                    await engine.run_blocking(self._poll)
+                except Exception:
+                    logging.exception("Error while polling the stream")
+                continue
+            try:
+                await engine.run_blocking(self._process_queue_event, event, payload)
+            except Exception:
+                logging.exception(f"Error while processing the stream event {event}")
+            finally:
+                self._queue.task_done()
+
     def _poll(self):
         if self.POLL_EVENT not in self._actions_mapping:
             raise ValueError("No action is defined for the poll event. You must register a polling action with "
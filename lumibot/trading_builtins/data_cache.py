@@ -0,0 +1,219 @@
+import logging
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+
+class DataCache(MutableMapping):
+    """Byte-budgeted LRU store of the ``Data`` objects of a data source, keyed by ``(asset, quote)``.
+
+    The size of each entry is measured when it is added, and again by ``record_hit`` once its
+    data was aligned (compact data drops its dataframe then), so keeping the store under
+    ``max_bytes`` doesn't require going through all the entries. Entries are ordered from the
+    least to the most recently used, ``record_hit`` moves an entry to the end, and the least
+    recently used entries are evicted first when the store is over budget. The most recently
+    added entry is never evicted.
+
+    Evicted entries can be loaded back with ``restore`` when the cache is given a ``loader``,
+    typically reading the data from the on-disk cache it was downloaded to, instead of
+    downloading it again.
+
+    Reading an entry with ``[]`` or iterating over the store doesn't change the order of the
+    entries or the counters. ``version`` is incremented each time an entry is added, replaced or
+    removed, so the users of the store can tell that it changed without going through the entries.
+
+    Parameters
+    ----------
+    data : dict
+        The initial entries.
+    max_bytes : int or callable
+        The maximum size of the entries in memory, in bytes. If None, entries are never evicted.
+        A callable returning the limit is called each time the limit is enforced, eg. to follow a
+        class attribute changed after the cache is created.
+    loader : callable
+        Called by ``restore`` as ``loader(asset, quote, timestep, datetime_start, datetime_end)``
+        with the fields of an evicted ``Data``, returns the data to put back in the cache or None
+        if it can't be loaded. If None, evicted entries are dropped.
+    """
+
+    def __init__(self, data=None, max_bytes=None, loader=None):
+        self._max_bytes = max_bytes
+        self.loader = loader
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.restores = 0
+        self.version = 0
+
+        self._store = OrderedDict()
+        self._sizes = {}
+        # Data._repairs of the entries when they were measured
+        self._repairs = {}
+        # The fields of the evicted entries that can be restored, passed to the loader
+        self._evicted = {}
+
+        if data:
+            self.update(data)
+
+    @property
+    def max_bytes(self):
+        """The maximum size of the entries in memory, in bytes, or None if there is no limit."""
+        if callable(self._max_bytes):
+            return self._max_bytes()
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._enforce_limit()
+
+    @staticmethod
+    def get_data_size(data):
+        """Returns the size of the values of a Data object in bytes, see Data.memory_usage."""
+        return data.memory_usage()
+
+    def __getitem__(self, key):
+        return self._store[key]
+
+    def __setitem__(self, key, data):
+        if key in self._store:
+            self._forget_size(key)
+        self._evicted.pop(key, None)
+
+        self._store[key] = data
+        self._store.move_to_end(key)
+        self.version += 1
+        self._measure(key, data)
+        self._enforce_limit()
+
+    def __delitem__(self, key):
+        del self._store[key]
+        self.version += 1
+        self._forget_size(key)
+
+    def __contains__(self, key):
+        return key in self._store
+
+    def __iter__(self):
+        return iter(self._store)
+
+    def __len__(self):
+        return len(self._store)
+
+    def __repr__(self):
+        return f"DataCache({len(self)} entries, {self.bytes_used:,} bytes, {len(self._evicted)} restorable)"
+
+    def keys(self):
+        return self._store.keys()
+
+    def values(self):
+        return self._store.values()
+
+    def items(self):
+        return self._store.items()
+
+    def popitem(self, last=True):
+        key, data = self._store.popitem(last=last)
+        self.version += 1
+        self._forget_size(key)
+        return key, data
+
+    def record_hit(self, key):
+        """Counts a use of an entry and makes it the most recently used one. The entry is measured again
+        if its data was aligned since it was measured."""
+        self.hits += 1
+        self._store.move_to_end(key)
+        if getattr(self._store[key], "_repairs", 0) != self._repairs.get(key):
+            self.refresh_size(key)
+
+    def refresh_size(self, key):
+        """Measures an entry again, eg. after its data was aligned, and evicts the least recently used
+        entries if the store is over budget.
+
+        Parameters
+        ----------
+        key : tuple
+            The key of the entry.
+        """
+        self._forget_size(key)
+        self._measure(key, self._store[key])
+        self._enforce_limit()
+
+    def record_miss(self):
+        """Counts a lookup that had to load the data from somewhere else."""
+        self.misses += 1
+
+    def stats(self):
+        """Returns the counters of the cache.
+
+        Returns
+        -------
+        dict
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "restores": self.restores,
+            "entries": len(self._store),
+            "restorable": len(self._evicted),
+            "bytes_used": self.bytes_used,
+            "max_bytes": self.max_bytes,
+        }
+
+    def is_evicted(self, key):
+        """Returns True if the entry was evicted and can be restored with the loader."""
+        return key in self._evicted
+
+    def restore(self, key):
+        """Loads an evicted entry back with the loader.
+
+        Parameters
+        ----------
+        key : tuple
+            The key of the entry.
+
+        Returns
+        -------
+        Data or None
+            The restored data, None if the entry wasn't evicted or the loader couldn't load it.
+        """
+        evicted = self._evicted.pop(key, None)
+        if evicted is None:
+            return None
+
+        try:
+            data = self.loader(*evicted)
+        except Exception as e:
+            logging.warning(f"Could not restore the evicted data of {key}: {e}")
+            return None
+        if data is None:
+            return None
+
+        self.restores += 1
+        self[key] = data
+        return data
+
+    def _measure(self, key, data):
+        self._sizes[key] = self.get_data_size(data)
+        self._repairs[key] = getattr(data, "_repairs", 0)
+        self.bytes_used += self._sizes[key]
+
+    def _forget_size(self, key):
+        self._repairs.pop(key, None)
+        size = self._sizes.pop(key)
+        self.bytes_used -= size
+        return size
+
+    def _enforce_limit(self):
+        max_bytes = self.max_bytes
+        if not max_bytes:
+            return
+        while self.bytes_used > max_bytes and len(self._store) > 1:
+            key, data = self._store.popitem(last=False)
+            self.version += 1
+            size = self._forget_size(key)
+            self.evictions += 1
+            if self.loader is not None:
+                self._evicted[key] = (data.asset, data.quote, data.timestep, data.datetime_start, data.datetime_end)
+            logging.info(f"Storage limit exceeded. Evicted LRU data: {key} used {size:,} bytes")
@@ -0,0 +1,136 @@
+import numpy as np
+
+from lumibot.entities import Asset
+
+
+class PortfolioLedger:
+    """Value of the positions of a strategy, maintained incrementally.
+
+    The quantities and multipliers of the positions are kept in arrays that are only rebuilt when
+    a tracked position is added, removed or changes quantity (e.g. after a fill), and the prices
+    of the positions are only fetched again when the datetime changes. The value of the positions
+    is then a single dot product of the arrays.
+    """
+
+    def __init__(self):
+        self.assets = []
+        self.positions_value = 0.0
+        self._version = None
+        self._quantities = np.empty(0)
+        self._multipliers = np.empty(0)
+        self._prices = np.empty(0)
+        self._prices_dt = None
+
+    def is_stale(self, version):
+        """Returns True if the positions changed since the last call to ``update_positions``.
+
+        Parameters
+        ----------
+        version : object
+            The current version of the tracked positions, see ``Broker.get_tracked_positions_version``.
+
+        Returns
+        -------
+        bool
+        """
+        return self._version is None or version != self._version
+
+    def update_positions(self, positions, quote_asset, version):
+        """Rebuilds the quantities and multipliers from the positions.
+
+        Positions in the quote asset are left out since they are already included in the cash.
+        Crypto and forex positions are priced in the quote asset, so they are stored as
+        ``(asset, quote_asset)`` tuples.
+
+        Parameters
+        ----------
+        positions : list of Position
+            The tracked positions of the strategy.
+        quote_asset : Asset
+            The quote asset of the strategy.
+        version : object
+            The version of the tracked positions.
+        """
+        assets, quantities, multipliers = [], [], []
+        for position in positions:
+            asset = position.asset
+            if quote_asset is not None and asset == quote_asset:
+                continue
+            if asset.asset_type in ["crypto", "forex"]:
+                assets.append((asset, quote_asset))
+                multipliers.append(1)
+            else:
+                assets.append(asset)
+                multipliers.append(asset.multiplier if asset.asset_type in ["option", "future"] else 1)
+            quantities.append(position.quantity)
+
+        self.assets = assets
+        self._quantities = np.array(quantities, dtype=np.float64)
+        self._multipliers = np.array(multipliers, dtype=np.float64)
+        self._version = version
+
+        # The prices have to be fetched for the new list of assets
+        self._prices_dt = None
+
+    def needs_prices(self, dt):
+        """Returns True if the prices have to be fetched again for ``dt``.
+
+        Parameters
+        ----------
+        dt : datetime.datetime
+            The current datetime.
+
+        Returns
+        -------
+        bool
+        """
+        return self._prices_dt is None or dt != self._prices_dt
+
+    def update_prices(self, prices, dt):
+        """Stores the prices of the assets and revalues the positions.
+
+        Parameters
+        ----------
+        prices : dict
+            The last price of each asset in ``assets``. Assets that are missing are valued at 0.
+        dt : datetime.datetime
+            The datetime of the prices.
+
+        Raises
+        ------
+        ValueError
+            If the price of an asset is None.
+        """
+        values = []
+        for asset in self.assets:
+            price = prices.get(asset, 0)
+            if price is None:
+                raise ValueError(self._missing_price_message(asset, dt))
+            values.append(price)
+
+        self._prices = np.array(values, dtype=np.float64)
+        self._prices_dt = dt
+        self.positions_value = float(np.dot(self._quantities * self._multipliers, self._prices))
+
+    @staticmethod
+    def _missing_price_message(asset, dt):
+        if isinstance(asset, Asset):
+            return (
+                f"A security has returned a price of None while trying "
+                f"to set the portfolio value. This usually happens when there "
+                f"is no data data available for the Asset or pair. "
+                f"Please ensure data exists at "
+                f"{dt} for the security: \n"
+                f"symbol: {asset.symbol}, \n"
+                f"type: {asset.asset_type}, \n"
+                f"right: {asset.right}, \n"
+                f"expiration: {asset.expiration}, \n"
+                f"strike: {asset.strike}.\n"
+            )
+        return (
+            f"A security has returned a price of None while trying "
+            f"to set the portfolio value. This usually happens when there "
+            f"is no data data available for the Asset or pair. "
+            f"Please ensure data exists at "
+            f"{dt} for the pair: {asset}"
+        )
@@ -0,0 +1,98 @@
+import time
+from concurrent.futures import Future
+from threading import Lock
+
+
+class RequestCache:
+    """Results of data requests kept for a short time, with concurrent identical requests coalesced.
+
+    When several threads make the same request at the same time, only the first one calls ``fetch``
+    and the others wait for its result. Results are then returned from the cache until they are
+    older than ``ttl``. Failed requests are not cached, the waiting threads get the same exception.
+
+    Parameters
+    ----------
+    ttl : float
+        The number of seconds a result is kept.
+    max_entries : int
+        Expired results are dropped when the cache holds more entries than this.
+    """
+
+    def __init__(self, ttl, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        self._lock = Lock()
+        self._results = {}
+        self._pending = {}
+
+    def get(self, key, fetch):
+        """Returns the cached result of a request, calling ``fetch`` if there is none.
+
+        Parameters
+        ----------
+        key : hashable
+            The key of the request.
+        fetch : callable
+            Makes the request, called without arguments.
+
+        Returns
+        -------
+        object
+            The result of the request.
+        """
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+
+            future = self._pending.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._pending[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._pending[key]
+            self._results[key] = (time.monotonic() + self.ttl, value)
+            if len(self._results) > self.max_entries:
+                self._drop_expired()
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        """Drops all the cached results."""
+        with self._lock:
+            self._results.clear()
+
+    def stats(self):
+        """Returns the counters of the cache.
+
+        Returns
+        -------
+        dict
+        """
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced, "entries": len(self._results)}
+
+    def _drop_expired(self):
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self._results.items() if expires <= now]:
+            del self._results[key]
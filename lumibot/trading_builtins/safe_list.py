@@ -2,7 +2,20 @@ from _thread import RLock as rlock_type
 
 
 class SafeList:
-    def __init__(self, lock, initial=None):
+    def __init__(self, lock, initial=None, index_by=None):
+        """Thread safe list.
+
+        Parameters
+        ----------
+        lock : threading.RLock
+            The lock shared by all the operations on the list.
+        initial : list, optional
+            The initial items of the list.
+        index_by : list, optional
+            Attribute names (or tuples of attribute names) the items are indexed by. Lookups with
+            ``get_by`` and removals with ``remove(value, key=...)`` on an indexed attribute don't
+            need to scan the list. The indexed attributes must not change while an item is stored.
+        """
         if not isinstance(lock, rlock_type):
             raise ValueError("lock must be a threading.RLock")
 
@@ -10,6 +23,15 @@ class SafeList:
             initial = []
         self.__lock = lock
         self.__items = initial
+        self.__index_by = list(index_by) if index_by else []
+        self.__indexes = {}
+        self.__version = 0
+        self.__reindex()
+
+    @property
+    def version(self):
+        """int: Counter incremented every time items are added, removed or replaced."""
+        return self.__version
 
     def __repr__(self):
         return repr(self.__items)
@@ -36,37 +58,109 @@ class SafeList:
 
     def __setitem__(self, n, val):
         with self.__lock:
+            old = self.__items[n]
             self.__items[n] = val
+            self.__version += 1
+            if self.__index_by and old is not val:
+                self.__reindex()
 
     def __add__(self, val):
         with self.__lock:
-            result = SafeList(self.__lock)
-            result.__items = list(set(self.__items + val.__items))
+            result = SafeList(self.__lock, list(set(self.__items + val.__items)), index_by=self.__index_by)
             return result
 
+    @staticmethod
+    def __get_key(item, key):
+        if isinstance(key, tuple):
+            return tuple(getattr(item, attribute, None) for attribute in key)
+        return getattr(item, key, None)
+
+    def __reindex(self):
+        self.__indexes = {key: {} for key in self.__index_by}
+        for item in self.__items:
+            self.__add_to_indexes(item)
+
+    def __add_to_indexes(self, item):
+        for key, index in self.__indexes.items():
+            index.setdefault(self.__get_key(item, key), []).append(item)
+
+    def __remove_from_indexes(self, item):
+        for key, index in self.__indexes.items():
+            value = self.__get_key(item, key)
+            bucket = index.get(value, [])
+            for i, indexed_item in enumerate(bucket):
+                if indexed_item is item:
+                    del bucket[i]
+                    break
+            if not bucket:
+                index.pop(value, None)
+
     def append(self, value):
         with self.__lock:
             self.__items.append(value)
+            self.__version += 1
+            if self.__index_by:
+                self.__add_to_indexes(value)
 
     def remove(self, value, key=None):
         with self.__lock:
+            self.__version += 1
             if key is None:
+                if self.__index_by:
+                    item = self.__items[self.__items.index(value)]
+                    self.__remove_from_indexes(item)
                 self.__items.remove(value)
             else:
                 if not isinstance(key, str):
                     raise ValueError(f"key must be a string, received {key} of type {type(key)}")
-                self.__items = [
-                    item for item in self.__items if getattr(item, key) != value
-                ]
+                if key in self.__indexes:
+                    # Nothing to remove if the value is not in the index
+                    removed = self.__indexes[key].get(value)
+                    if not removed:
+                        return
+                    removed = {id(item) for item in removed}
+                    for item in [item for item in self.__items if id(item) in removed]:
+                        self.__remove_from_indexes(item)
+                    self.__items = [item for item in self.__items if id(item) not in removed]
+                else:
+                    self.__items = [
+                        item for item in self.__items if getattr(item, key) != value
+                    ]
+                    if self.__index_by:
+                        self.__reindex()
 
     def extend(self, value):
         with self.__lock:
             self.__items.extend(value)
+            self.__version += 1
+            if self.__index_by:
+                for item in value:
+                    self.__add_to_indexes(item)
 
     def get_list(self):
         with self.__lock:
             return self.__items
 
+    def get_by(self, key, value):
+        """Returns the items whose ``key`` attribute (or tuple of attributes) equals ``value``.
+
+        Parameters
+        ----------
+        key : str or tuple
+            One of the keys the list is indexed by.
+        value : object
+            The value to look for.
+
+        Returns
+        -------
+        list
+            The matching items, in the order they were added.
+        """
+        with self.__lock:
+            if key in self.__indexes:
+                return list(self.__indexes[key].get(value, []))
+            return [item for item in self.__items if self.__get_key(item, key) == value]
+
     def remove_all(self):
         with self.__lock:
             for item in self.__items:
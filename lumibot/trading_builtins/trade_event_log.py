@@ -0,0 +1,165 @@
+import os
+from datetime import datetime
+from threading import RLock
+
+import numpy as np
+import pandas as pd
+
+
+class TradeEventLog:
+    """Append-only, columnar log of the trade events processed by a broker.
+
+    Events are stored as one Python list per column and are only turned into a
+    DataFrame when ``to_df`` is called, instead of concatenating a new DataFrame
+    for every event. The log can also stream its events to disk in chunks of
+    Parquet or Arrow (Feather) files so that long backtests with a lot of fills
+    don't have to keep every event in memory.
+
+    Parameters
+    ----------
+    columns : list of str
+        The names of the columns of the log, in order.
+    """
+
+    FILE_FORMATS = ["parquet", "arrow"]
+    STRING_COLUMNS = [
+        "strategy",
+        "exchange",
+        "identifier",
+        "symbol",
+        "side",
+        "type",
+        "status",
+        "time_in_force",
+        "asset.right",
+        "asset.asset_type",
+    ]
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._lock = RLock()
+        self._buffers = {column: [] for column in self.columns}
+        self._length = 0
+        self._df = None
+
+        # Streaming to disk
+        self._folder = None
+        self._file_format = None
+        self._chunk_size = None
+        self._chunk_files = []
+
+    def __len__(self):
+        with self._lock:
+            return self._length
+
+    def append(self, row):
+        """Adds an event to the log.
+
+        Parameters
+        ----------
+        row : dict
+            The values of the event, keyed by column name. Missing columns are set to ``None``.
+        """
+        with self._lock:
+            for column in self.columns:
+                self._buffers[column].append(row.get(column))
+            self._length += 1
+            self._df = None
+
+            if self._folder is not None and len(self._buffers[self.columns[0]]) >= self._chunk_size:
+                self._flush()
+
+    def stream_to(self, folder, file_format="parquet", chunk_size=10000):
+        """Streams the events to disk instead of keeping them in memory.
+
+        Every ``chunk_size`` events are written to a new file in ``folder``. The events that are
+        already in memory are written right away.
+
+        Parameters
+        ----------
+        folder : str
+            The folder to write the chunk files to. It is created if it doesn't exist.
+        file_format : str
+            Either ``"parquet"`` or ``"arrow"`` (Arrow IPC / Feather files).
+        chunk_size : int
+            The number of events to keep in memory before writing them to a new file.
+        """
+        if file_format not in self.FILE_FORMATS:
+            raise ValueError(f"file_format must be one of {self.FILE_FORMATS}, received {file_format} instead")
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be a positive integer, received {chunk_size} instead")
+
+        with self._lock:
+            os.makedirs(folder, exist_ok=True)
+            self._folder = folder
+            self._file_format = file_format
+            self._chunk_size = chunk_size
+            self._flush()
+
+    def _flush(self):
+        """Writes the events in memory to a new chunk file."""
+        if len(self._buffers[self.columns[0]]) == 0:
+            return
+
+        df = pd.DataFrame(self._buffers, columns=self.columns)
+        self._buffers = {column: [] for column in self.columns}
+
+        # Make sure that every chunk has the same column types
+        for column in self.STRING_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].map(lambda value: value if value is None else str(value))
+        if "asset.expiration" in df.columns:
+            df["asset.expiration"] = df["asset.expiration"].map(
+                lambda value: value.date() if isinstance(value, datetime) else value
+            )
+
+        filename = os.path.join(self._folder, f"trade_events_{len(self._chunk_files):05d}.{self._file_format}")
+        if self._file_format == "parquet":
+            df.to_parquet(filename, index=False)
+        else:
+            df.to_feather(filename)
+        self._chunk_files.append(filename)
+
+    def _read_chunks(self):
+        if self._file_format == "parquet":
+            return [pd.read_parquet(filename) for filename in self._chunk_files]
+        return [pd.read_feather(filename) for filename in self._chunk_files]
+
+    def to_df(self):
+        """Returns the events as a DataFrame with one row per event.
+
+        Columns that are empty for every event are left out, and the columns are ordered by the
+        first event that has a value for them.
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        with self._lock:
+            if self._df is not None:
+                return self._df
+
+            if self._length == 0:
+                self._df = pd.DataFrame()
+                return self._df
+
+            frames = self._read_chunks()
+            if len(self._buffers[self.columns[0]]) > 0:
+                frames.append(pd.DataFrame(self._buffers, columns=self.columns))
+            frames = [frame.dropna(axis=1, how="all") for frame in frames]
+            df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            df = df[[column for column in self.columns if column in df.columns]]
+
+            # Drop the columns that never had a value and order the others by their first value
+            notna = df.notna().to_numpy()
+            has_value = notna.any(axis=0)
+            first_value = np.where(has_value, notna.argmax(axis=0), len(df))
+            order = sorted(np.flatnonzero(has_value), key=lambda i: (first_value[i], i))
+            df = df.iloc[:, order].copy()
+
+            # Missing values are NaN rather than None
+            for column in df.columns[df.dtypes == object]:
+                df[column] = df[column].where(df[column].notna(), np.nan)
+
+            self._df = df
+            return self._df
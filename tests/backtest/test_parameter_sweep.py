@@ -0,0 +1,99 @@
+import datetime
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lumibot.backtesting import PandasDataBacktesting
+from lumibot.entities import Asset, Data
+from lumibot.strategies import Strategy
+
+
+class BuyAndHold(Strategy):
+    parameters = {"quantity": 1}
+
+    def initialize(self):
+        self.sleeptime = "30M"
+
+    def on_trading_iteration(self):
+        if self.first_iteration:
+            self.submit_order(self.create_order(Asset("SPY"), self.parameters["quantity"], "buy"))
+
+
+class NotBacktestable(BuyAndHold):
+    IS_BACKTESTABLE = False
+
+
+def make_pandas_data():
+    index = pd.date_range("2023-08-01 09:30", "2023-08-04 16:00", freq="1min", tz="America/New_York")
+    index = index[(index.time >= datetime.time(9, 30)) & (index.time <= datetime.time(16, 0))]
+    close = 100 + np.cumsum(np.random.default_rng(1).normal(size=len(index)))
+    df = pd.DataFrame(
+        {"open": close, "high": close + 0.5, "low": close - 0.5, "close": close, "volume": 100},
+        index=index,
+    )
+    return {Asset("SPY"): Data(Asset("SPY"), df, timestep="minute")}
+
+
+def backtest_kwargs():
+    return dict(
+        pandas_data=make_pandas_data(),
+        benchmark_asset=None,
+        risk_free_rate=0.0,
+        budget=10000,
+        max_workers=2,
+    )
+
+
+def test_backtest_grid(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    start, end = datetime.datetime(2023, 8, 1), datetime.datetime(2023, 8, 4)
+
+    results = BuyAndHold.backtest_grid(
+        PandasDataBacktesting, start, end, parameter_grid={"quantity": [1, 10]}, **backtest_kwargs()
+    )
+
+    assert list(results["quantity"]) == [1, 10]
+    assert results["total_return"].notna().all()
+    assert results["total_return"].iloc[0] != results["total_return"].iloc[1]
+    # The runs of a sweep don't write the files of the backtest analysis
+    assert not (tmp_path / "logs").exists()
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs forked processes")
+def test_backtest_grid_doesnt_pickle_data(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    start, end = datetime.datetime(2023, 8, 1), datetime.datetime(2023, 8, 4)
+
+    # The forked workers inherit the pandas_data instead of receiving a pickled copy, even where the
+    # processes are spawned by default (macOS, Windows and Python 3.14)
+    get_context = multiprocessing.get_context
+    monkeypatch.setattr(multiprocessing, "get_context", lambda method=None: get_context(method or "spawn"))
+
+    def no_pickle(self):
+        raise AssertionError("The pandas_data was pickled")
+
+    monkeypatch.setattr(Data, "__getstate__", no_pickle)
+    results = BuyAndHold.backtest_grid(
+        PandasDataBacktesting, start, end, parameter_grid={"quantity": [1, 10]}, **backtest_kwargs()
+    )
+    assert results["total_return"].notna().all()
+
+
+def test_optimize(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    start, end = datetime.datetime(2023, 8, 1), datetime.datetime(2023, 8, 4)
+
+    results = BuyAndHold.optimize(
+        PandasDataBacktesting, start, end, search_space={"quantity": [1, 10]}, n_iter=3, random_state=1,
+        **backtest_kwargs()
+    )
+    assert len(results) == 3
+    assert results["total_return"].notna().all()
+
+    # A strategy that can't be backtested gets rows without metrics
+    results = NotBacktestable.backtest_grid(
+        PandasDataBacktesting, start, end, parameter_grid={"quantity": [1]}, **backtest_kwargs()
+    )
+    assert list(results.columns) == ["quantity"]
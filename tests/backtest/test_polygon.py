@@ -10,6 +10,7 @@ import pytz
 from lumibot.backtesting import BacktestingBroker, PolygonDataBacktesting
 from lumibot.entities import Asset
 from lumibot.strategies import Strategy
+from lumibot.tools import polygon_helper
 from lumibot.traders import Trader
 
 from unittest.mock import MagicMock, patch
@@ -335,6 +336,55 @@ class TestPolygonBacktestFull:
             assert call_args[1]["timespan"] == timestep
             assert call_args[1]["quote_asset"] == quote
 
+    def test_get_last_prices_checks_each_asset_once(self, polygon_data_backtesting, mocker):
+        """Test that the data of each asset is checked (and counted in the cache stats) once by get_last_prices"""
+        mocker.patch.object(
+            polygon_data_backtesting,
+            'get_datetime',
+            return_value=polygon_data_backtesting.datetime_start
+        )
+        index = pd.date_range("2022-12-01", "2023-02-01", freq="1min", tz="UTC")
+        df = pd.DataFrame({"open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1.0}, index=index)
+
+        # Polygon doesn't know the last asset, so its data is None
+        def prefetch(api_key, requirements, **kwargs):
+            return {
+                (asset, quote, timespan): df if asset.symbol != "UNKNOWN" else None
+                for asset, start, end, timespan, quote in requirements
+            }
+
+        mocker.patch('lumibot.tools.polygon_helper.prefetch_price_data_from_polygon', side_effect=prefetch)
+        mocked_get_price_data = mocker.patch('lumibot.tools.polygon_helper.get_price_data_from_polygon')
+
+        assets = [Asset("AAPL"), Asset("MSFT"), Asset("UNKNOWN")]
+        polygon_data_backtesting.get_last_prices(assets)
+        mocked_get_price_data.assert_not_called()
+        stats = polygon_data_backtesting.pandas_data.stats()
+        assert (stats["hits"], stats["misses"]) == (0, 3)
+
+        polygon_data_backtesting.get_last_prices(assets[:2])
+        stats = polygon_data_backtesting.pandas_data.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 3)
+
+    def test_restore_evicted_data_from_the_polygon_cache(self, polygon_data_backtesting, mocker, tmpdir):
+        """Test that evicted data is read back from the partitions of the Polygon cache"""
+        mocker.patch('lumibot.tools.polygon_helper.LUMIBOT_CACHE_FOLDER', tmpdir)
+        asset = Asset("AAPL")
+        quote = Asset("USD", asset_type="forex")
+        index = pd.date_range("2023-01-03 14:30", "2023-02-28 21:00", freq="1h", tz="UTC")
+        df = pd.DataFrame({"open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1.0}, index=index)
+        polygon_helper.update_cache(polygon_helper.build_cache_folder(asset, "minute"), df)
+
+        polygon_data_backtesting._store_pandas_data(asset, quote, df[df.index < "2023-02-01"], "minute")
+        data = polygon_data_backtesting.pandas_data[(asset, quote)]
+        polygon_data_backtesting.pandas_data.max_bytes = 1
+        polygon_data_backtesting._store_pandas_data(Asset("MSFT"), quote, df, "minute")
+        assert polygon_data_backtesting.pandas_data.is_evicted((asset, quote))
+
+        restored = polygon_data_backtesting.pandas_data.restore((asset, quote))
+        pd.testing.assert_frame_equal(restored.df, data.df, check_freq=False)
+        assert polygon_data_backtesting.pandas_data.stats()["restores"] == 1
+
 
 class TestPolygonDataSource:
 
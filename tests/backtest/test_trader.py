@@ -0,0 +1,67 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from lumibot.backtesting import BacktestingBroker, PandasDataBacktesting
+from lumibot.entities import Asset, Data
+from lumibot.strategies import Strategy
+from lumibot.traders import Trader
+
+
+class HoldCash(Strategy):
+    def initialize(self):
+        self.sleeptime = "10M"
+
+    def on_trading_iteration(self):
+        pass
+
+
+class StartLate(HoldCash):
+    def before_starting_trading(self):
+        # The first stats row of this strategy comes an hour after the first one of the other strategy
+        if self.first_iteration:
+            self.sleep(3600)
+
+
+def make_data_source():
+    index = pd.date_range("2023-08-01 09:30", "2023-08-02 16:00", freq="1min", tz="America/New_York")
+    index = index[(index.time >= datetime.time(9, 30)) & (index.time <= datetime.time(16, 0))]
+    close = 100 + np.cumsum(np.random.default_rng(1).normal(size=len(index)))
+    df = pd.DataFrame(
+        {"open": close, "high": close + 0.5, "low": close - 0.5, "close": close, "volume": 100},
+        index=index,
+    )
+    return PandasDataBacktesting(
+        datetime_start=datetime.datetime(2023, 8, 1),
+        datetime_end=datetime.datetime(2023, 8, 2),
+        pandas_data={Asset("SPY"): Data(Asset("SPY"), df, timestep="minute")},
+    )
+
+
+def test_run_all_combines_the_stats_of_the_strategies(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_source = make_data_source()
+    strategies = [
+        strategy_class(
+            BacktestingBroker(data_source),
+            budget=budget,
+            benchmark_asset=None,
+            risk_free_rate=0.0,
+            backtesting_start=data_source.datetime_start,
+            backtesting_end=data_source.datetime_end,
+        )
+        for strategy_class, budget in [(HoldCash, 10000), (StartLate, 20000)]
+    ]
+    trader = Trader(backtest=True, strategies=strategies)
+
+    result = trader.run_all(show_plot=False, show_tearsheet=False, save_tearsheet=False, analyze_backtest=False)
+    assert set(result.keys()) == {"HoldCash", "StartLate"}
+
+    # The strategies only hold cash, so the combined portfolio never changes, even before the first stats row of
+    # the strategy that starts late
+    late_start = strategies[1]._stats.index[0]
+    stats = trader.combined_stats
+    assert stats.index[0] < late_start
+    assert (stats["portfolio_value"] == 30000).all()
+    assert (stats["return"].fillna(0) == 0).all()
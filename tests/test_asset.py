@@ -1,4 +1,5 @@
 import datetime
+import pickle
 from collections.abc import Hashable
 
 import pytest
@@ -80,3 +81,42 @@ def test_right_validator(param):
 def test_asset_types_validator(param):
     with pytest.raises(Exception):
         Asset(symbol="ABC", asset_type=param)
+
+
+def test_intern():
+    a = Asset(symbol="ABC", asset_type="option", expiration=datetime.date(2020, 1, 1), strike=150, right="CALL")
+    b = Asset(symbol="ABC", asset_type="option", expiration=datetime.date(2020, 1, 1), strike=150, right="CALL")
+    quote = Asset(symbol="USD", asset_type="forex")
+
+    shared = Asset.intern(a)
+    assert Asset.intern(b) is shared
+    assert hash(shared) == hash(b)
+    assert Asset.intern(Asset(symbol="ABD")) is not shared
+
+    # The assets of the caller are not modified, the shared instance is a copy
+    assert shared is not a
+    assert a._hash is None and b._hash is None
+
+    # (asset, quote) tuples are interned too
+    pair = Asset.intern((b, Asset(symbol="USD", asset_type="forex")))
+    assert pair[0] is shared
+    assert Asset.intern((a, quote)) is pair
+
+    # An equal asset with another multiplier is not shared, in a pair neither
+    future = Asset.intern(Asset(symbol="ES", asset_type="future", expiration=datetime.date(2020, 3, 20)))
+    other = Asset(symbol="ES", asset_type="future", expiration=datetime.date(2020, 3, 20), multiplier=50)
+    assert Asset.intern(other) is other and other == future
+    assert Asset.intern((other, quote))[0] is other
+
+    # Copies are not interned
+    copied = pickle.loads(pickle.dumps(shared))
+    assert copied == shared
+    assert copied._hash is None
+
+
+def test_clear_interned():
+    shared = Asset.intern(Asset(symbol="XYZ"))
+    Asset.clear_interned()
+
+    assert Asset.intern(Asset(symbol="XYZ")) is not shared
+    assert Asset.intern(Asset(symbol="XYZ")) == shared
@@ -0,0 +1,173 @@
+import datetime
+import threading
+import time
+from unittest.mock import MagicMock
+
+from lumibot.brokers import Broker
+from lumibot.entities import Asset, Order
+from lumibot.trading_builtins import AsyncEngine, AsyncQueue, CustomStream, PollingStream
+
+
+class TestAsyncEngine:
+    def test_async_queue(self):
+        engine = AsyncEngine.get()
+        q = AsyncQueue()
+
+        async def consume(n):
+            items = []
+            for _ in range(n):
+                items.append(await q.get_async())
+                q.task_done()
+            return items
+
+        future = engine.submit(consume(3))
+        for i in range(3):
+            threading.Thread(target=q.put, args=(i,)).start()
+            time.sleep(0.01)
+
+        assert sorted(future.result(timeout=5)) == [0, 1, 2]
+        q.join()
+
+    def test_map_blocking(self):
+        engine = AsyncEngine.get()
+        assert engine.map_blocking(lambda x: x * 2, range(5)) == [0, 2, 4, 6, 8]
+
+        # Nested calls from the threads of the engine don't wait on the pool
+        def nested(x):
+            return sum(engine.map_blocking(lambda y: y + x, range(3)))
+
+        assert engine.map_blocking(nested, range(engine.max_workers * 2)) == [
+            3 + 3 * x for x in range(engine.max_workers * 2)
+        ]
+
+    def test_polling_stream(self):
+        engine = AsyncEngine.get()
+        stream = PollingStream(polling_interval=0.05)
+        polls, events = [], []
+
+        @stream.add_action(PollingStream.POLL_EVENT)
+        def on_poll():
+            polls.append(threading.current_thread().name)
+
+        @stream.add_action("fill")
+        def on_fill(price):
+            events.append(price)
+
+        future = engine.submit(stream._run_async(engine))
+        stream.dispatch("fill", wait_until_complete=True, price=10)
+        assert events == [10]
+
+        time.sleep(0.3)
+        assert len(polls) >= 2
+        assert all(name.startswith("lumibot_async_engine") for name in polls)
+
+        future.cancel()
+
+
+class StubBroker(Broker):
+    """A live broker in async mode whose calls are recorded instead of sent anywhere."""
+
+    ASYNC_MODE = True
+
+    def __init__(self):
+        self.submitted = []
+        self.canceled = []
+        data_source = MagicMock()
+        data_source.get_datetime.return_value = datetime.datetime(2023, 8, 1, 10, 0)
+        super().__init__(name="stub", data_source=data_source)
+
+    def _submit_order(self, order):
+        if order.quantity > 100:
+            raise ValueError("Order rejected")
+        self.submitted.append((order, threading.current_thread().name))
+        order.update_raw({"id": order.identifier})
+        return order
+
+    def cancel_order(self, order):
+        self.canceled.append(order)
+        self.stream.dispatch(self.CANCELED_ORDER, order=order)
+
+    def _flatten_order(self, order):
+        return [order]
+
+    def _get_stream_object(self):
+        return CustomStream()
+
+    def _register_stream_events(self):
+        @self.stream.add_action(self.NEW_ORDER)
+        def on_trade_event_new(order):
+            self._process_trade_event(order, self.NEW_ORDER)
+
+        @self.stream.add_action(self.CANCELED_ORDER)
+        def on_trade_event_cancel(order):
+            self._process_trade_event(order, self.CANCELED_ORDER)
+
+        @self.stream.add_action("error")
+        def on_trade_event_error():
+            raise ValueError("Stream action failed")
+
+    def _run_stream(self):
+        raise AssertionError("The stream of a broker in async mode runs on the async engine")
+
+    def _get_balances_at_broker(self, quote_asset):
+        return 0, 0, 0
+
+    def get_historical_account_value(self):
+        return {}
+
+    def _pull_positions(self, strategy):
+        return []
+
+    def _pull_position(self, strategy, asset):
+        return None
+
+    def _parse_broker_order(self, response, strategy_name, strategy_object=None):
+        return None
+
+    def _pull_broker_order(self, identifier):
+        return None
+
+    def _pull_broker_all_orders(self):
+        return []
+
+
+class TestAsyncBroker:
+    def test_submit_stream_and_cancel(self):
+        broker = StubBroker()
+        assert broker.async_engine is AsyncEngine.get()
+        assert broker._is_stream_subscribed
+
+        # Orders are submitted on the threads of the engine
+        orders = [Order("stub_strategy", Asset("SPY"), quantity, "buy") for quantity in [1, 2, 3]]
+        broker.submit_order(orders[0])
+        broker.submit_orders(orders[1:])
+        assert broker.wait_for_orders_submission(timeout=5)
+        assert sorted(order.quantity for order, _ in broker.submitted) == [1, 2, 3]
+        assert all(name.startswith("lumibot_async_engine") for _, name in broker.submitted)
+        assert len(broker.get_tracked_orders("stub_strategy")) == 3
+
+        # The stream events are processed by the coroutine of the stream
+        for order in orders:
+            broker.stream.dispatch(broker.NEW_ORDER, wait_until_complete=True, order=order)
+        assert all(order.status == "new" for order in orders)
+
+        broker.cancel_orders(orders[:2])
+        broker.stream._queue.join()
+        assert broker.canceled == orders[:2]
+        assert [order.status for order in orders] == ["canceled", "canceled", "new"]
+
+    def test_errors_dont_stop_the_coroutines(self):
+        broker = StubBroker()
+
+        # A rejected order doesn't stop the orders queue, and the submission doesn't wait for the timeout
+        broker.submit_order(Order("stub_strategy", Asset("SPY"), 1000, "buy"))
+        assert broker.wait_for_orders_submission(timeout=5)
+        order = Order("stub_strategy", Asset("SPY"), 1, "buy")
+        broker.submit_order(order)
+        assert broker.wait_for_orders_submission(timeout=5)
+        assert [submitted for submitted, _ in broker.submitted] == [order]
+
+        # Same for an action of the stream that fails
+        broker.stream.dispatch("error", wait_until_complete=True)
+        broker.stream.dispatch(broker.NEW_ORDER, wait_until_complete=True, order=order)
+        assert order.status == "new"
@@ -1,7 +1,9 @@
 import datetime
+import threading
 
-from lumibot.backtesting import BacktestingBroker
+from lumibot.backtesting import BacktestingBroker, BacktestingClock
 from lumibot.data_sources import PandasData
+from lumibot.entities import Asset, Order
 
 
 class TestBacktestingBroker:
@@ -56,3 +58,100 @@ class TestBacktestingBroker:
         # Stop not triggered
         stop_price = 80
         assert not broker.stop_order(stop_price, 'sell', open_=100, high=110, low=90)
+
+    def test_fill_prices_match_order_logic(self):
+        start = datetime.datetime(2023, 8, 1)
+        end = datetime.datetime(2023, 8, 2)
+        data_source = PandasData(datetime_start=start, datetime_end=end, pandas_data={})
+        broker = BacktestingBroker(data_source=data_source)
+        asset = Asset("SPY")
+        bar = {"open": 100, "high": 110, "low": 90}
+
+        orders = []
+        for side in ["buy", "sell"]:
+            orders.append(Order("test", asset, 1, side))
+            for price in [80, 85, 95, 100, 105, 115, 120]:
+                orders.append(Order("test", asset, 1, side, limit_price=price))
+                orders.append(Order("test", asset, 1, side, stop_price=price))
+                orders.append(Order("test", asset, 1, side, limit_price=price, stop_price=95))
+                orders.append(Order("test", asset, 1, side, limit_price=95, stop_price=price))
+
+        results = broker._get_fill_prices(orders, [bar] * len(orders))
+
+        for order, (price, stop_triggered) in zip(orders, results):
+            expected_triggered = False
+            if order.type == "market":
+                expected = bar["open"]
+            elif order.type == "limit":
+                expected = broker.limit_order(order.limit_price, order.side, bar["open"], bar["high"], bar["low"])
+            elif order.type == "stop":
+                expected = broker.stop_order(order.stop_price, order.side, bar["open"], bar["high"], bar["low"])
+            else:
+                expected = broker.stop_order(order.stop_price, order.side, bar["open"], bar["high"], bar["low"])
+                if expected is not None:
+                    expected_triggered = True
+                    expected = broker.limit_order(order.limit_price, order.side, expected, bar["high"], bar["low"])
+            assert price == expected
+            assert stop_triggered == expected_triggered
+
+    def test_tracked_order_lookups(self):
+        start = datetime.datetime(2023, 8, 1)
+        end = datetime.datetime(2023, 8, 2)
+        data_source = PandasData(datetime_start=start, datetime_end=end, pandas_data={})
+        broker = BacktestingBroker(data_source=data_source)
+        spy = Asset("SPY")
+        aapl = Asset("AAPL")
+
+        spy_order = Order("strat", spy, 1, "buy")
+        aapl_order = Order("strat", aapl, 1, "buy")
+        other_order = Order("other", spy, 1, "sell")
+        for order in [spy_order, aapl_order, other_order]:
+            broker._unprocessed_orders.append(order)
+        broker._process_new_order(aapl_order)
+
+        assert broker.get_tracked_order(spy_order.identifier) is spy_order
+        assert broker.get_tracked_orders("strat") == [spy_order, aapl_order]
+        assert broker.get_tracked_orders("strat", spy) == [spy_order]
+        assert broker.get_tracked_orders(asset=spy) == [spy_order, other_order]
+        assert broker.get_asset_potential_total("other", spy) == -1
+
+        broker._process_canceled_order(spy_order)
+        assert broker.get_tracked_order(spy_order.identifier) is None
+        assert broker.get_order(spy_order.identifier) is spy_order
+        assert broker.get_tracked_orders("strat") == [aapl_order]
+        assert broker.get_order("unknown") is None
+
+    def test_shared_clock(self):
+        start = datetime.datetime(2023, 8, 1, 9, 30)
+        end = datetime.datetime(2023, 8, 2)
+        data_source = PandasData(datetime_start=start, datetime_end=end, pandas_data={})
+        clock = BacktestingClock(data_source)
+        brokers = [BacktestingBroker(data_source=data_source) for _ in range(2)]
+        for broker in brokers:
+            clock.add_broker(broker)
+
+        # Each strategy sleeps for its own number of minutes, and records the datetimes at which it runs
+        runs = []
+
+        def run_strategy(name, broker, minutes):
+            clock.start(broker)
+            try:
+                for _ in range(3):
+                    runs.append((name, broker.datetime))
+                    broker._update_datetime(datetime.timedelta(minutes=minutes))
+            finally:
+                clock.stop(broker)
+
+        threads = [
+            threading.Thread(target=run_strategy, args=("fast", brokers[0], 1)),
+            threading.Thread(target=run_strategy, args=("slow", brokers[1], 2)),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        t0 = data_source.datetime_start
+        minutes = [(name, int((dt - t0).total_seconds() // 60)) for name, dt in runs]
+        assert minutes == [("fast", 0), ("slow", 0), ("fast", 1), ("fast", 2), ("slow", 2), ("slow", 4)]
+        assert brokers[1].datetime == t0 + datetime.timedelta(minutes=6)
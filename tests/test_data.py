@@ -0,0 +1,159 @@
+import datetime
+import pickle
+import weakref
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lumibot.entities import Asset, Bars, BarsView, Data
+
+
+@pytest.fixture
+def minute_data():
+    index = pd.date_range("2023-08-01 09:30", "2023-08-03 16:00", freq="1min", tz="America/New_York")
+    index = index[(index.time >= datetime.time(9, 30)) & (index.time <= datetime.time(16, 0))]
+    close = 100 + np.cumsum(np.sin(np.arange(len(index)) / 10))
+    df = pd.DataFrame(
+        {
+            "open": close - 0.1,
+            "high": close + 0.5,
+            "low": close - 0.5,
+            "close": close,
+            "volume": np.arange(len(index)) % 100,
+        },
+        index=index,
+    )
+    data = Data(Asset("SPY"), df, timestep="minute")
+    data.repair_times_and_fill(data.df.index)
+    return data
+
+
+class TestData:
+    def test_get_bars_view_matches_get_bars(self, minute_data):
+        index = minute_data.df.index
+        for dt in [index[0], index[100], index[500] + datetime.timedelta(seconds=30), index[-1]]:
+            for length in [1, 2, 30]:
+                for timeshift in [0, 1, -2]:
+                    df = minute_data.get_bars(dt, length=length, timeshift=timeshift)
+                    view = minute_data.get_bars_view(dt, length=length, timeshift=timeshift)
+                    assert isinstance(view, BarsView)
+                    pd.testing.assert_frame_equal(view.df, df, check_freq=False)
+
+    def test_get_bars_view_is_read_only(self, minute_data):
+        dt = minute_data.df.index[100]
+        view = minute_data.get_bars_view(dt, length=10)
+        assert len(view) == 10
+        assert np.shares_memory(view.close, minute_data.datalines["close"].dataline)
+        with pytest.raises(ValueError):
+            view.close[0] = 0
+
+        # The dataframe is a copy that can be modified
+        view.df.loc[view.df.index[0], "close"] = 0
+        assert minute_data.datalines["close"].dataline[91] != 0
+
+    def test_get_bars_view_resamples_other_timesteps(self, minute_data):
+        dt = minute_data.df.index[-1]
+        view = minute_data.get_bars_view(dt, length=2, timestep="day")
+        pd.testing.assert_frame_equal(view.df, minute_data.get_bars(dt, length=2, timestep="day"))
+
+    def test_bars_from_view(self, minute_data):
+        dt = minute_data.df.index[100]
+        view = minute_data.get_bars_view(dt, length=10)
+        bars = Bars(view, "PANDAS", minute_data.asset)
+        assert bars.view is view
+        assert bars.get_last_price() == view.close[-1]
+        assert len(bars.df) == 10
+
+    @pytest.mark.parametrize(
+        "timestep, freq, minutes", [("day", "1D", 1440), ("5 minutes", "5min", 5), ("15 minutes", "15min", 15),
+                                    ("60 minutes", "60min", 60)]
+    )
+    def test_get_bars_aggregates_match_resample(self, minute_data, timestep, freq, minutes):
+        index = minute_data.df.index
+        for dt in [index[200], index[800] + datetime.timedelta(seconds=30), index[-1]]:
+            for length in [1, 3]:
+                for timeshift in [0, 7]:
+                    df = minute_data.get_bars(dt, length=length, timestep=timestep, timeshift=timeshift)
+
+                    # Same bars when resampling the minute rows directly
+                    rows = minute_data.get_bars(dt, length=length * minutes, timeshift=timeshift)
+                    expected = rows.resample(freq).agg(
+                        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+                    ).dropna()
+                    if timestep == "day":
+                        expected = expected[expected.index < dt.replace(hour=0, minute=0, second=0, microsecond=0)]
+
+                    pd.testing.assert_frame_equal(df, expected.tail(length), check_freq=False)
+
+    def test_get_iter_count(self, minute_data):
+        index = minute_data.df.index
+        expected = pd.Series(range(len(index)), index=index)
+
+        # Moving forward, backward, between rows and on the same datetime twice
+        dts = [index[0], index[1], index[1], index[5] + datetime.timedelta(seconds=20), index[3], index[-1]]
+        dts += [index[390] + datetime.timedelta(hours=20), index[-1] + datetime.timedelta(days=1)]
+        for dt in dts:
+            assert minute_data.get_iter_count(dt) == expected.asof(dt)
+
+        assert np.isnan(minute_data.get_iter_count(index[0] - datetime.timedelta(minutes=1)))
+
+        # The Series of the positions is only built when it is read
+        assert minute_data._iter_index is None
+        pd.testing.assert_series_equal(minute_data.iter_index, expected, check_names=False, check_index_type=False)
+
+    def test_compact(self, minute_data):
+        df = minute_data.df.assign(volume=minute_data.df["volume"].astype(float))
+        data = Data(Asset("SPY"), df, timestep="minute", compact=True)
+        data.repair_times_and_fill(df.index)
+
+        # Prices are stored as float32, the volume as int32 and the dataframe is dropped
+        assert data.datalines["close"].dataline.dtype == np.float32
+        assert data.datalines["volume"].dataline.dtype == np.int32
+        assert isinstance(data.datalines["datetime"].dataline, pd.DatetimeIndex)
+        assert data._df is None
+        assert data.memory_usage() < minute_data.memory_usage()
+
+        # Values are read back with the dtypes of the dataframe
+        pd.testing.assert_frame_equal(data.df, df, check_exact=False, rtol=1e-6)
+        assert data.df is data.df
+
+        # The rebuilt dataframe is not kept by the data
+        memory_usage = data.memory_usage()
+        rebuilt = weakref.ref(data.df)
+        assert rebuilt() is None
+        assert data._df is None and data.memory_usage() == memory_usage
+        rebuilt_df = data.df
+        pd.testing.assert_frame_equal(pickle.loads(pickle.dumps(data)).df, rebuilt_df)
+        index = df.index
+        for dt in [index[100], index[500] + datetime.timedelta(seconds=30), index[-1]]:
+            price = data.get_last_price(dt)
+            assert isinstance(price, np.float64)
+            assert price == pytest.approx(minute_data.get_last_price(dt), rel=1e-6)
+            assert data.get_current_bar(dt)["datetime"] == minute_data.get_current_bar(dt)["datetime"]
+            for timestep in ["minute", "5 minutes", "day"]:
+                pd.testing.assert_frame_equal(
+                    data.get_bars_view(dt, length=30, timestep=timestep).df,
+                    minute_data.get_bars_view(dt, length=30, timestep=timestep).df,
+                    check_exact=False,
+                    rtol=1e-6,
+                    check_freq=False,
+                    check_dtype=False,
+                )
+
+    def test_from_csv_and_parquet(self, minute_data, tmp_path):
+        df = minute_data.df.rename_axis("time")
+        df.tz_convert("UTC").to_csv(tmp_path / "SPY.csv")
+        df.to_parquet(tmp_path / "SPY.parquet", row_group_size=100)
+
+        date_start, date_end = datetime.datetime(2023, 8, 2), datetime.datetime(2023, 8, 2, 12)
+        expected = Data(Asset("SPY"), df.copy(), date_start=date_start, date_end=date_end)
+        for data in [
+            Data.from_csv(tmp_path / "SPY.csv", Asset("SPY"), date_start=date_start, date_end=date_end),
+            Data.from_parquet(tmp_path / "SPY.parquet", Asset("SPY"), date_start=date_start, date_end=date_end),
+        ]:
+            pd.testing.assert_frame_equal(data.df, expected.df, check_dtype=False, check_freq=False)
+
+        data = Data.from_csv(tmp_path / "SPY.csv", Asset("SPY"), columns=["close"])
+        assert list(data.df.columns) == ["close"]
+        assert len(data.df) == len(df)
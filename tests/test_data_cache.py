@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from lumibot.entities import Asset, Data
+from lumibot.trading_builtins import DataCache
+
+USD = Asset("USD", "forex")
+
+
+def make_data(symbol, rows=1000):
+    index = pd.date_range("2023-08-01 09:30", periods=rows, freq="1min", tz="America/New_York")
+    close = np.linspace(100, 110, rows)
+    df = pd.DataFrame(
+        {"open": close, "high": close + 0.5, "low": close - 0.5, "close": close, "volume": 100.0},
+        index=index,
+    )
+    return Data(Asset(symbol), df, timestep="minute", quote=USD)
+
+
+class TestDataCache:
+    def test_lru_eviction(self):
+        spy, aapl, msft = make_data("SPY"), make_data("AAPL"), make_data("MSFT")
+        size = DataCache.get_data_size(spy)
+
+        cache = DataCache(max_bytes=int(size * 2.5))
+        cache[(spy.asset, USD)] = spy
+        cache[(aapl.asset, USD)] = aapl
+        assert cache.bytes_used == 2 * size
+
+        # SPY was used more recently than AAPL, so AAPL is evicted
+        cache.record_hit((spy.asset, USD))
+        cache[(msft.asset, USD)] = msft
+        assert list(cache.keys()) == [(spy.asset, USD), (msft.asset, USD)]
+        assert cache.bytes_used == 2 * size
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["hits"] == 1
+
+        # Evicted data is dropped without a loader
+        assert not cache.is_evicted((aapl.asset, USD))
+        assert cache.restore((aapl.asset, USD)) is None
+
+        del cache[(spy.asset, USD)]
+        assert cache.bytes_used == size
+
+    def test_restore(self):
+        spy, aapl = make_data("SPY"), make_data("AAPL")
+        size = DataCache.get_data_size(spy)
+
+        # The loader reads the evicted data back from where it came from, eg. the Polygon cache folder
+        loads = []
+
+        def loader(asset, quote, timestep, datetime_start, datetime_end):
+            loads.append((asset, quote, timestep, datetime_start, datetime_end))
+            return make_data(asset.symbol)
+
+        cache = DataCache(max_bytes=size, loader=loader)
+        cache[(spy.asset, USD)] = spy
+        cache[(aapl.asset, USD)] = aapl
+        assert list(cache.keys()) == [(aapl.asset, USD)]
+        assert cache.is_evicted((spy.asset, USD))
+
+        restored = cache.restore((spy.asset, USD))
+        pd.testing.assert_frame_equal(restored.df, spy.df)
+        assert loads == [(spy.asset, USD, "minute", spy.datetime_start, spy.datetime_end)]
+        assert list(cache.keys()) == [(spy.asset, USD)]
+        assert cache.is_evicted((aapl.asset, USD))
+        assert cache.stats()["restores"] == 1
+        assert cache.stats()["evictions"] == 2
+
+        # Data the loader can't find is not restored
+        assert cache.restore((aapl.asset, USD)) is not None
+        cache.loader = lambda *args: None
+        assert cache.restore((spy.asset, USD)) is None
+        assert not cache.is_evicted((spy.asset, USD))
+
+    def test_max_bytes_read_when_enforced(self):
+        spy, aapl = make_data("SPY"), make_data("AAPL")
+        size = DataCache.get_data_size(spy)
+
+        # The limit follows eg. a class attribute changed after the cache is created
+        limit = {"max_bytes": None}
+        cache = DataCache(max_bytes=lambda: limit["max_bytes"])
+        cache[(spy.asset, USD)] = spy
+        cache[(aapl.asset, USD)] = aapl
+        assert len(cache) == 2
+
+        limit["max_bytes"] = size
+        cache[(aapl.asset, USD)] = aapl
+        assert list(cache.keys()) == [(aapl.asset, USD)]
+        assert cache.stats()["max_bytes"] == size
+
+    def test_size_measured_after_alignment(self):
+        spy = make_data("SPY")
+        spy.compact = True
+        cache = DataCache()
+        cache[(spy.asset, USD)] = spy
+        size = cache.bytes_used
+
+        # Aligning compact data drops its dataframe and keeps smaller datalines
+        spy.repair_times_and_fill(spy.df.index)
+        cache.record_hit((spy.asset, USD))
+        assert cache.bytes_used == spy.memory_usage() < size
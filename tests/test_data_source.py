@@ -1,5 +1,10 @@
+import datetime
+
+import pytest
+
 from lumibot.data_sources.data_source import DataSource
 from lumibot.entities import Asset
+from lumibot.tools.black_scholes import BS
 
 
 class DataSourceTestable(DataSource):
@@ -43,3 +48,66 @@ class TestDataSource:
         df_chain = ds.get_chain_full_info(asset, '2023-12-01', chains=chains, underlying_price=102,
                                           risk_free_rate=0.01, strike_min=102, strike_max=102)
         assert len(df_chain) == 2
+
+    def test_calculate_chain_greeks(self):
+        ds = DataSourceTestable(api_key='test')
+        expiration = (ds.get_datetime() + datetime.timedelta(days=30)).date()
+        days_to_expiration = ds._get_days_to_expiration(expiration)
+        underlying_price = 452.0
+
+        strikes = [420, 440, 450, 460, 480]
+        assets = [Asset("SPY", "option", expiration=expiration, strike=strike, right=right)
+                  for right in ["CALL", "PUT"] for strike in strikes]
+        prices = [
+            BS([underlying_price, asset.strike, 5, days_to_expiration], volatility=20 + asset.strike / 100).callPrice
+            if asset.right == "CALL" else
+            BS([underlying_price, asset.strike, 5, days_to_expiration], volatility=20 + asset.strike / 100).putPrice
+            for asset in assets
+        ]
+        prices[-1] = None
+
+        chain_greeks = ds.calculate_chain_greeks(assets, prices, underlying_price, 0.05)
+        for asset, greeks in zip(assets[:-1], chain_greeks[:-1]):
+            expected = BS([underlying_price, asset.strike, 5, days_to_expiration], volatility=20 + asset.strike / 100)
+            assert greeks["implied_volatility"] == pytest.approx(20 + asset.strike / 100, rel=1e-4)
+            assert greeks["delta"] == pytest.approx(expected.callDelta if asset.right == "CALL" else expected.putDelta,
+                                                    rel=1e-4)
+            assert greeks["gamma"] == pytest.approx(expected.gamma, rel=1e-4)
+            assert greeks["vega"] == pytest.approx(expected.vega, rel=1e-4)
+            assert greeks["theta"] == pytest.approx(expected.callTheta if asset.right == "CALL" else expected.putTheta,
+                                                    rel=1e-4)
+
+        # Options without a price have no greeks
+        assert chain_greeks[-1]["implied_volatility"] is None
+        assert chain_greeks[-1]["delta"] is None
+
+        greeks = ds.calculate_greeks(assets[2], prices[2], underlying_price, 0.05)
+        assert greeks["implied_volatility"] == pytest.approx(chain_greeks[2]["implied_volatility"], rel=1e-4)
+
+    def test_get_chain_prices(self, mocker):
+        ds = DataSourceTestable(api_key='test')
+        assets = [Asset("SPY", "option", expiration=datetime.date(2023, 12, 1), strike=strike, right="CALL")
+                  for strike in [100, 101, 102]]
+        prices = {asset: float(asset.strike) / 100 for asset in assets}
+
+        # Remote data sources query the prices concurrently
+        mocker.patch.object(ds, 'get_last_price', side_effect=lambda asset: prices[asset])
+        assert ds.get_chain_prices(assets) == [1.0, 1.01, 1.02]
+
+        # Backtesting data sources get all the prices at once
+        ds.IS_BACKTESTING_DATA_SOURCE = True
+        get_last_prices = mocker.patch.object(ds, 'get_last_prices', return_value={assets[0]: 1.0, assets[2]: 1.02})
+        assert ds.get_chain_prices(assets) == [1.0, None, 1.02]
+        get_last_prices.assert_called_once_with(assets)
+
+    def test_enable_shared_cache(self, mocker):
+        ds = DataSourceTestable(api_key='test')
+        get_last_price = mocker.patch.object(ds, 'get_last_price', side_effect=lambda asset, **kwargs: 10.0)
+        ds.enable_shared_cache(quote_ttl=60)
+
+        spy = Asset("SPY")
+        assert ds.get_last_price(spy) == 10.0
+        assert ds.get_last_price(spy) == 10.0
+        assert ds.get_last_prices([spy, Asset("AAPL")]) == {spy: 10.0, Asset("AAPL"): 10.0}
+        assert get_last_price.call_count == 3
+        assert ds.get_request_cache_stats()["get_last_price"]["hits"] == 1
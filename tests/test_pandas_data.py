@@ -0,0 +1,198 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from lumibot.data_sources import PandasData
+from lumibot.entities import Asset, Data
+
+
+def make_data(symbol, start, end, seed):
+    index = pd.date_range(start, end, freq="1min", tz="America/New_York")
+    index = index[(index.time >= datetime.time(9, 30)) & (index.time <= datetime.time(16, 0))]
+    close = 100 + np.cumsum(np.random.default_rng(seed).normal(size=len(index)))
+    df = pd.DataFrame(
+        {"open": close - 0.1, "high": close + 0.5, "low": close - 0.5, "close": close, "volume": 100},
+        index=index,
+    )
+    return Data(Asset(symbol), df, timestep="minute", quote=Asset("USD", "forex"))
+
+
+class TestPandasData:
+    def test_get_last_prices_matches_get_last_price(self):
+        datas = [
+            make_data("SPY", "2023-08-01 09:30", "2023-08-03 16:00", 1),
+            make_data("AAPL", "2023-08-02 09:30", "2023-08-03 16:00", 2),
+            make_data("MSFT", "2023-08-01 09:30", "2023-08-02 12:00", 3),
+        ]
+        data_source = PandasData(
+            datetime_start=datetime.datetime(2023, 8, 1),
+            datetime_end=datetime.datetime(2023, 8, 4),
+            pandas_data=datas,
+        )
+        data_source.load_data()
+
+        assets = [Asset("SPY"), Asset("AAPL"), Asset("MSFT"), Asset("TSLA")]
+        index = data_source._date_index
+        for dt in [index[0], index[10], index[500] + datetime.timedelta(seconds=30), index[-1]]:
+            data_source._update_datetime(dt)
+            prices = data_source.get_last_prices(assets)
+            for asset in assets:
+                assert prices[asset] == data_source.get_last_price(asset)
+            assert prices[Asset("TSLA")] is None
+
+        # AAPL has no data before its first day
+        data_source._update_datetime(index[0])
+        assert data_source.get_last_prices(assets)[Asset("AAPL")] is None
+
+        # The snapshot is rebuilt when the data of an asset is replaced in the store
+        data_source._update_datetime(index[-1])
+        key = (Asset("SPY"), Asset("USD", "forex"))
+        spy = make_data("SPY", "2023-08-01 09:30", "2023-08-03 16:00", 4)
+        spy.repair_times_and_fill(index)
+        data_source._data_store[key] = spy
+        assert data_source.get_last_prices(assets)[Asset("SPY")] == spy.get_last_price(index[-1])
+
+    def test_load_data_matches_merge_of_calendar(self):
+        datas = [
+            make_data("SPY", "2023-03-09 09:30", "2023-03-14 16:00", 1),
+            make_data("AAPL", "2023-03-10 09:30", "2023-03-15 12:00", 2),
+        ]
+        data_source = PandasData(
+            datetime_start=datetime.datetime(2023, 3, 9),
+            datetime_end=datetime.datetime(2023, 3, 16),
+            pandas_data=datas,
+        )
+        pcal = data_source.load_data()
+
+        # Same index as merging the datetimes with the calendar and filling every minute of the sessions
+        df = pd.DataFrame(index=data_source.update_date_index().sort_values())
+        df["dates"] = df.index.date
+        df = df.merge(pcal[["market_open", "market_close"]], left_on="dates", right_index=True)
+        df = df.asfreq("1min", method="pad")
+        expected = df.loc[(df.index >= df["market_open"]) & (df.index <= df["market_close"]), :].index
+        assert data_source._date_index.equals(expected)
+
+        for data in data_source._data_store.values():
+            assert data.df.index.equals(expected[(expected >= data.datetime_start) & (expected <= data.datetime_end)])
+            assert list(data.datalines["datetime"].dataline) == list(data.df.index)
+
+    def test_load_data_from_snapshot(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(PandasData, "SNAPSHOT_FOLDER", str(tmp_path))
+
+        def make_data_source(use_snapshot):
+            return PandasData(
+                datetime_start=datetime.datetime(2023, 8, 1),
+                datetime_end=datetime.datetime(2023, 8, 4),
+                pandas_data=[
+                    make_data("SPY", "2023-08-01 09:30", "2023-08-03 16:00", 1),
+                    make_data("AAPL", "2023-08-02 09:30", "2023-08-03 12:00", 2),
+                ],
+                use_snapshot=use_snapshot,
+            )
+
+        expected = make_data_source(use_snapshot=False)
+        expected_pcal = expected.load_data()
+        assert not any(tmp_path.iterdir())
+
+        # The first load saves the snapshot, the second one loads it
+        for _ in range(2):
+            data_source = make_data_source(use_snapshot=True)
+            pcal = data_source.load_data()
+            assert len(list(tmp_path.iterdir())) == 1
+
+            assert pcal.equals(expected_pcal)
+            assert data_source._date_index.equals(expected._date_index)
+            for key, data in data_source._data_store.items():
+                expected_data = expected._data_store[key]
+                pd.testing.assert_frame_equal(data.df, expected_data.df)
+                assert list(data.datalines["datetime"].dataline) == list(expected_data.datalines["datetime"].dataline)
+                assert np.array_equal(data.datalines["close"].dataline, expected_data.datalines["close"].dataline)
+
+        # Other data gets another snapshot
+        data_source = make_data_source(use_snapshot=True)
+        data_source._data_store[(Asset("SPY"), Asset("USD", "forex"))].df.iloc[0, 0] += 1
+        data_source.load_data()
+        assert len(list(tmp_path.iterdir())) == 2
+
+        # Compact data, saved with the precision of its datalines, gets another snapshot too
+        data_source = make_data_source(use_snapshot=True)
+        for data in data_source._data_store.values():
+            data.compact = True
+        data_source.load_data()
+        assert len(list(tmp_path.iterdir())) == 3
+        # Saving the snapshot doesn't keep the dataframes rebuilt from the compact datalines
+        for data in data_source._data_store.values():
+            assert data.memory_usage() == sum(dataline.dataline.nbytes for dataline in data.datalines.values())
+
+        # Only the most recently used snapshots are kept
+        monkeypatch.setattr(PandasData, "MAX_SNAPSHOTS", 2)
+        make_data_source(use_snapshot=True).load_data()
+        data_source = make_data_source(use_snapshot=True)
+        data_source._data_store[(Asset("SPY"), Asset("USD", "forex"))].df.iloc[0, 0] += 2
+        data_source.load_data()
+        assert len(list(tmp_path.iterdir())) == 2
+        snapshot_source = make_data_source(use_snapshot=True)
+        snapshot_source.load_data()
+        assert len(list(tmp_path.iterdir())) == 2
+        # The numeric columns of a loaded snapshot are not copied out of the memory-mapped files
+        for data in snapshot_source._data_store.values():
+            assert not data.df["close"].to_numpy().flags.writeable
+
+    def test_lazy_load(self):
+        def make_data_source(**kwargs):
+            return PandasData(
+                datetime_start=datetime.datetime(2023, 8, 1),
+                datetime_end=datetime.datetime(2023, 8, 4),
+                pandas_data=[
+                    make_data("SPY", "2023-08-01 09:30", "2023-08-03 16:00", 1),
+                    make_data("AAPL", "2023-08-02 09:30", "2023-08-03 16:00", 2),
+                    make_data("MSFT", "2023-08-01 09:30", "2023-08-02 12:00", 3),
+                ],
+                **kwargs,
+            )
+
+        expected = make_data_source()
+        expected.load_data()
+        data_source = make_data_source(lazy_load=True)
+        data_source.load_data()
+        assert data_source._date_index.equals(expected._date_index)
+        assert not any(hasattr(data, "datalines") for data in data_source._data_store.values())
+
+        spy, aapl, msft = Asset("SPY"), Asset("AAPL"), Asset("MSFT")
+        dt = expected._date_index[700]
+        expected._update_datetime(dt)
+        data_source._update_datetime(dt)
+
+        # Only the data that is used is aligned
+        assert data_source.get_last_price(spy) == expected.get_last_price(spy)
+        assert data_source.get_last_prices([aapl]) == expected.get_last_prices([aapl])
+        assert data_source._unaligned == {(msft, Asset("USD", "forex"))}
+        bars = data_source.get_historical_prices(spy, 10, "minute")
+        pd.testing.assert_frame_equal(bars.df, expected.get_historical_prices(spy, 10, "minute").df)
+
+        data_source.start_warm_up().join()
+        assert not data_source._unaligned
+        assert data_source.get_last_prices([spy, aapl, msft]) == expected.get_last_prices([spy, aapl, msft])
+
+    def test_from_directory(self, tmp_path):
+        datas = [
+            make_data("SPY", "2023-08-01 09:30", "2023-08-03 16:00", 1),
+            make_data("AAPL", "2023-08-02 09:30", "2023-08-03 16:00", 2),
+        ]
+        datas[0].df.to_csv(tmp_path / "SPY.csv")
+        datas[1].df.to_parquet(tmp_path / "AAPL.parquet")
+        (tmp_path / "notes.txt").write_text("not data")
+
+        data_source = PandasData.from_directory(
+            tmp_path,
+            datetime.datetime(2023, 8, 2),
+            datetime.datetime(2023, 8, 4),
+            lookback=datetime.timedelta(0),
+            quote=Asset("USD", "forex"),
+        )
+        assert sorted(asset.symbol for asset, _ in data_source.get_assets()) == ["AAPL", "SPY"]
+        for data in datas:
+            loaded = data_source._data_store[(Asset(data.asset.symbol), Asset("USD", "forex"))]
+            expected = data.df[data.df.index >= "2023-08-02"]
+            pd.testing.assert_frame_equal(loaded.df, expected, check_dtype=False, check_freq=False)
@@ -1,5 +1,10 @@
 import datetime
+import json
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import urlparse
 
 import numpy as np
 import pandas as pd
@@ -15,6 +20,43 @@ class FakeContract:
         self.ticker = ticker
 
 
+@pytest.fixture
+def polygon_stub():
+    """A local HTTP server answering the Polygon requests with the responses queued for their path.
+
+    ``responses`` maps each path to a list of ``(status, body)``, the last one is repeated. ``requests`` lists
+    the paths that were requested.
+    """
+    responses = {}
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = urlparse(self.path).path
+            requests.append(path)
+            queue = responses.get(path, [(404, {"status": "NOT_FOUND"})])
+            status, body = queue.pop(0) if len(queue) > 1 else queue[0]
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.responses = responses
+    server.requests = requests
+    server.base = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
 class TestPolygonHelpers:
     def test_build_cache_filename(self, mocker, tmpdir):
         asset = Asset("SPY")
@@ -214,7 +256,7 @@ class TestPolygonHelpers:
         assert df_loaded.index[0] == pd.DatetimeIndex(["2023-07-01 09:30:00-00:00"])[0]
 
     def test_update_cache(self, tmpdir):
-        cache_file = Path(tmpdir / "polygon" / "stock_SPY_1D.feather")
+        cache_folder = Path(tmpdir / "polygon" / "stock_SPY_1D")
         df = pd.DataFrame(
             {
                 "close": [2, 3, 4, 5, 6],
@@ -228,18 +270,62 @@ class TestPolygonHelpers:
                 ],
             }
         )
+        df = df.set_index(pd.DatetimeIndex(pd.to_datetime(df.pop("datetime"), utc=True), name="datetime"))
 
         # Empty DataFrame, don't write cache file
-        ph.update_cache(cache_file, df_all=pd.DataFrame())
-        assert not cache_file.exists()
+        ph.update_cache(cache_folder, df_all=pd.DataFrame())
+        assert not cache_folder.exists()
 
         # No changes in data, write file just in case we got comparison wrong.
-        ph.update_cache(cache_file, df_all=df)
-        assert cache_file.exists()
+        ph.update_cache(cache_folder, df_all=df)
+        assert (cache_folder / "2023-07.arrow").exists()
 
         # Changes in data, write cache file
-        ph.update_cache(cache_file, df_all=df)
-        assert cache_file.exists()
+        ph.update_cache(cache_folder, df_all=df)
+        assert (cache_folder / "2023-07.arrow").exists()
+        pd.testing.assert_frame_equal(ph.load_cache_partitions(cache_folder), df)
+
+        # Rows with a tz-naive index are UTC, and are merged with the rows already in the partition
+        naive = pd.DataFrame({"close": [7], "open": [6]}, index=pd.DatetimeIndex(["2023-07-01 13:35"], name="datetime"))
+        ph.update_cache(cache_folder, df_all=naive)
+        loaded = ph.load_cache_partitions(cache_folder)
+        assert len(loaded) == 6
+        assert loaded.loc[pd.Timestamp("2023-07-01 13:35", tz="UTC"), "close"] == 7
+
+    def test_cache_partitions(self, tmpdir):
+        cache_folder = Path(tmpdir / "polygon" / "stock_SPY_minute")
+        index = pd.DatetimeIndex(
+            ["2023-07-31 13:30", "2023-08-01 13:30", "2023-08-31 13:30", "2023-09-01 13:30", "2023-10-02 13:30"],
+            tz="UTC",
+            name="datetime",
+        )
+        df = pd.DataFrame({"close": [1.0, 2.0, 3.0, 4.0, 5.0]}, index=index)
+        ph.update_cache(cache_folder, df)
+        assert sorted(path.name for path in cache_folder.iterdir()) == [
+            "2023-07.arrow",
+            "2023-08.arrow",
+            "2023-09.arrow",
+            "2023-10.arrow",
+        ]
+
+        # Only the partitions that cover the dates are loaded
+        start = datetime.datetime(2023, 8, 10, tzinfo=pytz.utc)
+        end = datetime.datetime(2023, 9, 10, tzinfo=pytz.utc)
+        pd.testing.assert_frame_equal(ph.load_cache_partitions(cache_folder, start, end), df.iloc[1:4])
+
+        # Only the partitions of the months that changed are written, merged with the rows already there
+        new_df = pd.DataFrame({"close": [6.0]}, index=pd.DatetimeIndex(["2023-08-02 13:30"], tz="UTC", name="datetime"))
+        ph.update_cache(cache_folder, new_df, months=ph.cache_partition_months(new_df.index))
+        loaded = ph.load_cache_partitions(cache_folder)
+        assert len(loaded) == 6
+        assert loaded.loc["2023-08-02 13:30", "close"] == 6.0
+
+        # The previous single file cache is moved to partitions
+        cache_file = Path(tmpdir / "polygon" / "stock_AAPL_minute.feather")
+        df.reset_index().to_feather(cache_file)
+        ph.migrate_cache_file(cache_file, cache_file.with_suffix(""))
+        assert not cache_file.exists()
+        pd.testing.assert_frame_equal(ph.load_cache_partitions(cache_file.with_suffix("")), df)
 
     def test_update_polygon_data(self):
         # Test with empty dataframe and no new data
@@ -306,10 +392,10 @@ class TestPolygonPriceData:
         start_date = tz_e.localize(datetime.datetime(2023, 8, 2, 6, 30))  # Include PreMarket
         end_date = tz_e.localize(datetime.datetime(2023, 8, 2, 13, 0))
         timespan = "minute"
-        expected_cachefile = ph.build_cache_filename(asset, timespan)
+        expected_cache_folder = ph.build_cache_folder(asset, timespan)
 
-        assert not expected_cachefile.exists()
-        assert not expected_cachefile.parent.exists()
+        assert not expected_cache_folder.exists()
+        assert not expected_cache_folder.parent.exists()
 
         # Fake some data from Polygon
         mock_polyclient.create().get_aggs.return_value = [
@@ -325,7 +411,7 @@ class TestPolygonPriceData:
         assert len(df) == 6
         assert df["close"].iloc[0] == 2
         assert mock_polyclient.create().get_aggs.call_count == 1
-        assert expected_cachefile.exists()
+        assert expected_cache_folder.exists()
 
         # Do the same query, but this time we should get the data from the cache
         mock_polyclient.create().get_aggs.reset_mock()
@@ -361,7 +447,7 @@ class TestPolygonPriceData:
 
         # Query a large range of dates and ensure we break up the Polygon API calls into
         # multiple queries.
-        expected_cachefile.unlink()
+        shutil.rmtree(expected_cache_folder)
         mock_polyclient.create().get_aggs.reset_mock()
         mock_polyclient.create().get_aggs.side_effect = [
             # First call for Auguest Data
@@ -400,8 +486,8 @@ class TestPolygonPriceData:
         tz_e = pytz.timezone("US/Eastern")
         start_date = tz_e.localize(datetime.datetime(2023, 8, 2, 6, 30))  # Include PreMarket
         end_date = tz_e.localize(datetime.datetime(2023, 8, 2, 13, 0))
-        expected_cachefile = ph.build_cache_filename(asset, timespan)
-        assert not expected_cachefile.exists()
+        expected_cache_folder = ph.build_cache_folder(asset, timespan)
+        assert not expected_cache_folder.exists()
 
         # Fake some data from Polygon between start and end date
         return_value = []
@@ -429,7 +515,7 @@ class TestPolygonPriceData:
         call_count = aggs.call_count
         assert call_count == 1
         
-        assert expected_cachefile.exists()
+        assert expected_cache_folder.exists()
         if df is None:
             df = pd.DataFrame()
         assert len(df) == len(return_value)
@@ -447,7 +533,7 @@ class TestPolygonPriceData:
             aggs = mock3.get_aggs
             call_count = aggs.call_count
             assert call_count == 1
-        expected_cachefile.unlink()
+        shutil.rmtree(expected_cache_folder)
 
         # Polygon is only called once for the same date range when some are missing.
         mock_polyclient.create().get_aggs.reset_mock()
@@ -474,7 +560,7 @@ class TestPolygonPriceData:
         mock_polyclient.create().get_aggs.side_effect = aggs_result_list + aggs_result_list if force_cache_update else aggs_result_list
         df = ph.get_price_data_from_polygon(api_key, asset, start_date, end_date, timespan, force_cache_update=force_cache_update)
         assert mock_polyclient.create().get_aggs.call_count == 3
-        assert expected_cachefile.exists()
+        assert expected_cache_folder.exists()
         assert len(df) == 7
         df = ph.get_price_data_from_polygon(api_key, asset, start_date, end_date, timespan, force_cache_update=force_cache_update)
         assert len(df) == 7
@@ -482,4 +568,158 @@ class TestPolygonPriceData:
             assert mock_polyclient.create().get_aggs.call_count == 2 * 3
         else:
             assert mock_polyclient.create().get_aggs.call_count == 3
-        expected_cachefile.unlink()
+        shutil.rmtree(expected_cache_folder)
+
+    def test_prefetch_price_data_from_polygon(self, mocker, tmpdir):
+        # Ensure we don't accidentally call the real Polygon API
+        mock_polyclient = mocker.MagicMock()
+        mocker.patch.object(ph, "PolygonClient", mock_polyclient)
+        mocker.patch.object(ph, "LUMIBOT_CACHE_FOLDER", tmpdir)
+        mocker.patch.object(ph, "RETRY_BACKOFF_SECONDS", 0)
+
+        # One bar on the first day of each chunk, the first request of BTC fails once and is retried
+        failures = []
+
+        def get_aggs(ticker, from_, to, **kwargs):
+            if ticker == "X:BTCUSD" and not failures:
+                failures.append(from_)
+                raise ConnectionError("Connection reset by peer")
+            timestamp = datetime.datetime.combine(from_, datetime.time(8), tzinfo=datetime.timezone.utc)
+            price = 1 if ticker == "X:BTCUSD" else 2
+            return [{"o": price, "h": price, "l": price, "c": price, "v": 100, "t": timestamp.timestamp() * 1000}]
+
+        mock_polyclient.create().get_aggs.side_effect = get_aggs
+
+        api_key = "abc123"
+        btc = Asset("BTC", asset_type="crypto")
+        eth = Asset("ETH", asset_type="crypto")
+        usd = Asset("USD", asset_type="forex")
+        start_date = datetime.datetime(2023, 8, 1, tzinfo=datetime.timezone.utc)
+        end_date = datetime.datetime(2023, 9, 15, tzinfo=datetime.timezone.utc)  # 2 chunks per asset
+        requirements = [
+            (btc, start_date, end_date, "minute", usd),
+            (eth, start_date, end_date, "minute", usd),
+            (btc, start_date, end_date - datetime.timedelta(days=10), "minute", usd),  # Merged with the first
+        ]
+
+        data = ph.prefetch_price_data_from_polygon(api_key, requirements, max_workers=4)
+        assert list(data.keys()) == [(btc, usd, "minute"), (eth, usd, "minute")]
+        assert len(failures) == 1
+        assert mock_polyclient.create().get_aggs.call_count == 2 + 2 + 1
+        assert len(data[(btc, usd, "minute")]) == 2
+        assert (data[(btc, usd, "minute")]["close"] == 1).all()
+        assert (data[(eth, usd, "minute")]["close"] == 2).all()
+        assert ph.build_cache_folder(btc, "minute").exists()
+
+        # The data is now read from the cache
+        mock_polyclient.create().get_aggs.reset_mock()
+        df = ph.get_price_data_from_polygon(api_key, eth, start_date, end_date, "minute", quote_asset=usd)
+        assert len(df) == 2
+        assert mock_polyclient.create().get_aggs.call_count == 0
+
+    def test_prefetch_price_data_from_polygon_errors(self, mocker, tmpdir):
+        mock_polyclient = mocker.MagicMock()
+        mocker.patch.object(ph, "PolygonClient", mock_polyclient)
+        mocker.patch.object(ph, "LUMIBOT_CACHE_FOLDER", tmpdir)
+        mocker.patch.object(ph, "RETRY_BACKOFF_SECONDS", 0)
+        rate_limiter = mocker.MagicMock()
+        mocker.patch.object(ph, "TokenBucket", return_value=rate_limiter)
+
+        # The splits request of SPY fails once and is retried, ETH fails every time
+        splits_failures = []
+
+        def list_splits(ticker, **kwargs):
+            if not splits_failures:
+                splits_failures.append(ticker)
+                raise ConnectionError("Connection reset by peer")
+            return iter([])
+
+        def get_aggs(ticker, from_, to, **kwargs):
+            if ticker == "X:ETHUSD":
+                raise ConnectionError("Connection reset by peer")
+            timestamp = datetime.datetime.combine(from_, datetime.time(14), tzinfo=datetime.timezone.utc)
+            return [{"o": 1, "h": 1, "l": 1, "c": 1, "v": 100, "t": timestamp.timestamp() * 1000}]
+
+        mock_polyclient.create().list_splits.side_effect = list_splits
+        mock_polyclient.create().get_aggs.side_effect = get_aggs
+
+        spy = Asset("SPY")
+        eth = Asset("ETH", asset_type="crypto")
+        usd = Asset("USD", asset_type="forex")
+        start_date = datetime.datetime(2023, 8, 1, tzinfo=datetime.timezone.utc)
+        end_date = datetime.datetime(2023, 8, 15, tzinfo=datetime.timezone.utc)
+        requirements = [(spy, start_date, end_date, "minute", usd), (eth, start_date, end_date, "minute", usd)]
+
+        data = ph.prefetch_price_data_from_polygon("abc123", requirements, requests_per_minute=60, retries=1)
+        assert list(data.keys()) == [(spy, usd, "minute")]
+        assert len(data[(spy, usd, "minute")]) == 1
+        assert ph.build_cache_folder(spy, "minute").exists()
+        assert not ph.build_cache_folder(eth, "minute").exists()
+
+        # Every request took a token: 2 for the splits, 1 for SPY and 2 for ETH
+        assert mock_polyclient.create().list_splits.call_count == 2
+        assert rate_limiter.acquire.call_count == 2 + 1 + 2
+
+    def test_prefetch_price_data_from_polygon_http(self, mocker, tmpdir, polygon_stub):
+        """Prefetch through the real client against a local server returning errors and paginated responses"""
+        mocker.patch.object(ph, "LUMIBOT_CACHE_FOLDER", tmpdir)
+        mocker.patch.object(ph, "RETRY_BACKOFF_SECONDS", 0)
+
+        bar = datetime.datetime(2023, 8, 1, 14, tzinfo=datetime.timezone.utc).timestamp() * 1000
+        split = {"execution_date": "2020-08-31", "split_from": 1, "split_to": 4, "ticker": "AAPL"}
+        aggs = {"status": "OK", "results": [{"o": 1, "h": 1, "l": 1, "c": 1, "v": 100, "t": bar}]}
+        # The splits are rate limited once and come in two pages, the bars of AAPL fail once with a server error
+        polygon_stub.responses["/v3/reference/splits"] = [
+            (429, {"status": "ERROR"}),
+            (200, {"results": [split], "next_url": f"{polygon_stub.base}/v3/reference/splits/page2"}),
+        ]
+        polygon_stub.responses["/v3/reference/splits/page2"] = [(200, {"results": [dict(split, split_to=2)]})]
+        polygon_stub.responses["/v2/aggs/ticker/AAPL/range/1/minute/2023-08-01/2023-08-15"] = [
+            (500, {"status": "ERROR"}),
+            (200, aggs),
+        ]
+        # Errors returned by Polygon are not retried
+        polygon_stub.responses["/v2/aggs/ticker/X:ETHUSD/range/1/minute/2023-08-01/2023-08-15"] = [
+            (403, {"status": "NOT_AUTHORIZED"}),
+        ]
+
+        aapl = Asset("AAPL")
+        eth = Asset("ETH", asset_type="crypto")
+        usd = Asset("USD", asset_type="forex")
+        start_date = datetime.datetime(2023, 8, 1, tzinfo=datetime.timezone.utc)
+        end_date = datetime.datetime(2023, 8, 15, tzinfo=datetime.timezone.utc)
+        requirements = [(aapl, start_date, end_date, "minute", usd), (eth, start_date, end_date, "minute", usd)]
+
+        polygon_client = ph.PolygonClient(api_key="abc123", base=polygon_stub.base)
+        data = ph.prefetch_price_data_from_polygon("abc123", requirements, polygon_client=polygon_client, retries=1)
+        assert list(data.keys()) == [(aapl, usd, "minute")]
+        assert data[(aapl, usd, "minute")]["close"].tolist() == [1]
+        assert not ph.build_cache_folder(eth, "minute").exists()
+
+        # Both pages of splits were read and cached
+        splits_file = Path(str(ph.build_cache_filename(aapl, "minute")).rpartition(".feather")[0] + "_splits.feather")
+        assert pd.read_feather(splits_file)["split_to"].tolist() == [4, 2]
+        assert polygon_stub.requests.count("/v3/reference/splits") == 2
+        assert polygon_stub.requests.count("/v2/aggs/ticker/AAPL/range/1/minute/2023-08-01/2023-08-15") == 2
+        assert polygon_stub.requests.count("/v2/aggs/ticker/X:ETHUSD/range/1/minute/2023-08-01/2023-08-15") == 1
+
+    def test_token_bucket(self, mocker):
+        bucket = ph.TokenBucket(rate=2, capacity=2)
+        sleep = mocker.patch.object(ph.time, "sleep")
+
+        # The bucket starts full, so the first requests don't wait
+        bucket.acquire()
+        bucket.acquire()
+        sleep.assert_not_called()
+
+        # The bucket is empty, refill it while waiting
+        def refill(seconds):
+            bucket._last -= seconds
+
+        sleep.side_effect = refill
+        bucket.acquire()
+        assert sleep.call_count == 1
+        assert sleep.call_args[0][0] == pytest.approx(0.5, abs=0.01)
+
+        with pytest.raises(ValueError):
+            ph.TokenBucket(rate=0)
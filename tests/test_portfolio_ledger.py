@@ -0,0 +1,46 @@
+import datetime
+
+import pytest
+
+from lumibot.entities import Asset, Position
+from lumibot.trading_builtins import PortfolioLedger
+
+
+class TestPortfolioLedger:
+    def test_positions_value(self):
+        usd = Asset("USD", "forex")
+        spy = Asset("SPY")
+        option = Asset("SPY", "option", expiration=datetime.date(2023, 8, 18), strike=450, right="CALL")
+        btc = Asset("BTC", "crypto")
+        positions = [
+            Position("test", usd, 1000),
+            Position("test", spy, 10),
+            Position("test", option, 2),
+            Position("test", btc, 0.5),
+        ]
+        dt = datetime.datetime(2023, 8, 1, 10)
+
+        ledger = PortfolioLedger()
+        assert ledger.is_stale(1)
+        ledger.update_positions(positions, usd, 1)
+        assert not ledger.is_stale(1)
+        assert ledger.assets == [spy, option, (btc, usd)]
+
+        assert ledger.needs_prices(dt)
+        ledger.update_prices({spy: 450.0, option: 3.5, (btc, usd): 30000.0}, dt)
+        assert not ledger.needs_prices(dt)
+        assert ledger.positions_value == pytest.approx(10 * 450 + 2 * 3.5 * 100 + 0.5 * 30000)
+
+        # New positions have to be priced again
+        positions[1].quantity = 5
+        ledger.update_positions(positions, usd, 2)
+        assert ledger.needs_prices(dt)
+        ledger.update_prices({spy: 450.0, option: 3.5, (btc, usd): 30000.0}, dt)
+        assert ledger.positions_value == pytest.approx(5 * 450 + 2 * 3.5 * 100 + 0.5 * 30000)
+
+    def test_missing_price(self):
+        spy = Asset("SPY")
+        ledger = PortfolioLedger()
+        ledger.update_positions([Position("test", spy, 10)], Asset("USD", "forex"), 1)
+        with pytest.raises(ValueError):
+            ledger.update_prices({spy: None}, datetime.datetime(2023, 8, 1, 10))
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+from lumibot.trading_builtins import RequestCache
+
+
+class TestRequestCache:
+    def test_ttl(self):
+        cache = RequestCache(ttl=0.05)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.get("SPY", fetch) == 1
+        assert cache.get("SPY", fetch) == 1
+        time.sleep(0.06)
+        assert cache.get("SPY", fetch) == 2
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+
+    def test_coalesce_concurrent_requests(self):
+        cache = RequestCache(ttl=60)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return 42
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("SPY", fetch))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [42] * 5
+        assert len(calls) == 1
+        assert cache.stats()["coalesced"] == 4
+
+    def test_errors_are_not_cached(self):
+        cache = RequestCache(ttl=60)
+
+        def fail():
+            raise ConnectionError("down")
+
+        with pytest.raises(ConnectionError):
+            cache.get("SPY", fail)
+        assert cache.get("SPY", lambda: 1) == 1
@@ -0,0 +1,67 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from lumibot.brokers import Broker
+from lumibot.trading_builtins import TradeEventLog
+
+
+def make_events(count):
+    start = datetime.datetime(2023, 8, 1, 9, 30)
+    events = []
+    for i in range(count):
+        filled = i % 2 == 1
+        events.append(
+            {
+                "time": start + datetime.timedelta(minutes=i),
+                "identifier": f"order_{i // 2}",
+                "symbol": "SPY",
+                "status": "fill" if filled else "new",
+                "price": 400.0 + i if filled else None,
+                "filled_quantity": 10.0 if filled else None,
+                "multiplier": 1,
+            }
+        )
+    return events
+
+
+class TestTradeEventLog:
+    def test_to_df(self):
+        log = TradeEventLog(Broker.TRADE_EVENT_COLUMNS)
+        assert log.to_df().empty
+
+        for event in make_events(4):
+            log.append(event)
+
+        df = log.to_df()
+        assert len(log) == 4
+        assert list(df.columns) == ["time", "identifier", "symbol", "status", "multiplier", "price", "filled_quantity"]
+        assert df["price"].isna().tolist() == [True, False, True, False]
+        assert df["price"].iloc[1] == 401.0
+
+        # The DataFrame is rebuilt when new events come in
+        log.append(make_events(1)[0])
+        assert len(log.to_df()) == 5
+
+    @pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+    def test_stream_to_disk(self, tmp_path, file_format):
+        events = make_events(25)
+        memory_log = TradeEventLog(Broker.TRADE_EVENT_COLUMNS)
+        disk_log = TradeEventLog(Broker.TRADE_EVENT_COLUMNS)
+        disk_log.append(events[0])
+        disk_log.stream_to(str(tmp_path), file_format=file_format, chunk_size=10)
+
+        memory_log.append(events[0])
+        for event in events[1:]:
+            memory_log.append(event)
+            disk_log.append(event)
+
+        assert len(list(tmp_path.iterdir())) == 3
+        assert len(disk_log) == 25
+        pd.testing.assert_frame_equal(disk_log.to_df(), memory_log.to_df(), check_dtype=False)
+
+    def test_stream_to_invalid_format(self, tmp_path):
+        log = TradeEventLog(Broker.TRADE_EVENT_COLUMNS)
+        with pytest.raises(ValueError):
+            log.stream_to(str(tmp_path), file_format="csv")
@@ -236,6 +236,20 @@ class TestTradierBroker:
         assert option_order.type == "stop"
         assert option_order.stop_price == 1.0
 
+    def test_sync_positions(self, mocker):
+        broker = Tradier(account_number="1234", access_token="a1b2c3", paper=True, polling_interval=None)
+        strategy = "strat_unittest"
+        broker._filled_positions.append(Position(strategy, Asset("SPY"), 10))
+        broker._filled_positions.append(Position(strategy, Asset("AAPL"), 5))
+        positions_broker = [Position(strategy, Asset("SPY"), 20), Position(strategy, Asset("TSLA"), 3)]
+        mocker.patch.object(broker, '_pull_positions', return_value=positions_broker)
+
+        # Positions are updated, added and removed to match the broker
+        broker.sync_positions(strategy)
+        positions = {position.asset.symbol: position.quantity for position in broker._filled_positions.get_list()}
+        assert positions == {"SPY": 20, "TSLA": 3}
+        assert broker.wait_for_orders_submission(timeout=1)
+
     def test_do_polling(self, mocker):
         broker = Tradier(account_number="1234", access_token="a1b2c3", paper=True, polling_interval=None)
         strategy = "strat_unittest"